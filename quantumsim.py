@@ -25,7 +25,9 @@ import matplotlib.colors as mcol
 import matplotlib.animation as animation
 import random
 from abc import ABC, abstractmethod
-from collections import Counter
+from collections import Counter, OrderedDict, deque
+import array
+import scipy.sparse
 
 
 '''
@@ -54,6 +56,7 @@ Functions for the Dirac notation to describe (quantum) states and (quantum) oper
 <a||b> is the inner product of <a| and |b>, which is 1 if a = b and 0 if a != b.
 |a><b| is the outer product of |a> and <b|, which is a matrix with 1 in entry (a,b) and 0 everywhere else.
 Function state_as_string converts integer i, 0 <= i < N, to a quantum state in Dirac notation.
+Function states_as_strings converts an array of such integers, every distinct integer is converted only once.
 """
 class Dirac:
     
@@ -90,6 +93,14 @@ class Dirac:
         state_as_string = binary_string[2:].zfill(N)
         return "|" + state_as_string + ">"
 
+    @staticmethod
+    def states_as_strings(indices, N, little_endian_formatted: bool=False) -> list:
+        unique_indices, inverse = np.unique(indices, return_inverse=True)
+        strings = [Dirac.state_as_string(int(i), N) for i in unique_indices]
+        if little_endian_formatted:
+            strings = [string[0] + string[1:-1][::-1] + string[-1] for string in strings]
+        return [strings[i] for i in inverse.flatten()]
+
 
 """
 Functions to obtain 2 x 2 unitary matrices for unitary qubit operations.
@@ -140,10 +151,74 @@ class QubitUnitaryOperation:
         return np.array([[cmath.exp(-a), 0], [0, cmath.exp(a)]], dtype=complex)
 
 
+"""
+Least recently used cache of operators with a budget in bytes. Cached arrays are made read-only, so they can be shared
+by all circuits. When adding an operator would exceed the budget, the least recently used operators are evicted.
+Operators larger than the whole budget are not cached. The counters hits, misses and evictions keep track of the cache usage.
+"""
+class OperatorCache:
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()
+
+    def get(self, key, build):
+        # Returns the cached operator for the key, or builds it by calling build() and caches it
+        if key in self.__entries:
+            self.hits = self.hits + 1
+            self.__entries.move_to_end(key)
+            return self.__entries[key]
+        self.misses = self.misses + 1
+        operator = build()
+        operator.flags.writeable = False
+        if operator.nbytes <= self.max_bytes:
+            while self.current_bytes + operator.nbytes > self.max_bytes:
+                self.__evict()
+            self.__entries[key] = operator
+            self.current_bytes = self.current_bytes + operator.nbytes
+        return operator
+
+    def __evict(self):
+        _, operator = self.__entries.popitem(last=False)
+        self.current_bytes = self.current_bytes - operator.nbytes
+        self.evictions = self.evictions + 1
+
+    def set_max_bytes(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        while self.current_bytes > self.max_bytes:
+            self.__evict()
+
+    def clear(self):
+        # Removes all operators and starts counting hits, misses and evictions again
+        self.__entries.clear()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get_statistics(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self.__entries), "bytes": self.current_bytes}
+
 """
 Functions to obtain N x N unitary matrices for unitary operations on quantum circuits of N qubits.
 """
 class CircuitUnitaryOperation:
+    """
+    Combined operators of named gates and index maps of permutation gates are cached by gate kind, qubits, N and parameters
+    in operator_cache, with a budget of 256 MiB. The cached arrays are read-only.
+    """
+    operator_cache = OperatorCache(256 * 2**20)
+
+    @staticmethod
+    def __get_cached(key, build):
+        return CircuitUnitaryOperation.operator_cache.get(key, build)
     
     @staticmethod
     def get_combined_operation_for_qubit(operation, q, N):
@@ -156,6 +231,15 @@ class CircuitUnitaryOperation:
                 combined_operation = np.kron(combined_operation, identity)
         return combined_operation
 
+    @staticmethod
+    def get_combined_operation_for_qubits(operation, qubits, N):
+        # Operation on k arbitrary qubits, the first qubit in the list corresponds to the most significant bit of the operation.
+        # The identity is viewed as a tensor with one axis per qubit and the operation is contracted with the axes of the qubits.
+        k = len(qubits)
+        identity = np.eye(2**N, dtype=complex).reshape((2,)*N + (2**N,))
+        combined_operation = np.tensordot(operation.reshape((2,)*(2*k)), identity, axes=(list(range(k, 2*k)), qubits))
+        return np.moveaxis(combined_operation, list(range(k)), qubits).reshape(2**N, 2**N)
+
     @staticmethod
     def get_combined_operation_for_identity(N):
         return np.array(np.eye(2**N),dtype=complex)
@@ -163,42 +247,42 @@ class CircuitUnitaryOperation:
     @staticmethod
     def get_combined_operation_for_pauli_x(q, N):
         pauli_x = QubitUnitaryOperation.get_pauli_x()
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(pauli_x, q, N)
+        return CircuitUnitaryOperation.__get_cached(('pauli_x', q, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(pauli_x, q, N))
     
     @staticmethod
     def get_combined_operation_for_pauli_y(q, N):
         pauli_y = QubitUnitaryOperation.get_pauli_y()
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(pauli_y, q, N)
+        return CircuitUnitaryOperation.__get_cached(('pauli_y', q, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(pauli_y, q, N))
     
     @staticmethod
     def get_combined_operation_for_pauli_z(q, N):
         pauli_z = QubitUnitaryOperation.get_pauli_z()
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(pauli_z, q, N)
+        return CircuitUnitaryOperation.__get_cached(('pauli_z', q, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(pauli_z, q, N))
     
     @staticmethod
     def get_combined_operation_for_hadamard(q, N):
         hadamard = QubitUnitaryOperation.get_hadamard()
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(hadamard, q, N)
+        return CircuitUnitaryOperation.__get_cached(('hadamard', q, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(hadamard, q, N))
     
     @staticmethod
     def get_combined_operation_for_phase(theta, q, N):
         phase = QubitUnitaryOperation.get_phase(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(phase, q, N)
+        return CircuitUnitaryOperation.__get_cached(('phase', q, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(phase, q, N))
     
     @staticmethod
     def get_combined_operation_for_rotate_x(theta, q, N):
         rotate = QubitUnitaryOperation.get_rotate_x(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(rotate, q, N)
+        return CircuitUnitaryOperation.__get_cached(('rotate_x', q, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(rotate, q, N))
     
     @staticmethod
     def get_combined_operation_for_rotate_y(theta, q, N):
         rotate = QubitUnitaryOperation.get_rotate_y(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(rotate, q, N)
+        return CircuitUnitaryOperation.__get_cached(('rotate_y', q, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(rotate, q, N))
     
     @staticmethod
     def get_combined_operation_for_rotate_z(theta, q, N):
         rotate = QubitUnitaryOperation.get_rotate_z(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(rotate, q, N)
+        return CircuitUnitaryOperation.__get_cached(('rotate_z', q, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_qubit(rotate, q, N))
     
     
     @staticmethod
@@ -224,71 +308,124 @@ class CircuitUnitaryOperation:
     @staticmethod
     def get_combined_operation_for_controlled_rotate_x(theta, control, target, N):
         operation = QubitUnitaryOperation.get_rotate_x(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(operation, control, target, N)
+        return CircuitUnitaryOperation.__get_cached(('controlled_rotate_x', control, target, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(operation, control, target, N))
 
     @staticmethod
     def get_combined_operation_for_controlled_rotate_y(theta, control, target, N):
         operation = QubitUnitaryOperation.get_rotate_y(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(operation, control, target, N)
+        return CircuitUnitaryOperation.__get_cached(('controlled_rotate_y', control, target, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(operation, control, target, N))
 
     @staticmethod
     def get_combined_operation_for_controlled_rotate_z(theta, control, target, N):
         operation = QubitUnitaryOperation.get_rotate_z(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(operation, control, target, N)
+        return CircuitUnitaryOperation.__get_cached(('controlled_rotate_z', control, target, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(operation, control, target, N))
     
     @staticmethod
     def get_combined_operation_for_cnot(control, target, N):
-        pauli_x = QubitUnitaryOperation.get_pauli_x()     
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(pauli_x, control, target, N)
+        pauli_x = QubitUnitaryOperation.get_pauli_x()
+        return CircuitUnitaryOperation.__get_cached(('cnot', control, target, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(pauli_x, control, target, N))
     
     @staticmethod
     def get_combined_operation_for_controlled_pauli_y(control, target, N):
         pauli_y = QubitUnitaryOperation.get_pauli_y()
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(pauli_y, control, target, N)
+        return CircuitUnitaryOperation.__get_cached(('controlled_pauli_y', control, target, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(pauli_y, control, target, N))
     
     @staticmethod
     def get_combined_operation_for_controlled_pauli_z(control, target, N):
         pauli_z = QubitUnitaryOperation.get_pauli_z()
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(pauli_z, control, target, N)
+        return CircuitUnitaryOperation.__get_cached(('controlled_pauli_z', control, target, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(pauli_z, control, target, N))
     
     @staticmethod
     def get_combined_operation_for_controlled_hadamard(control, target, N):
         hadamard = QubitUnitaryOperation.get_hadamard()
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(hadamard, control, target, N)
+        return CircuitUnitaryOperation.__get_cached(('controlled_hadamard', control, target, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(hadamard, control, target, N))
     
     @staticmethod
     def get_combined_operation_for_controlled_phase(theta, control, target, N):
         phase_theta = QubitUnitaryOperation.get_phase(theta)
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(phase_theta, control, target, N)
+        return CircuitUnitaryOperation.__get_cached(('controlled_phase', control, target, N, theta), lambda: CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(phase_theta, control, target, N))
     
     @staticmethod
     def get_combined_operation_for_swap(a, b, N):
-        combined_operation_cnot_a_b = CircuitUnitaryOperation.get_combined_operation_for_cnot(a, b, N)
-        combined_operation_cnot_b_a = CircuitUnitaryOperation.get_combined_operation_for_cnot(b, a, N)
-        return np.dot(np.dot(combined_operation_cnot_a_b,combined_operation_cnot_b_a),combined_operation_cnot_a_b)
+        permutation = CircuitUnitaryOperation.get_permutation_for_swap(a, b, N)
+        return CircuitUnitaryOperation.__get_cached(('swap', a, b, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_permutation(permutation))
     
     @staticmethod
     def get_combined_operation_for_fredkin(control, a, b, N):
-        combined_operation_swap_control_0 = CircuitUnitaryOperation.get_combined_operation_for_swap(control, 0, N)
-        combined_operation_swap_a_b = CircuitUnitaryOperation.get_combined_operation_for_swap(a-1, b-1, N-1)
-        combined_operation_fredkin = CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation(combined_operation_swap_a_b)
-        return np.dot(np.dot(combined_operation_swap_control_0, combined_operation_fredkin), combined_operation_swap_control_0)
+        permutation = CircuitUnitaryOperation.get_permutation_for_fredkin(control, a, b, N)
+        return CircuitUnitaryOperation.__get_cached(('fredkin', control, a, b, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_permutation(permutation))
 
     @staticmethod
     def get_combined_operation_for_toffoli(control_a, control_b, target, N):
         if control_a == control_b or control_a == target or control_b == target:
             raise ValueError(f'Toffoli gate not supported for control_a = {control_a}, control_b = {control_b}, and target = {target}')
-        if control_b != 0 and target != 0:
-            combined_operation_swap_control_a_0 = CircuitUnitaryOperation.get_combined_operation_for_swap(control_a, 0, N)
-            combined_operation_cnot_control_b_target = CircuitUnitaryOperation.get_combined_operation_for_cnot(control_b-1, target-1, N-1)
-            combined_operation_toffoli = CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation(combined_operation_cnot_control_b_target)
-            return np.dot(np.dot(combined_operation_swap_control_a_0, combined_operation_toffoli), combined_operation_swap_control_a_0)
-        elif control_b == 0:
-            return CircuitUnitaryOperation.get_combined_operation_for_toffoli(control_b, control_a, target, N)
-        else:
-            combined_operation_swap_control_a_target = CircuitUnitaryOperation.get_combined_operation_for_swap(control_a, target, N)
-            combined_operation_toffoli = CircuitUnitaryOperation.get_combined_operation_for_toffoli(target, control_b, control_a, N)
-            return np.dot(np.dot(combined_operation_swap_control_a_target, combined_operation_toffoli), combined_operation_swap_control_a_target)
+        permutation = CircuitUnitaryOperation.get_permutation_for_toffoli(control_a, control_b, target, N)
+        return CircuitUnitaryOperation.__get_cached(('toffoli', control_a, control_b, target, N), lambda: CircuitUnitaryOperation.get_combined_operation_for_permutation(permutation))
+
+    @staticmethod
+    def get_combined_operation_for_permutation(permutation):
+        # Row i of the permutation matrix selects entry permutation[i] of the state vector
+        return np.eye(len(permutation), dtype=complex)[permutation]
+
+    """
+    Index maps for gates that permute the computational basis states (Pauli X, CNOT, SWAP, Toffoli, Fredkin).
+    Applying the gate to a state vector psi gives the state vector psi[permutation].
+    The index maps are computed once per gate, qubits and N and cached in operator_cache.
+    """
+
+    @staticmethod
+    def __get_bits(index, q, N):
+        # Qubit 0 is the most significant bit of the basis state index
+        return (index >> (N-q-1)) & 1
+
+    @staticmethod
+    def __get_control_mask(index, controls, N):
+        mask = np.ones(len(index), dtype=bool)
+        for control in controls:
+            mask &= CircuitUnitaryOperation.__get_bits(index, control, N) == 1
+        return mask
+
+    @staticmethod
+    def get_permutation_for_multi_controlled_pauli_x(controls, target, N):
+        def build():
+            index = np.arange(2**N)
+            mask = CircuitUnitaryOperation.__get_control_mask(index, controls, N)
+            return np.where(mask, index ^ (1 << (N-target-1)), index)
+        return CircuitUnitaryOperation.__get_cached(('permutation_x', tuple(controls), target, N), build)
+
+    @staticmethod
+    def get_permutation_for_controlled_swap(controls, a, b, N):
+        def build():
+            index = np.arange(2**N)
+            mask = CircuitUnitaryOperation.__get_control_mask(index, controls, N)
+            # Only basis states for which qubits a and b differ are affected, flipping both bits swaps them
+            mask &= CircuitUnitaryOperation.__get_bits(index, a, N) != CircuitUnitaryOperation.__get_bits(index, b, N)
+            return np.where(mask, index ^ ((1 << (N-a-1)) | (1 << (N-b-1))), index)
+        return CircuitUnitaryOperation.__get_cached(('permutation_swap', tuple(controls), a, b, N), build)
+
+    @staticmethod
+    def get_permutation_for_pauli_x(q, N):
+        return CircuitUnitaryOperation.get_permutation_for_multi_controlled_pauli_x([], q, N)
+
+    @staticmethod
+    def get_permutation_for_cnot(control, target, N):
+        return CircuitUnitaryOperation.get_permutation_for_multi_controlled_pauli_x([control], target, N)
+
+    @staticmethod
+    def get_permutation_for_toffoli(control_a, control_b, target, N):
+        return CircuitUnitaryOperation.get_permutation_for_multi_controlled_pauli_x([control_a, control_b], target, N)
+
+    @staticmethod
+    def get_permutation_for_multi_controlled_pauli_x_operation(N):
+        return CircuitUnitaryOperation.get_permutation_for_multi_controlled_pauli_x(list(range(N-1)), N-1, N)
+
+    @staticmethod
+    def get_permutation_for_swap(a, b, N):
+        return CircuitUnitaryOperation.get_permutation_for_controlled_swap([], a, b, N)
+
+    @staticmethod
+    def get_permutation_for_fredkin(control, a, b, N):
+        return CircuitUnitaryOperation.get_permutation_for_controlled_swap([control], a, b, N)
     
     @staticmethod
     def get_combined_operation_for_unitary_operation_general(operation, target, N):
@@ -360,78 +497,364 @@ class CircuitUnitaryOperation:
         combined_operation[2**N-1,2**N-2] = 1 - combined_operation[2**N-1,2**N-2]
         combined_operation[2**N-1,2**N-1] = 1 - combined_operation[2**N-1,2**N-1]
         return combined_operation
+
+    """
+    Functions to obtain the 2^N diagonal of diagonal operations (Pauli Z, phase, rotate Z, and controlled versions).
+    A diagonal operation is applied to a state vector by an elementwise multiplication.
+    """
+    @staticmethod
+    def get_combined_diagonal_for_qubit(diagonal, q, N):
+        return np.kron(np.kron(np.ones(2**q), diagonal), np.ones(2**(N-q-1)))
+
+    @staticmethod
+    def get_combined_diagonal_for_controlled_qubit_operation(diagonal, control, target, N):
+        combined_diagonal = np.ones((2,)*N, dtype=complex)
+        index = [slice(None)]*N
+        index[control] = 1
+        shape = [1]*(N-1)
+        shape[target - (1 if control < target else 0)] = 2
+        combined_diagonal[tuple(index)] = np.reshape(diagonal, shape)
+        return combined_diagonal.flatten()
+
+    @staticmethod
+    def get_combined_diagonal_for_multi_controlled_pauli_z_operation(N):
+        combined_diagonal = np.ones(2**N, dtype=complex)
+        combined_diagonal[2**N-1] = -1
+        return combined_diagonal
     
+"""
+Functions to obtain 2^N x 2^N unitary operations on quantum circuits of N qubits as sparse CSR matrices.
+The operations are built directly with sparse Kronecker products and require O(2^N) memory instead of O(4^N).
+"""
+class SparseCircuitUnitaryOperation:
+
+    @staticmethod
+    def __kron(factors):
+        combined_operation = scipy.sparse.identity(1, dtype=complex, format='csr')
+        for factor in factors:
+            combined_operation = scipy.sparse.kron(combined_operation, factor, format='csr')
+        return combined_operation
+
+    @staticmethod
+    def get_dense_operation(operation):
+        # Matrix view of an operation, sparse operations are converted to a dense 2^N x 2^N matrix
+        if scipy.sparse.issparse(operation):
+            return operation.toarray()
+        return operation
+
+    @staticmethod
+    def get_combined_operation_for_qubit(operation, q, N):
+        return SparseCircuitUnitaryOperation.get_combined_operation_for_unitary_operation_general(operation, q, N)
+
+    @staticmethod
+    def get_combined_operation_for_unitary_operation_general(operation, target, N):
+        # Qubit target is the first qubit on which the unitary operation will be applied
+        k = int(round(math.log(operation.shape[0], 2)))
+        identity_before = scipy.sparse.identity(2**target, dtype=complex, format='csr')
+        identity_after = scipy.sparse.identity(2**(N-target-k), dtype=complex, format='csr')
+        return SparseCircuitUnitaryOperation.__kron([identity_before, scipy.sparse.csr_matrix(operation, dtype=complex), identity_after])
+
+    @staticmethod
+    def get_combined_operation_for_controlled_qubit_operation(operation, control, target, N):
+        return SparseCircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(operation, control, target, N)
+
+    @staticmethod
+    def get_combined_operation_for_controlled_unitary_operation_general(operation, control, target, N):
+        # Qubit control is the control
+        # Qubit target is the first qubit on which the unitary operation will be applied
+        # The operation equals the identity plus (operation - identity) on the subspace where the control qubit is 1
+        k = int(round(math.log(operation.shape[0], 2)))
+        identity = scipy.sparse.identity(2, dtype=complex, format='csr')
+        ket_bra_11 = scipy.sparse.csr_matrix(Dirac.ket_bra(2,1,1), dtype=complex)
+        difference = scipy.sparse.csr_matrix(operation, dtype=complex) - scipy.sparse.identity(2**k, dtype=complex, format='csr')
+        factors = []
+        i = 0
+        while i < N:
+            if control == i:
+                factors.append(ket_bra_11)
+                i = i + 1
+            elif target == i:
+                factors.append(difference)
+                i = i + k
+            else:
+                factors.append(identity)
+                i = i + 1
+        combined_operation = scipy.sparse.identity(2**N, dtype=complex, format='csr') + SparseCircuitUnitaryOperation.__kron(factors)
+        combined_operation.eliminate_zeros()
+        return combined_operation
+
+    @staticmethod
+    def get_combined_operation_for_diagonal(diagonal):
+        return scipy.sparse.diags(np.asarray(diagonal, dtype=complex), format='csr')
+
+    @staticmethod
+    def get_combined_operation_for_permutation(permutation):
+        # Row i of the permutation matrix selects entry permutation[i] of the state vector
+        size = len(permutation)
+        return scipy.sparse.csr_matrix((np.ones(size, dtype=complex), (np.arange(size), permutation)), shape=(size, size))
+
+"""
+Validation modes for the unitarity check of operations applied to a state vector.
+OFF skips the check, ONCE checks every distinct operation once and remembers it in a validation cache,
+ALWAYS checks every operation each time it is applied.
+"""
+class ValidationMode:
+    OFF = "off"
+    ONCE = "once"
+    ALWAYS = "always"
+
 """
 Class representing the quantum state of a quantum circuit of N qubits.
 """
 class StateVector:
     
-    def __init__(self, N):
+    def __init__(self, N, validation: str = ValidationMode.ALWAYS, validation_cache: set = None, dtype=np.complex128, in_place: bool = False):
+        if validation not in [ValidationMode.OFF, ValidationMode.ONCE, ValidationMode.ALWAYS]:
+            raise ValueError(f'Unknown validation mode {validation}')
+        if np.dtype(dtype) not in [np.dtype(np.complex64), np.dtype(np.complex128)]:
+            raise ValueError(f'Unsupported precision {dtype}, use numpy.complex64 or numpy.complex128')
         self.N = N
         self.index = 0
-        self.state_vector = np.zeros((2**self.N, 1), dtype=complex)
+        # Precision of the amplitudes, operations are converted to this precision when they are applied
+        self.dtype = np.dtype(dtype)
+        self.state_vector = np.zeros((2**self.N, 1), dtype=self.dtype)
         self.state_vector[self.index] = 1
+        self.validation = validation
+        self.validation_cache = set() if validation_cache is None else validation_cache
+        # In place mode the kernels alternate between two preallocated buffers instead of allocating a new state per operation
+        self.in_place = in_place
+        self.__buffers = [self.state_vector, np.empty_like(self.state_vector)] if in_place else []
+
+    def __get_output_buffer(self, shape):
+        # Buffer that does not hold the current state, or None to let numpy allocate a new array
+        if not self.in_place:
+            return None
+        buffer = self.__buffers[1] if np.may_share_memory(self.state_vector, self.__buffers[0]) else self.__buffers[0]
+        return buffer.reshape(shape)
+
+    def __validate(self, operation, is_unitary, message):
+        # Depending on the validation mode the check is skipped, done once per distinct operation, or always done
+        if self.validation == ValidationMode.OFF:
+            return
+        key = None
+        if self.validation == ValidationMode.ONCE:
+            key = StateVector.__get_validation_key(operation)
+            if key in self.validation_cache:
+                return
+        if not is_unitary(operation):
+            raise ValueError(message)
+        if key is not None:
+            self.validation_cache.add(key)
 
-    def apply_unitary_operation(self, operation):
+    @staticmethod
+    def __get_validation_key(operation):
+        if scipy.sparse.issparse(operation):
+            operation = operation.tocsr()
+            return (operation.shape, 'csr', hash(operation.data.tobytes() + operation.indices.tobytes() + operation.indptr.tobytes()))
+        return (operation.shape, operation.dtype.str, hash(np.ascontiguousarray(operation).tobytes()))
+
+    @staticmethod
+    def __get_tolerance(operation):
+        # Operations in single precision are only unitary up to the precision of complex64
+        return 1e-5 if operation.dtype == np.complex64 else 1e-8
+
+    @staticmethod
+    def __is_unitary_matrix(operation):
+        atol = StateVector.__get_tolerance(operation)
+        if scipy.sparse.issparse(operation):
+            difference = operation.conj().T.dot(operation) - scipy.sparse.identity(operation.shape[0], format='csr')
+            return np.allclose(difference.data, 0, atol=atol)
+        return np.allclose(np.eye(operation.shape[0]), np.dot(np.conj(operation.T), operation), atol=atol)
+
+    @staticmethod
+    def __is_unitary_diagonal(diagonal):
+        return np.allclose(np.abs(diagonal), 1, atol=StateVector.__get_tolerance(diagonal))
+
+    def __validate_matrix(self, operation):
         # Check if operation is a unitary matrix
-        if not np.allclose(np.eye(2**self.N), np.dot(np.conj(operation.T), operation)):
-            raise ValueError("Input matrix is not unitary")
-        self.state_vector = np.dot(operation, self.state_vector)
+        self.__validate(operation, StateVector.__is_unitary_matrix, "Input matrix is not unitary")
+
+    def __validate_diagonal(self, diagonal):
+        # Check if the diagonal matrix is unitary, i.e. all entries are on the unit circle
+        self.__validate(np.asarray(diagonal), StateVector.__is_unitary_diagonal, "Input diagonal is not unitary")
+
+    def __convert(self, operation):
+        # Convert the operation to the precision of the state vector, no copy is made when the precision matches
+        if scipy.sparse.issparse(operation):
+            return operation if operation.dtype == self.dtype else operation.astype(self.dtype)
+        return np.asarray(operation, dtype=self.dtype)
+
+    def apply_unitary_operation(self, operation):
+        # The operation is either a dense matrix or a sparse matrix
+        self.__validate_matrix(operation)
+        self.state_vector = self.__apply_operation(operation)
 
     def apply_noisy_operation(self, operation):
         # A noisy operation does not have to be a unitary matrix
-        self.state_vector = np.dot(operation, self.state_vector)
+        self.state_vector = self.__apply_operation(operation)
+
+    def __apply_operation(self, operation):
+        operation = self.__convert(operation)
+        if scipy.sparse.issparse(operation):
+            # Sparse matrix products do not support an output argument
+            return operation.dot(self.state_vector)
+        return np.dot(operation, self.state_vector, out=self.__get_output_buffer((2**self.N, 1)))
+
+    def apply_permutation(self, permutation):
+        # A permutation of the basis states is unitary by construction, the amplitudes are gathered in the new order
+        self.state_vector = np.take(self.state_vector, permutation, axis=0, out=self.__get_output_buffer((2**self.N, 1)))
+
+    def apply_diagonal_operation(self, diagonal):
+        self.__validate_diagonal(diagonal)
+        self.state_vector = np.multiply(self.state_vector, np.reshape(self.__convert(diagonal), (2**self.N, 1)), out=self.__get_output_buffer((2**self.N, 1)))
+
+    def apply_diagonal_operation_on_qubit(self, diagonal, q):
+        # Factored form of a diagonal operation on a single qubit, only the two diagonal entries are needed
+        self.__validate_diagonal(diagonal)
+        shape = (2**q, 2, 2**(self.N-q-1))
+        psi = self.state_vector.reshape(shape)
+        self.state_vector = np.multiply(psi, np.reshape(self.__convert(diagonal), (2, 1)), out=self.__get_output_buffer(shape)).reshape(2**self.N, 1)
+
+    def apply_unitary_operation_on_qubit(self, operation, q):
+        self.__validate_matrix(operation)
+        self.state_vector = self.__apply_operation_on_qubit(operation, q)
+
+    def apply_noisy_operation_on_qubit(self, operation, q):
+        # A noisy operation does not have to be a unitary matrix
+        self.state_vector = self.__apply_operation_on_qubit(operation, q)
+
+    def apply_unitary_operation_on_qubits(self, operation, qubits):
+        # A 2^k x 2^k operation on k qubits is a controlled operation without control qubits
+        self.apply_controlled_unitary_operation_on_qubits(operation, [], qubits)
+
+    def apply_noisy_operation_on_qubits(self, operation, qubits):
+        # A noisy operation does not have to be a unitary matrix
+        self.state_vector = self.__apply_controlled_operation_on_qubits(operation, [], qubits)
+
+    def apply_controlled_unitary_operation_on_qubit(self, operation, control, target):
+        self.apply_controlled_unitary_operation_on_qubits(operation, [control], [target])
+
+    def apply_controlled_unitary_operation_on_qubits(self, operation, controls, targets):
+        self.__validate_matrix(operation)
+        self.state_vector = self.__apply_controlled_operation_on_qubits(operation, controls, targets)
+
+    def __apply_controlled_operation_on_qubits(self, operation, controls, targets):
+        # Only the amplitudes for which all control qubits are 1 are affected by the operation.
+        # These amplitudes form a view of shape (2,)*(N - len(controls)) into a copy of the state vector,
+        # the operation is applied to the target axes of this view by a tensor contraction.
+        state_vector = self.__get_output_buffer((2**self.N, 1))
+        if state_vector is None:
+            state_vector = self.state_vector.copy()
+        else:
+            np.copyto(state_vector, self.state_vector)
+        psi = state_vector.reshape((2,)*self.N)
+        index = [slice(None)]*self.N
+        for control in controls:
+            index[control] = 1
+        psi_controlled = psi[tuple(index)]
+        remaining_qubits = [q for q in range(self.N) if q not in controls]
+        axes = [remaining_qubits.index(target) for target in targets]
+        k = len(targets)
+        operation = self.__convert(operation).reshape((2,)*(2*k))
+        result = np.tensordot(operation, psi_controlled, axes=(list(range(k, 2*k)), axes))
+        psi_controlled[...] = np.moveaxis(result, list(range(k)), axes)
+        return state_vector
+
+    def __apply_operation_on_qubit(self, operation, q):
+        # View the state vector as a tensor of shape (2^q, 2, 2^(N-q-1)), the middle axis corresponds to qubit q.
+        # Applying the 2 x 2 operation on that axis only is equivalent to applying the combined 2^N x 2^N operation,
+        # but requires O(2^N) time and memory instead of O(4^N).
+        shape = (2**q, 2, 2**(self.N-q-1))
+        psi = self.state_vector.reshape(shape)
+        return np.matmul(self.__convert(operation), psi, out=self.__get_output_buffer(shape)).reshape(2**self.N, 1)
+
+    def get_reduced_density_matrix(self, q):
+        # View the state vector as a tensor of shape (2^q, 2, 2^(N-q-1)) and contract all axes except the one of qubit q,
+        # rho[a, b] = sum over i, j of psi[i, a, j] * conj(psi[i, b, j]), accumulated in double precision
+        psi = self.state_vector.astype(np.complex128, copy=False).reshape(2**q, 2, 2**(self.N-q-1))
+        return np.tensordot(psi, np.conj(psi), axes=([0, 2], [0, 2]))
+
+    def bloch_vectors(self):
+        # Returns an N x 3 array with the expectation values <X>, <Y> and <Z> of every qubit,
+        # computed from the reduced 2 x 2 density matrices instead of 2^N x 2^N Pauli operations
+        # The state is converted to double precision once and viewed per qubit without copying
+        state_vector = self.state_vector.astype(np.complex128, copy=False)
+        bloch_vectors = np.empty((self.N, 3))
+        for q in range(self.N):
+            psi = state_vector.reshape(2**q, 2, 2**(self.N-q-1))
+            rho = np.tensordot(psi, np.conj(psi), axes=([0, 2], [0, 2]))
+            bloch_vectors[q] = [2*rho[0,1].real, -2*rho[0,1].imag, (rho[0,0] - rho[1,1]).real]
+        return bloch_vectors
 
     def measure_x(self, q):
-        # Compute the real part of <psi|X|psi>
-        X = CircuitUnitaryOperation.get_combined_operation_for_pauli_x(q, self.N)
-        return np.vdot(self.state_vector, X.dot(self.state_vector)).real
+        # Compute the real part of <psi|X|psi> = Tr(rho X)
+        rho = self.get_reduced_density_matrix(q)
+        return 2*rho[0,1].real
     
     def measure_y(self, q):
-        # Compute the real part of <psi|Y|psi>
-        Y = CircuitUnitaryOperation.get_combined_operation_for_pauli_y(q, self.N)
-        return np.vdot(self.state_vector, Y.dot(self.state_vector)).real
+        # Compute the real part of <psi|Y|psi> = Tr(rho Y)
+        rho = self.get_reduced_density_matrix(q)
+        return -2*rho[0,1].imag
 
     def measure_z(self, q):
-        # Compute the real part of <psi|Z|psi>
-        Z = CircuitUnitaryOperation.get_combined_operation_for_pauli_z(q, self.N)
-        return np.vdot(self.state_vector, Z.dot(self.state_vector)).real
+        # Compute the real part of <psi|Z|psi> = Tr(rho Z)
+        rho = self.get_reduced_density_matrix(q)
+        return (rho[0,0] - rho[1,1]).real
+
+    def get_probabilities(self):
+        # Probabilities are accumulated and normalised in double precision, also for a single precision state vector
+        probalities = np.square(np.abs(self.state_vector).astype(np.float64)).flatten()
+        return probalities / np.sum(probalities)
 
     def measure(self) -> str:
-        probalities = np.square(np.abs(self.state_vector)).flatten()
+        probalities = self.get_probabilities()
         self.index = np.random.choice(len(probalities), p=probalities)
         return self.get_classical_state_as_string()
     
-    def measure_qubit(self, q):
-        identity = QubitUnitaryOperation.get_identity()
-        ket_bra_00 = Dirac.ket_bra(2,0,0)
-        ket_bra_11 = Dirac.ket_bra(2,1,1)
-        P0 = np.eye(1,1)
-        P1 = np.eye(1,1)
-        for i in range(self.N):
-            if i == q:
-                P0 = np.kron(P0, ket_bra_00)
-                P1 = np.kron(P1, ket_bra_11)
-            else:
-                P0 = np.kron(P0, identity)
-                P1 = np.kron(P1, identity)
-        prob_0 = np.vdot(self.state_vector, P0.dot(self.state_vector)).real
-        prob_1 = np.vdot(self.state_vector, P1.dot(self.state_vector)).real
-        r = np.random.random()
-        if r <= prob_0:
-            self.state_vector = np.dot(P0,self.state_vector)/np.sqrt(prob_0)
-        else:
-            self.state_vector = np.dot(P1,self.state_vector)/np.sqrt(prob_1)
+    def measure_qubit(self, q) -> int:
+        # View the state vector as a tensor of shape (2^q, 2, 2^(N-q-1)), the middle axis corresponds to qubit q.
+        # The marginal probabilities of qubit q are sums of |psi|^2 over the other axes, accumulated in double precision.
+        shape = (2**q, 2, 2**(self.N-q-1))
+        psi = self.state_vector.reshape(shape)
+        probabilities = np.sum(np.square(np.abs(psi)), axis=(0, 2), dtype=np.float64)
+        # For a noisy circuit, the sum of probabilities may not be equal to one
+        prob_0 = probabilities[0] / np.sum(probabilities)
+        bit = 0 if np.random.random() < prob_0 else 1
+        # Collapse the state in place by zeroing the amplitudes of the other outcome and renormalising the remaining ones.
+        # Outside in place mode recorded states share the array of the state vector, so a copy is collapsed instead
+        if not self.in_place:
+            psi = psi.copy()
+        psi[:, 1-bit, :] = 0
+        psi[:, bit, :] *= 1 / np.sqrt(probabilities[bit])
+        self.state_vector = psi.reshape(2**self.N, 1)
+        return bit
 
     def noisy_measure(self):
         # For a noisy circuit, the sum of probabilities may not be equal to one
-        probalities = np.square(np.abs(self.state_vector)).flatten()
-        probalities = probalities / np.sum(probalities)
+        probalities = self.get_probabilities()
         self.index = np.random.choice(len(probalities), p=probalities)
 
+    def sample(self, shots: int):
+        # Draw all measurement outcomes at once by a binary search of uniform random numbers in the cumulative probabilities.
+        # The outcomes are the integer indices of the classical states, the last outcome is kept as the measured state.
+        cumulative_probabilities = np.cumsum(self.get_probabilities())
+        indices = np.searchsorted(cumulative_probabilities, np.random.random(shots), side='right')
+        indices = np.minimum(indices, 2**self.N - 1).astype(np.int64)
+        if shots > 0:
+            self.index = int(indices[-1])
+        return indices
+
+    def sample_counts(self, shots: int):
+        # Number of occurrences of every classical state, entry i counts classical state i
+        return np.bincount(self.sample(shots), minlength=2**self.N)
+
     def get_quantum_state(self):
         return self.state_vector
 
+    def get_quantum_state_snapshot(self):
+        # In place mode the buffers are overwritten by later operations, so intermediate states are copied
+        return self.state_vector.copy() if self.in_place else self.state_vector
+
     def get_classical_state_as_string(self):
         return Dirac.state_as_string(self.index, self.N)
     
@@ -439,6 +862,557 @@ class StateVector:
         for i, val in enumerate(self.state_vector):
             print(f"{Dirac.state_as_string(i,self.N)} : {val[0]}")
 
+"""
+Class representing the quantum states of a batch of independent executions (trajectories) of a quantum circuit of N qubits.
+The states are stored as one array of shape (B, 2^N), row b is the state vector of trajectory b.
+Operations are either applied to all rows, or given per row as an array of shape (B, 2^k, 2^k) for noisy gates
+of which every trajectory samples its own realisation.
+"""
+class BatchedStateVector:
+
+    def __init__(self, N, batch_size: int, dtype=np.complex128):
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.N = N
+        self.batch_size = batch_size
+        self.dtype = np.dtype(dtype)
+        self.state_vectors = np.zeros((batch_size, 2**self.N), dtype=self.dtype)
+        self.state_vectors[:, 0] = 1
+
+    def apply_operation(self, operation):
+        # Apply a 2^N x 2^N operation to all rows, the operation is either a dense matrix or a sparse matrix
+        self.state_vectors = np.asarray(operation.dot(self.state_vectors.T).T, dtype=self.dtype)
+
+    def apply_permutation(self, permutation, rows=None):
+        if rows is None:
+            self.state_vectors = self.state_vectors[:, permutation]
+        else:
+            self.state_vectors[rows] = self.state_vectors[rows][:, permutation]
+
+    def apply_diagonal_operation(self, diagonal, rows=None):
+        if rows is None:
+            self.state_vectors = self.state_vectors * np.asarray(diagonal, dtype=self.dtype)
+        else:
+            self.state_vectors[rows] = self.state_vectors[rows] * np.asarray(diagonal, dtype=self.dtype)
+
+    def apply_operation_on_qubits(self, operation, qubits, rows=None):
+        # The operation is a 2^k x 2^k matrix applied to all selected rows, or an array of shape (B, 2^k, 2^k)
+        # with one matrix per selected row. The rows are viewed as tensors with one axis per qubit.
+        state_vectors = self.state_vectors if rows is None else self.state_vectors[rows]
+        B = state_vectors.shape[0]
+        k = len(qubits)
+        psi = state_vectors.reshape((B,) + (2,)*self.N)
+        operation = np.asarray(operation, dtype=self.dtype)
+        if operation.ndim == 2:
+            result = np.tensordot(operation.reshape((2,)*(2*k)), psi, axes=(list(range(k, 2*k)), [q+1 for q in qubits]))
+            result = np.moveaxis(result, list(range(k)), [q+1 for q in qubits])
+        else:
+            # One operation per row, contracted by einsum with a subscript per qubit axis
+            letters = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+            if self.N + k + 1 > len(letters):
+                raise ValueError("Too many qubits for a batched operation per row")
+            batch_letter = letters[0]
+            state_letters = list(letters[1:self.N+1])
+            output_letters = list(letters[self.N+1:self.N+k+1])
+            result_letters = list(state_letters)
+            for q, output_letter in zip(qubits, output_letters):
+                result_letters[q] = output_letter
+            subscripts = batch_letter + ''.join(output_letters) + ''.join(state_letters[q] for q in qubits) + ',' + batch_letter + ''.join(state_letters) + '->' + batch_letter + ''.join(result_letters)
+            result = np.einsum(subscripts, operation.reshape((B,) + (2,)*(2*k)), psi)
+        result = result.reshape(B, 2**self.N)
+        if rows is None:
+            self.state_vectors = result
+        else:
+            self.state_vectors[rows] = result
+
+    def apply_gate_instruction(self, instruction, rows=None):
+        if isinstance(instruction, PermutationGateInstruction):
+            self.apply_permutation(instruction.getPermutation(), rows)
+        elif isinstance(instruction, DiagonalGateInstruction):
+            self.apply_diagonal_operation(instruction.getDiagonal(), rows)
+        else:
+            self.apply_operation_on_qubits(instruction.getLocalOperation(), instruction.getQubits(), rows)
+
+    def measure_qubit(self, q):
+        # Measure qubit q in every row and collapse the rows, returns an array with the measured bit of every row
+        psi = self.state_vectors.reshape(self.batch_size, 2**q, 2, 2**(self.N-q-1))
+        probabilities = np.sum(np.square(np.abs(psi)), axis=(1, 3), dtype=np.float64)
+        # For a noisy circuit, the sum of probabilities may not be equal to one
+        prob_0 = probabilities[:, 0] / np.sum(probabilities, axis=1)
+        bits = (np.random.random(self.batch_size) >= prob_0).astype(np.int64)
+        rows = np.arange(self.batch_size)
+        scale = np.zeros((self.batch_size, 2), dtype=self.dtype)
+        scale[rows, bits] = 1 / np.sqrt(probabilities[rows, bits])
+        self.state_vectors = (psi * scale[:, np.newaxis, :, np.newaxis]).reshape(self.batch_size, 2**self.N)
+        return bits
+
+    def get_quantum_states(self):
+        return self.state_vectors
+
+    def get_probabilities(self):
+        # Probabilities of the classical states for every row, normalised in double precision
+        probalities = np.square(np.abs(self.state_vectors).astype(np.float64))
+        return probalities / np.sum(probalities, axis=1, keepdims=True)
+
+    def sample(self):
+        # Draw one measurement outcome per row, returns the integer indices of the classical states
+        cumulative_probabilities = np.cumsum(self.get_probabilities(), axis=1)
+        random_numbers = np.random.random((self.batch_size, 1))
+        indices = np.sum(cumulative_probabilities <= random_numbers, axis=1)
+        return np.minimum(indices, 2**self.N - 1).astype(np.int64)
+
+"""
+Class representing the density matrix of a quantum circuit of N qubits, rho = sum of p |psi><psi|.
+The density matrix is stored as an array of shape (2^N, 2^N). It is not necessarily normalised, after projecting on a
+measurement outcome its trace is the probability of that outcome.
+Noisy gates are applied as channels given by a superoperator S of shape (4^k, 4^k) acting on the row-major vectorised
+density matrix, for a unitary U this is S = U kron conj(U). Viewing the vectorised density matrix as a tensor of 2N qubits,
+the rows of qubit q are on axis q and the columns on axis N+q.
+"""
+class DensityMatrix:
+
+    def __init__(self, N, dtype=np.complex128):
+        self.N = N
+        self.dtype = np.dtype(dtype)
+        self.density_matrix = np.zeros((2**self.N, 2**self.N), dtype=self.dtype)
+        self.density_matrix[0, 0] = 1
+
+    def __apply_on_axes(self, operation, axes):
+        # Contract an operation acting on len(axes) axes of the density matrix viewed as a tensor of 2N qubits
+        k = len(axes)
+        rho = self.density_matrix.reshape((2,)*(2*self.N))
+        result = np.tensordot(np.asarray(operation, dtype=self.dtype).reshape((2,)*(2*k)), rho, axes=(list(range(k, 2*k)), axes))
+        result = np.moveaxis(result, list(range(k)), axes)
+        self.density_matrix = result.reshape(2**self.N, 2**self.N)
+
+    def apply_unitary_operation(self, operation):
+        operation = SparseCircuitUnitaryOperation.get_dense_operation(operation)
+        self.density_matrix = operation @ self.density_matrix @ operation.conj().T
+
+    def apply_unitary_operation_on_qubits(self, operation, qubits):
+        self.apply_channel_on_qubits(np.kron(operation, np.conj(operation)), qubits)
+
+    def apply_channel_on_qubits(self, superoperator, qubits):
+        self.__apply_on_axes(superoperator, list(qubits) + [self.N + q for q in qubits])
+
+    def apply_permutation(self, permutation):
+        self.density_matrix = self.density_matrix[permutation][:, permutation]
+
+    def apply_diagonal_operation(self, diagonal):
+        diagonal = np.asarray(diagonal, dtype=self.dtype)
+        self.density_matrix = diagonal[:, np.newaxis] * self.density_matrix * np.conj(diagonal)[np.newaxis, :]
+
+    def apply_gate_instruction(self, instruction):
+        if isinstance(instruction, PermutationGateInstruction):
+            self.apply_permutation(instruction.getPermutation())
+        elif isinstance(instruction, DiagonalGateInstruction):
+            self.apply_diagonal_operation(instruction.getDiagonal())
+        else:
+            self.apply_unitary_operation_on_qubits(instruction.getLocalOperation(), instruction.getQubits())
+
+    def project_qubit(self, q, bit):
+        # Returns the unnormalised density matrix P rho P for the projection P on outcome bit of qubit q
+        projected = DensityMatrix(self.N, self.dtype)
+        rho = self.density_matrix.reshape(2**q, 2, 2**(self.N-q-1), 2**q, 2, 2**(self.N-q-1)).copy()
+        rho[:, 1-bit] = 0
+        rho[:, :, :, :, 1-bit] = 0
+        projected.density_matrix = rho.reshape(2**self.N, 2**self.N)
+        return projected
+
+    def get_trace(self):
+        return np.trace(self.density_matrix).real
+
+    def get_density_matrix(self):
+        return self.density_matrix
+
+    def get_probabilities(self):
+        # Probabilities of the classical states, normalised in double precision
+        probalities = np.diagonal(self.density_matrix).real.astype(np.float64)
+        return probalities / np.sum(probalities)
+
+    def get_reduced_density_matrix(self, q):
+        rho = self.density_matrix.astype(np.complex128, copy=False).reshape(2**q, 2, 2**(self.N-q-1), 2**q, 2, 2**(self.N-q-1))
+        return np.einsum('iajibj->ab', rho) / self.get_trace()
+
+    def bloch_vectors(self):
+        # Returns an N x 3 array with the expectation values <X>, <Y> and <Z> of every qubit
+        bloch_vectors = np.empty((self.N, 3))
+        for q in range(self.N):
+            rho = self.get_reduced_density_matrix(q)
+            bloch_vectors[q] = [2*rho[0,1].real, -2*rho[0,1].imag, (rho[0,0] - rho[1,1]).real]
+        return bloch_vectors
+
+"""
+Class representing a stabilizer state of N qubits by its tableau, following Aaronson and Gottesman (CHP),
+https://arxiv.org/abs/quant-ph/0406196. Rows 0 to N-1 hold the destabilizers, rows N to 2N-1 the stabilizers and
+row 2N is used as scratch space. Every row is a Pauli string given by its x bits, z bits and sign bit r.
+Clifford gates update the tableau in O(N) and measurements in O(N^2), so circuits of many qubits can be simulated
+as long as every gate is a Clifford gate.
+"""
+class StabilizerTableau:
+
+    def __init__(self, N):
+        self.N = N
+        self.x = np.zeros((2*N + 1, N), dtype=bool)
+        self.z = np.zeros((2*N + 1, N), dtype=bool)
+        self.r = np.zeros(2*N + 1, dtype=bool)
+        # Initial state |0...0>, destabilizers X_q and stabilizers Z_q
+        self.x[np.arange(N), np.arange(N)] = True
+        self.z[np.arange(N, 2*N), np.arange(N)] = True
+
+    def hadamard(self, q):
+        self.r ^= self.x[:, q] & self.z[:, q]
+        self.x[:, q], self.z[:, q] = self.z[:, q].copy(), self.x[:, q].copy()
+
+    def phase(self, q):
+        self.r ^= self.x[:, q] & self.z[:, q]
+        self.z[:, q] ^= self.x[:, q]
+
+    def cnot(self, control, target):
+        self.r ^= self.x[:, control] & self.z[:, target] & ~(self.x[:, target] ^ self.z[:, control])
+        self.x[:, target] ^= self.x[:, control]
+        self.z[:, control] ^= self.z[:, target]
+
+    def pauli_x(self, q):
+        self.r ^= self.z[:, q]
+
+    def pauli_y(self, q):
+        self.r ^= self.x[:, q] ^ self.z[:, q]
+
+    def pauli_z(self, q):
+        self.r ^= self.x[:, q]
+
+    def swap(self, a, b):
+        self.x[:, [a, b]] = self.x[:, [b, a]]
+        self.z[:, [a, b]] = self.z[:, [b, a]]
+
+    @staticmethod
+    def __get_quarter_turns(theta):
+        # Number of quarter turns of a phase gate, None if theta is not a multiple of pi/2
+        quarter_turns = theta / (np.pi / 2)
+        if not np.isclose(quarter_turns, np.round(quarter_turns)):
+            return None
+        return int(np.round(quarter_turns)) % 4
+
+    @staticmethod
+    def is_clifford_instruction(instruction) -> bool:
+        if isinstance(instruction, (Identity, Pauli_X, Pauli_Y, Pauli_Z, Hadamard, CNOT, Controlled_Pauli_Y, Controlled_Pauli_Z, Swap)):
+            return True
+        if isinstance(instruction, (Phase, Rotate_Z)):
+            return StabilizerTableau.__get_quarter_turns(instruction.theta) is not None
+        return False
+
+    def apply_gate_instruction(self, instruction):
+        if isinstance(instruction, Identity):
+            pass
+        elif isinstance(instruction, Pauli_X):
+            self.pauli_x(instruction.targetQubit)
+        elif isinstance(instruction, Pauli_Y):
+            self.pauli_y(instruction.targetQubit)
+        elif isinstance(instruction, Pauli_Z):
+            self.pauli_z(instruction.targetQubit)
+        elif isinstance(instruction, Hadamard):
+            self.hadamard(instruction.targetQubit)
+        elif isinstance(instruction, (Phase, Rotate_Z)):
+            # Rotate_Z equals Phase up to a global phase
+            for _ in range(StabilizerTableau.__get_quarter_turns(instruction.theta)):
+                self.phase(instruction.targetQubit)
+        elif isinstance(instruction, CNOT):
+            self.cnot(instruction.controlQubit, instruction.targetQubit)
+        elif isinstance(instruction, Controlled_Pauli_Z):
+            self.hadamard(instruction.targetQubit)
+            self.cnot(instruction.controlQubit, instruction.targetQubit)
+            self.hadamard(instruction.targetQubit)
+        elif isinstance(instruction, Controlled_Pauli_Y):
+            # CY = S CNOT S^dagger on the target qubit
+            for _ in range(3):
+                self.phase(instruction.targetQubit)
+            self.cnot(instruction.controlQubit, instruction.targetQubit)
+            self.phase(instruction.targetQubit)
+        elif isinstance(instruction, Swap):
+            self.swap(instruction.a, instruction.b)
+        else:
+            raise ValueError(f"Instruction {type(instruction).__name__} is not a Clifford gate supported by the stabilizer tableau")
+
+    def __rowsum(self, h, i):
+        # Multiply the Pauli strings of rows h by the Pauli string of row i, h is an array of row indices
+        x1, z1 = self.x[i].astype(np.int64), self.z[i].astype(np.int64)
+        x2, z2 = self.x[h].astype(np.int64), self.z[h].astype(np.int64)
+        # Exponent of i contributed by every qubit when multiplying the Paulis
+        g = np.where(x1 & z1, z2 - x2, 0) + np.where(x1 & (1 - z1), z2 * (2*x2 - 1), 0) + np.where((1 - x1) & z1, x2 * (1 - 2*z2), 0)
+        exponent = 2*self.r[h].astype(np.int64) + 2*int(self.r[i]) + np.sum(g, axis=1)
+        self.r[h] = np.mod(exponent, 4) == 2
+        self.x[h] ^= self.x[i]
+        self.z[h] ^= self.z[i]
+
+    def measure_qubit(self, q) -> int:
+        # Measure qubit q in the computational basis and update the tableau, returns the measured bit
+        N = self.N
+        anticommuting = np.nonzero(self.x[N:2*N, q])[0]
+        if len(anticommuting) > 0:
+            # Random outcome, a stabilizer anticommutes with Z_q
+            p = N + anticommuting[0]
+            rows = np.nonzero(self.x[:2*N, q])[0]
+            rows = rows[rows != p]
+            if len(rows) > 0:
+                self.__rowsum(rows, p)
+            self.x[p - N], self.z[p - N], self.r[p - N] = self.x[p], self.z[p], self.r[p]
+            self.x[p] = False
+            self.z[p] = False
+            self.z[p, q] = True
+            self.r[p] = np.random.randint(2)
+            return int(self.r[p])
+        # Deterministic outcome, Z_q is a product of stabilizers
+        self.x[2*N] = False
+        self.z[2*N] = False
+        self.r[2*N] = False
+        for i in np.nonzero(self.x[:N, q])[0]:
+            self.__rowsum(np.array([2*N]), i + N)
+        return int(self.r[2*N])
+
+    def get_stabilizers(self):
+        # Returns the stabilizers as strings of Paulis with a sign, for example "+XXI"
+        stabilizers = []
+        for i in range(self.N, 2*self.N):
+            paulis = ''.join('IXZY'[int(x) + 2*int(z)] for x, z in zip(self.x[i], self.z[i]))
+            stabilizers.append(('-' if self.r[i] else '+') + paulis)
+        return stabilizers
+
+"""
+Pauli noise model used by the Pauli frame simulation. After every single-qubit gate a depolarizing error occurs with
+probability single_qubit_error, after every two-qubit gate a two-qubit depolarizing error with probability two_qubit_error
+and every measurement result is flipped with probability measurement_error.
+"""
+class PauliNoiseModel:
+
+    def __init__(self, single_qubit_error: float=0.0, two_qubit_error: float=0.0, measurement_error: float=0.0):
+        for probability in [single_qubit_error, two_qubit_error, measurement_error]:
+            if probability < 0 or probability > 1:
+                raise ValueError("Error probabilities must be between 0 and 1")
+        self.single_qubit_error = single_qubit_error
+        self.two_qubit_error = two_qubit_error
+        self.measurement_error = measurement_error
+
+"""
+Class representing the Pauli frames of many shots of a Clifford circuit relative to a noiseless reference execution.
+For every qubit, x and z hold one bit per shot packed in words of 64 bits, a set bit means that the shot has an extra
+X or Z error on that qubit compared to the reference. Clifford gates conjugate the frames with bitwise operations on all
+shots at once. The frames of Z start random, which makes measurements with a random outcome random for every shot.
+"""
+class PauliFrames:
+
+    def __init__(self, N, shots: int):
+        if shots < 1:
+            raise ValueError("Number of shots must be at least 1")
+        self.N = N
+        self.shots = shots
+        self.words = (shots + 63) // 64
+        self.x = np.zeros((N, self.words), dtype=np.uint64)
+        self.z = np.random.randint(0, 2**64, size=(N, self.words), dtype=np.uint64)
+
+    def pack_bits(self, bits):
+        # Pack an array of bits with the shots on the last axis into words of 64 bits
+        bits = np.asarray(bits, dtype=bool)
+        padded = np.zeros(bits.shape[:-1] + (64*self.words,), dtype=bool)
+        padded[..., :self.shots] = bits
+        return np.packbits(padded, axis=-1, bitorder='little').view(np.uint64)
+
+    def unpack_bits(self, words):
+        # Unpack words of 64 bits into an array of bits with the shots on the last axis
+        bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1, bitorder='little')
+        return bits[..., :self.shots]
+
+    def random_bits(self, probability: float):
+        return self.pack_bits(np.random.random(self.shots) < probability)
+
+    def hadamard(self, q):
+        self.x[q], self.z[q] = self.z[q].copy(), self.x[q].copy()
+
+    def phase(self, q):
+        self.z[q] ^= self.x[q]
+
+    def cnot(self, control, target):
+        self.x[target] ^= self.x[control]
+        self.z[control] ^= self.z[target]
+
+    def controlled_pauli_z(self, a, b):
+        self.z[a] ^= self.x[b]
+        self.z[b] ^= self.x[a]
+
+    def swap(self, a, b):
+        self.x[[a, b]] = self.x[[b, a]]
+        self.z[[a, b]] = self.z[[b, a]]
+
+    def apply_gate_instruction(self, instruction):
+        # Paulis and the identity commute with the frames up to a sign, which does not change measurement results
+        if isinstance(instruction, Hadamard):
+            self.hadamard(instruction.targetQubit)
+        elif isinstance(instruction, (Phase, Rotate_Z)):
+            if round(instruction.theta / (np.pi / 2)) % 2 == 1:
+                self.phase(instruction.targetQubit)
+        elif isinstance(instruction, CNOT):
+            self.cnot(instruction.controlQubit, instruction.targetQubit)
+        elif isinstance(instruction, Controlled_Pauli_Z):
+            self.controlled_pauli_z(instruction.controlQubit, instruction.targetQubit)
+        elif isinstance(instruction, Controlled_Pauli_Y):
+            self.phase(instruction.targetQubit)
+            self.cnot(instruction.controlQubit, instruction.targetQubit)
+            self.phase(instruction.targetQubit)
+        elif isinstance(instruction, Swap):
+            self.swap(instruction.a, instruction.b)
+
+    def depolarize(self, qubits, probability: float):
+        # With the given probability, apply one of the 4^k - 1 non-identity Paulis on the k qubits, chosen uniformly
+        if probability == 0:
+            return
+        k = len(qubits)
+        errors = np.random.random(self.shots) < probability
+        paulis = np.random.randint(1, 4**k, size=self.shots)
+        for i, q in enumerate(qubits):
+            self.x[q] ^= self.pack_bits(errors & ((paulis >> (2*i)) & 1 == 1))
+            self.z[q] ^= self.pack_bits(errors & ((paulis >> (2*i + 1)) & 1 == 1))
+
+    def measure_qubit(self, q):
+        # Returns the packed flips of the measurement results compared to the reference. After the measurement
+        # the phase of the collapsed qubit is undetermined, so its Z frame is randomised
+        flips = self.x[q].copy()
+        self.z[q] = np.random.randint(0, 2**64, size=self.words, dtype=np.uint64)
+        return flips
+
+"""
+Class representing the quantum state of N qubits as a matrix product state, a chain of tensors of shape (chi_left, 2, chi_right)
+with qubit 0 as the first tensor. The state is kept in mixed canonical form around an orthogonality center, so the
+singular values of a bond next to the center are its Schmidt coefficients and truncating them is optimal.
+Gates on k qubits are applied by contracting k neighbouring tensors, qubits that are not neighbours are first swapped next to each other.
+After every gate the tensors are split again using singular value decompositions, keeping at most max_bond_dimension singular
+values and discarding the smallest ones as long as their total weight is at most cutoff. The discarded weights are summed in truncation_error.
+"""
+class MatrixProductState:
+
+    def __init__(self, N, max_bond_dimension: int=None, cutoff: float=1e-12, dtype=np.complex128):
+        if max_bond_dimension is not None and max_bond_dimension < 1:
+            raise ValueError("Maximum bond dimension must be at least 1")
+        self.N = N
+        self.max_bond_dimension = max_bond_dimension
+        self.cutoff = cutoff
+        self.dtype = np.dtype(dtype)
+        self.truncation_error = 0.0
+        self.tensors = []
+        for _ in range(N):
+            tensor = np.zeros((1, 2, 1), dtype=self.dtype)
+            tensor[0, 0, 0] = 1
+            self.tensors.append(tensor)
+        self.center = 0
+
+    def __move_center(self, q):
+        # Move the orthogonality center to qubit q using QR decompositions
+        while self.center < q:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            Q, R = np.linalg.qr(tensor.reshape(left*2, right))
+            self.tensors[self.center] = Q.reshape(left, 2, Q.shape[1])
+            self.tensors[self.center + 1] = np.tensordot(R, self.tensors[self.center + 1], axes=([1], [0]))
+            self.center = self.center + 1
+        while self.center > q:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            Q, R = np.linalg.qr(tensor.reshape(left, 2*right).T)
+            self.tensors[self.center] = Q.T.reshape(Q.shape[1], 2, right)
+            self.tensors[self.center - 1] = np.tensordot(self.tensors[self.center - 1], R.T, axes=([2], [0]))
+            self.center = self.center - 1
+
+    def __truncate(self, singular_values):
+        # Returns the number of singular values to keep and the kept singular values, rescaled to keep the norm
+        weights = np.square(singular_values)
+        total = np.sum(weights)
+        # Discarded weight when keeping the first chi singular values
+        discarded = np.append(np.cumsum(weights[::-1])[::-1], 0)
+        chi = max(1, int(np.argmax(discarded <= self.cutoff * total)))
+        if self.max_bond_dimension is not None:
+            chi = min(chi, self.max_bond_dimension)
+        self.truncation_error = self.truncation_error + discarded[chi] / total
+        return chi, singular_values[:chi] * np.sqrt(total / np.sum(weights[:chi]))
+
+    def __apply_on_block(self, operation, start, k):
+        # Apply a 2^k x 2^k operation on the neighbouring qubits start, ..., start+k-1
+        self.__move_center(start)
+        theta = self.tensors[start]
+        for j in range(1, k):
+            theta = np.tensordot(theta, self.tensors[start + j], axes=([-1], [0]))
+        left, right = theta.shape[0], theta.shape[-1]
+        theta = np.einsum('ij,ljr->lir', np.asarray(operation, dtype=self.dtype), theta.reshape(left, 2**k, right))
+        for j in range(k - 1):
+            U, S, Vh = np.linalg.svd(theta.reshape(left*2, -1), full_matrices=False)
+            chi, S = self.__truncate(S)
+            self.tensors[start + j] = U[:, :chi].reshape(left, 2, chi)
+            theta = S[:, np.newaxis] * Vh[:chi]
+            left = chi
+        self.tensors[start + k - 1] = theta.reshape(left, 2, right)
+        self.center = start + k - 1
+
+    def apply_operation_on_qubits(self, operation, qubits):
+        qubits = list(qubits)
+        k = len(qubits)
+        if k == 1:
+            self.tensors[qubits[0]] = np.einsum('ij,ljr->lir', np.asarray(operation, dtype=self.dtype), self.tensors[qubits[0]])
+            return
+        # Reorder the axes of the operation to the order of the qubits in the chain
+        order = list(np.argsort(qubits))
+        sorted_qubits = [qubits[i] for i in order]
+        operation = np.asarray(operation).reshape((2,)*(2*k)).transpose(order + [k + i for i in order]).reshape(2**k, 2**k)
+        # Swap the qubits next to the first one and swap them back afterwards
+        swap = CircuitUnitaryOperation.get_combined_operation_for_swap(0, 1, 2)
+        swaps = []
+        start = sorted_qubits[0]
+        for i in range(1, k):
+            position = sorted_qubits[i]
+            while position > start + i:
+                self.__apply_on_block(swap, position - 1, 2)
+                swaps.append(position - 1)
+                position = position - 1
+        self.__apply_on_block(operation, start, k)
+        for position in reversed(swaps):
+            self.__apply_on_block(swap, position, 2)
+
+    def apply_gate_instruction(self, instruction):
+        self.apply_operation_on_qubits(instruction.getLocalOperation(), instruction.getQubits())
+
+    def measure_qubit(self, q) -> int:
+        # Measure qubit q and collapse the state, with the center at q the probabilities follow from its tensor alone
+        self.__move_center(q)
+        tensor = self.tensors[q]
+        probabilities = np.sum(np.square(np.abs(tensor)), axis=(0, 2), dtype=np.float64)
+        bit = int(np.random.random() >= probabilities[0] / np.sum(probabilities))
+        tensor = tensor.copy()
+        tensor[:, 1 - bit, :] = 0
+        self.tensors[q] = tensor / np.sqrt(probabilities[bit])
+        return bit
+
+    def sample(self, shots: int):
+        # Draw many measurement outcomes without collapsing the state, returns integer indices of the classical states.
+        # With the center at qubit 0 all other tensors are right-normalised, so the qubits are sampled from left to right
+        # using only the amplitudes conditioned on the bits drawn so far
+        self.__move_center(0)
+        indices = np.zeros(shots, dtype=np.int64)
+        amplitudes = np.ones((shots, 1), dtype=self.dtype)
+        for q in range(self.N):
+            conditioned = np.einsum('sl,lpr->spr', amplitudes, self.tensors[q])
+            probabilities = np.sum(np.square(np.abs(conditioned)), axis=2, dtype=np.float64)
+            bits = (np.random.random(shots) * np.sum(probabilities, axis=1) >= probabilities[:, 0]).astype(np.int64)
+            amplitudes = conditioned[np.arange(shots), bits] / np.sqrt(probabilities[np.arange(shots), bits])[:, np.newaxis]
+            indices = 2*indices + bits
+        return indices
+
+    def get_bond_dimensions(self):
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def get_quantum_state(self):
+        # Contract the chain into a state vector of shape (2^N, 1), only feasible for a small number of qubits
+        psi = self.tensors[0]
+        for tensor in self.tensors[1:]:
+            psi = np.tensordot(psi, tensor, axes=([-1], [0]))
+        return psi.reshape(2**self.N, 1)
+
 class RegisterPartition:
     """
     This object is used splice up the classical bit register, 
@@ -513,33 +1487,621 @@ class ClassicalBitRegister:
             return output
 
 
-    def print(self):
-        print(self.toString())
+    def print(self):
+        print(self.toString())
+
+"""
+Records the intermediate quantum states of an execution of a circuit. The circuit calls start before the execution with
+the number of qubits, the precision and the maximum number of steps, and record after the initial state and after every
+operation. This recorder keeps every intermediate state, the other recorders bound the memory that is used.
+"""
+class StateRecorder:
+
+    def __init__(self):
+        self.states = []
+        self.steps = []
+        self.step = 0
+        self.started = False
+
+    def start(self, N: int, dtype=np.complex128, max_steps: int=0):
+        self.states = []
+        self.steps = []
+        self.step = 0
+        self.started = True
+
+    def record(self, state_vector):
+        if self.keep(self.step):
+            self.store(state_vector)
+            self.steps.append(self.step)
+        self.step = self.step + 1
+
+    def keep(self, step: int) -> bool:
+        return True
+
+    def store(self, state_vector):
+        self.states.append(state_vector.get_quantum_state_snapshot())
+
+    """
+    Returns the recorded quantum states as column vectors, in the order in which they were recorded.
+    """
+    def get_states(self):
+        return list(self.states)
+
+    """
+    Returns the step of every recorded quantum state, step 0 is the initial state and step i the state after operation i.
+    """
+    def get_steps(self):
+        return list(self.steps)
+
+"""
+Records no intermediate quantum states, for example in benchmarks.
+"""
+class NoStateRecorder(StateRecorder):
+
+    def keep(self, step: int) -> bool:
+        return False
+
+"""
+Records the initial quantum state and the state after every k-th operation.
+"""
+class EveryKthStateRecorder(StateRecorder):
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError("Every k-th step must have k >= 1")
+        super().__init__()
+        self.k = k
+
+    def keep(self, step: int) -> bool:
+        return step % self.k == 0
+
+"""
+Records the last capacity quantum states of an execution.
+"""
+class RingBufferStateRecorder(StateRecorder):
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("Ring buffer must have a capacity of at least 1")
+        super().__init__()
+        self.capacity = capacity
+
+    def start(self, N: int, dtype=np.complex128, max_steps: int=0):
+        super().start(N, dtype, max_steps)
+        self.states = deque(maxlen=self.capacity)
+        self.steps = deque(maxlen=self.capacity)
+
+"""
+Records only the k amplitudes with the largest absolute value of every intermediate quantum state.
+The recorded states are returned with all other amplitudes set to zero.
+"""
+class TopKAmplitudesStateRecorder(StateRecorder):
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError("Number of amplitudes must be at least 1")
+        super().__init__()
+        self.k = k
+
+    def start(self, N: int, dtype=np.complex128, max_steps: int=0):
+        super().start(N, dtype, max_steps)
+        self.N = N
+        self.dtype = np.dtype(dtype)
+
+    def store(self, state_vector):
+        state = state_vector.get_quantum_state().ravel()
+        if self.k < len(state):
+            indices = np.argpartition(np.abs(state), -self.k)[-self.k:]
+            indices = indices[np.argsort(-np.abs(state[indices]), kind='stable')]
+        else:
+            indices = np.argsort(-np.abs(state), kind='stable')
+        self.states.append((indices, state[indices].copy()))
+
+    """
+    Returns the indices and amplitudes of every recorded quantum state, ordered from the largest absolute value.
+    """
+    def get_amplitudes(self):
+        return list(self.states)
+
+    def get_states(self):
+        states = []
+        for indices, amplitudes in self.states:
+            state = np.zeros((2**self.N, 1), dtype=self.dtype)
+            state[indices, 0] = amplitudes
+            states.append(state)
+        return states
+
+"""
+Streams every intermediate quantum state to a memory-mapped .npy file of shape (max_steps, 2^N), so the states do not
+have to fit in memory. The recorded states are views of rows of the file, the file can be loaded with numpy.load.
+"""
+class MemmapStateRecorder(StateRecorder):
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.memmap = None
+
+    def start(self, N: int, dtype=np.complex128, max_steps: int=0):
+        super().start(N, dtype, max_steps)
+        self.memmap = np.lib.format.open_memmap(self.path, mode='w+', dtype=np.dtype(dtype), shape=(max(max_steps, 1), 2**N))
+
+    def store(self, state_vector):
+        if len(self.steps) >= self.memmap.shape[0]:
+            raise Exception("Number of recorded states exceeds the number of steps of the file")
+        self.memmap[len(self.steps)] = state_vector.get_quantum_state().ravel()
+
+    def get_states(self):
+        return [self.memmap[i].reshape(-1, 1) for i in range(len(self.steps))]
+
+    def flush(self):
+        if self.memmap is not None:
+            self.memmap.flush()
+
+"""
+Columnar store of the descriptions or the gate strings of a circuit. Every gate is stored as an opcode, up to three
+qubits and a parameter in typed arrays, the strings are only generated when they are read. Strings that are appended
+directly, for example by NoisyCircuit or when gates are merged, are kept as they are.
+"""
+class GateLabels:
+    TEXT = -1
+    IDENTITY = 0
+    PAULI_X = 1
+    NOISY_PAULI_X = 2
+    PAULI_Y = 3
+    NOISY_PAULI_Y = 4
+    PAULI_Z = 5
+    NOISY_PAULI_Z = 6
+    HADAMARD = 7
+    NOISY_HADAMARD = 8
+    PHASE = 9
+    NOISY_PHASE = 10
+    ROTATE_X = 11
+    ROTATE_Y = 12
+    ROTATE_Z = 13
+    CNOT = 14
+    NOISY_CNOT = 15
+    CONTROLLED_PAULI_Y = 16
+    CONTROLLED_PAULI_Z = 17
+    CONTROLLED_HADAMARD = 18
+    CONTROLLED_PHASE = 19
+    CONTROLLED_ROTATE_X = 20
+    CONTROLLED_ROTATE_Y = 21
+    CONTROLLED_ROTATE_Z = 22
+    CONTROLLED_UNITARY_OPERATION = 23
+    SWAP = 24
+    FREDKIN = 25
+    TOFFOLI = 26
+    MULTI_CONTROLLED_PAULI_Z = 27
+    MULTI_CONTROLLED_PAULI_X = 28
+    MEASUREMENT = 29
+    RESET = 30
+    NOISY_RESET = 31
+    RECOVERY_PHASE_FLIP = 32
+    RECOVERY_BIT_FLIP = 33
+
+    # Description, character on the other qubits and characters on the qubits of the gate for every opcode
+    LABELS = {
+        IDENTITY: ("Identity on qubit {0}", '.', ''),
+        PAULI_X: ("Pauli X on qubit {0}", '.', 'X'),
+        NOISY_PAULI_X: ("Noisy Pauli X on qubit {0}", '.', 'X'),
+        PAULI_Y: ("Pauli Y on qubit {0}", '.', 'Y'),
+        NOISY_PAULI_Y: ("Noisy Pauli Y on qubit {0}", '.', 'Y'),
+        PAULI_Z: ("Pauli Z on qubit {0}", '.', 'Z'),
+        NOISY_PAULI_Z: ("Noisy Pauli Z on qubit {0}", '.', 'Z'),
+        HADAMARD: ("Hadamard on qubit {0}", '.', 'H'),
+        NOISY_HADAMARD: ("Noisy Hadamard on qubit {0}", '.', 'H'),
+        PHASE: ("Phase with theta = {theta:.3f} {pi} on qubit {0}", '.', 'S'),
+        NOISY_PHASE: ("Noisy X rotation of {parameter} on qubit {0}", '.', 'X'),
+        ROTATE_X: ("Rotate X with theta = {theta:.3f} {pi} on qubit {0}", '.', 'R'),
+        ROTATE_Y: ("Rotate Y with theta = {theta:.3f} {pi} on qubit {0}", '.', 'R'),
+        ROTATE_Z: ("Rotate Z with theta = {theta:.3f} {pi} on qubit {0}", '.', 'R'),
+        CNOT: ("CNOT with control qubit {0} and target qubit {1}", '.', '*X'),
+        NOISY_CNOT: ("Noisy CNOT with target qubit {1} and control qubit {0}", '.', '*x'),
+        CONTROLLED_PAULI_Y: ("Controlled Pauli Y with control qubit {0} and target qubit {1}", '.', '*Y'),
+        CONTROLLED_PAULI_Z: ("Controlled Pauli Z with control qubit {0} and target qubit {1}", '.', '*Z'),
+        CONTROLLED_HADAMARD: ("Controlled Hadamard with control qubit {0} and target qubit {1}", '.', '*H'),
+        CONTROLLED_PHASE: ("Controlled phase with theta = {theta:.3f} {pi}, control qubit {0}, and target qubit {1}", '.', '*S'),
+        CONTROLLED_ROTATE_X: ("Controlled rotate X with theta = {theta:.3f} {pi}, control qubit {0}, and target qubit {1}", '.', '*R'),
+        CONTROLLED_ROTATE_Y: ("Controlled rotate Y with theta = {theta:.3f} {pi}, control qubit {0}, and target qubit {1}", '.', '*R'),
+        CONTROLLED_ROTATE_Z: ("Controlled rotate Z with theta = {theta:.3f} {pi}, control qubit {0}, and target qubit {1}", '.', '*R'),
+        CONTROLLED_UNITARY_OPERATION: ("Controlled unitary operation with control qubit {0} and target qubit {1}", '.', '*U'),
+        SWAP: ("SWAP on qubit {0} and qubit {1}", '.', 'xx'),
+        FREDKIN: ("Fredkin with control qubit {0} and SWAP on qubit {1} and qubit {2}", '.', '*xx'),
+        TOFFOLI: ("Toffoli with control qubit {0} and CNOT with control qubit {1} and target qubit {2}", '.', '**x'),
+        MULTI_CONTROLLED_PAULI_Z: ("Multi-controlled Pauli_Z", '*', ''),
+        MULTI_CONTROLLED_PAULI_X: ("Multi-controlled Pauli_X", '*', 'X'),
+        MEASUREMENT: ("Measurement on Qubit {0} projected on bit: {bit}", '.', 'M'),
+        RESET: ("Reset on Qubit {0} read from bit: {bit}", '.', 'R'),
+        NOISY_RESET: ("Noisy reset on Qubit {0} read from bit: {bit}", '.', 'R'),
+        RECOVERY_PHASE_FLIP: ("Phase flip recovery, syndrome extracted from the first 4 bits starting from {bit}", 'P', ''),
+        RECOVERY_BIT_FLIP: ("Bit flip recovery, syndrome extracted from the first 4 bits starting from {bit}", 'B', ''),
+    }
+
+    __UNUSED_QUBITS = ((-1, -1, -1), (-1, -1), (-1,), ())
+
+    def __init__(self, N: int, gates: bool=False):
+        self.N = N
+        self.gates = gates # Gate strings instead of descriptions
+        self.opcodes = array.array('h')
+        self.qubits = array.array('i') # Three qubits for every gate, unused qubits are -1
+        self.parameters = array.array('d')
+        self.texts = {}
+
+    @staticmethod
+    def get_description(opcode: int, qubits, parameter: float=0.0) -> str:
+        description = GateLabels.LABELS[opcode][0]
+        return description.format(*qubits, theta=parameter/np.pi, parameter=parameter, bit=int(parameter), pi=pi_symbol)
+
+    @staticmethod
+    def get_gate_as_string(opcode: int, qubits, N: int) -> str:
+        _, fill, symbols = GateLabels.LABELS[opcode]
+        gate_as_list = [fill]*N
+        for q, symbol in zip(qubits, symbols):
+            gate_as_list[q] = symbol
+        return ''.join(gate_as_list)
+
+    def append_gate(self, opcode: int, qubits: tuple=(), parameter: float=0.0):
+        self.opcodes.append(opcode)
+        self.qubits.extend(qubits + GateLabels.__UNUSED_QUBITS[len(qubits)])
+        self.parameters.append(parameter)
+
+    def append(self, text: str):
+        self.texts[len(self.opcodes)] = text
+        self.append_gate(GateLabels.TEXT)
+
+    def pop(self, index: int=-1) -> str:
+        if index < 0:
+            index = index + len(self.opcodes)
+        label = self[index]
+        del self.opcodes[index]
+        del self.qubits[3*index:3*index + 3]
+        del self.parameters[index]
+        self.texts = {(i - 1 if i > index else i): text for i, text in self.texts.items() if i != index}
+        return label
+
+    """
+    Returns the opcodes, qubits and parameters of the gates as numpy arrays of shape (G,), (G, 3) and (G,).
+    """
+    def get_columns(self):
+        return np.frombuffer(self.opcodes, dtype=np.int16), np.frombuffer(self.qubits, dtype=np.int32).reshape(-1, 3), np.frombuffer(self.parameters, dtype=np.float64)
+
+    def __get_label(self, i: int) -> str:
+        opcode = self.opcodes[i]
+        if opcode == GateLabels.TEXT:
+            return self.texts[i]
+        qubits = [q for q in self.qubits[3*i:3*i + 3] if q >= 0]
+        if self.gates:
+            return GateLabels.get_gate_as_string(opcode, qubits, self.N)
+        return GateLabels.get_description(opcode, qubits, self.parameters[i])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.__get_label(i) for i in range(*index.indices(len(self.opcodes)))]
+        if index < 0:
+            index = index + len(self.opcodes)
+        if index < 0 or index >= len(self.opcodes):
+            raise IndexError("Gate label index out of range")
+        return self.__get_label(index)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __iter__(self):
+        for i in range(len(self.opcodes)):
+            yield self.__get_label(i)
+
+    def __repr__(self):
+        return repr(list(self))
+
+"""
+List of the instructions or operations of a circuit. Every change to the list increases the version of the circuit, an
+execution plan compares this version to detect that the circuit has changed after it was compiled.
+"""
+class GateList(list):
+    __slots__ = ('circuit',)
+
+    def __init__(self, circuit, gates=()):
+        super().__init__(gates)
+        self.circuit = circuit
+
+    def append(self, gate):
+        super().append(gate)
+        self.circuit.version = self.circuit.version + 1
+
+    def extend(self, gates):
+        super().extend(gates)
+        self.circuit.version = self.circuit.version + 1
+
+    def insert(self, index, gate):
+        super().insert(index, gate)
+        self.circuit.version = self.circuit.version + 1
+
+    def pop(self, index=-1):
+        gate = super().pop(index)
+        self.circuit.version = self.circuit.version + 1
+        return gate
+
+    def remove(self, gate):
+        super().remove(gate)
+        self.circuit.version = self.circuit.version + 1
+
+    def clear(self):
+        super().clear()
+        self.circuit.version = self.circuit.version + 1
+
+    def reverse(self):
+        super().reverse()
+        self.circuit.version = self.circuit.version + 1
+
+    def __setitem__(self, index, gate):
+        super().__setitem__(index, gate)
+        self.circuit.version = self.circuit.version + 1
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.circuit.version = self.circuit.version + 1
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        self.circuit.version = self.circuit.version + 1
+
+    def __iadd__(self, gates):
+        self.extend(gates)
+        return self
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self.circuit.version = self.circuit.version + 1
+        return self
+
+"""
+Lazy description of an operation in the operations list of a circuit. Gates are described by their gate instruction, which
+holds the kind of gate, its qubits and its parameters, derived operations by a function that builds them.
+The 2^N x 2^N matrix, dense or sparse, is only built when get_operation is called and is kept afterwards. Executing a
+dense circuit applies the kernel of the gate instruction instead, so the matrix is not needed there.
+Sampled two-qubit noisy gates keep their 4 x 4 operation and qubits, apply applies it directly on these qubits.
+"""
+class GateDescriptor:
+
+    def __init__(self, build, dtype=np.complex128, sparse: bool=False, instruction=None):
+        self.dtype = np.dtype(dtype)
+        self.sparse = sparse
+        self.instruction = instruction
+        self.__build = build
+        self.__operation = None
+        # Operation on a few qubits, applied without building the 2^N x 2^N operation
+        self.local_operation = None
+        self.qubits = None
+
+    @staticmethod
+    def for_instruction(instruction, dtype=np.complex128, sparse: bool=False):
+        return GateDescriptor(instruction.getSparseOperation if sparse else instruction.getOperation, dtype, sparse, instruction)
+
+    @staticmethod
+    def for_operation(operation):
+        # Descriptor of an operation that is already built, for example a sampled noisy gate
+        descriptor = GateDescriptor(None, operation.dtype, scipy.sparse.issparse(operation))
+        descriptor.__operation = operation
+        return descriptor
+
+    @staticmethod
+    def for_local_operation(operation, qubits, N):
+        # Descriptor of an operation on the given qubits, the 2^N x 2^N operation is only built when it is asked for
+        descriptor = GateDescriptor(lambda: CircuitUnitaryOperation.get_combined_operation_for_qubits(operation, qubits, N), operation.dtype)
+        descriptor.local_operation = operation
+        descriptor.qubits = list(qubits)
+        return descriptor
+
+    def is_built(self) -> bool:
+        return self.__operation is not None
+
+    def get_operation(self):
+        if self.__operation is None:
+            operation = self.__build()
+            if self.sparse:
+                self.__operation = scipy.sparse.csr_matrix(operation).astype(self.dtype)
+            else:
+                self.__operation = SparseCircuitUnitaryOperation.get_dense_operation(operation).astype(self.dtype, copy=False)
+            # The function that builds the operation may keep other operations alive
+            self.__build = None
+        return self.__operation
+
+    def apply(self, state_vector):
+        if self.local_operation is not None:
+            # Sampled noisy gates are not exactly unitary
+            state_vector.apply_noisy_operation_on_qubits(self.local_operation, self.qubits)
+        elif self.instruction is not None and not self.sparse:
+            # The kernel of the gate acts on its qubits only, the 2^N x 2^N operation is not built
+            self.instruction.applyOperation(state_vector)
+        else:
+            state_vector.apply_unitary_operation(self.get_operation())
+
+"""
+Execution plan of a circuit, created by Circuit.compile(). Every instruction is resolved once into a kernel of the state
+vector with its arguments bound, for example the permutation of a CNOT, the 2 x 2 operation of a rotation or the angle and
+noise parameters of a noisy gate. The virtual Rz gates of the noisy gates are resolved into phase offsets per qubit.
+Executing the plan calls the kernels in order, only the noisy gates are sampled again on every execution.
+"""
+class ExecutionPlan:
+
+    def __init__(self, circuit):
+        self.circuit = circuit
+        self.steps = []
+        # Phases of the virtual Rz gates up to every noisy gate, relative to the phases of the circuit when the plan is executed
+        self.phi_offsets = [0 for _ in range(circuit.N)]
+        # Version of the circuit that is compiled, the plan cannot be executed after the circuit has changed
+        self.version = circuit.version
+        self.save_instructions = circuit.save_instructions
+        if circuit.save_instructions:
+            for instruction in circuit.instructions:
+                self.__compile_instruction(instruction)
+        else:
+            for operation in circuit.operations:
+                if operation.local_operation is not None:
+                    self.steps.append((StateVector.apply_noisy_operation_on_qubits, (operation.local_operation, operation.qubits), True))
+                elif operation.instruction is not None and not operation.sparse:
+                    self.steps.append(ExecutionPlan.__compile_gate(operation.instruction) + (True,))
+                else:
+                    # Sparse operations and derived operations without a gate instruction are only available as a matrix
+                    self.steps.append((StateVector.apply_unitary_operation, (operation.get_operation(),), True))
+
+    @staticmethod
+    def __compile_gate(instruction):
+        # Resolve the kernel used by applyOperation of the instruction and compute its arguments once
+        apply_operation = type(instruction).applyOperation
+        if apply_operation is PermutationGateInstruction.applyOperation:
+            return StateVector.apply_permutation, (instruction.getPermutation(),)
+        if apply_operation is DiagonalQubitGateInstruction.applyOperation:
+            return StateVector.apply_diagonal_operation_on_qubit, (np.diagonal(instruction.getQubitOperation()), instruction.targetQubit)
+        if apply_operation is DiagonalGateInstruction.applyOperation:
+            return StateVector.apply_diagonal_operation, (instruction.getDiagonal(),)
+        if apply_operation is SingleQubitGateInstruction.applyOperation:
+            return StateVector.apply_unitary_operation_on_qubit, (instruction.getQubitOperation(), instruction.targetQubit)
+        if apply_operation is ControlledQubitGateInstruction.applyOperation:
+            return StateVector.apply_controlled_unitary_operation_on_qubit, (instruction.getQubitOperation(), instruction.controlQubit, instruction.targetQubit)
+        # Other gates, for example fused operations, apply themselves
+        return ExecutionPlan.__apply_gate_instruction, (instruction,)
+
+    @staticmethod
+    def __apply_gate_instruction(state_vector, instruction):
+        instruction.applyOperation(state_vector)
+
+    def __compile_instruction(self, instruction):
+        N = self.circuit.N
+        if isinstance(instruction, Measurement):
+            self.steps.append((self.__measure, (instruction.measureQubit, instruction.dataBit), False))
+        elif isinstance(instruction, Reset):
+            self.steps.append((self.__reset, (instruction.readBit,) + ExecutionPlan.__compile_gate(Pauli_X(N, instruction.targetQubit)), False))
+        elif isinstance(instruction, Recovery_Bit_Flip) or isinstance(instruction, Recovery_Phase_Flip):
+            # Target qubit and recovery gate for every syndrome of 4 bits
+            targets = [instruction.getTargetQubitForSyndrome(format(syndrome, '04b')) for syndrome in range(16)]
+            recovery_gate = Pauli_X if isinstance(instruction, Recovery_Bit_Flip) else Pauli_Z
+            gates = {q: ExecutionPlan.__compile_gate(recovery_gate(N, q)) for q in set(targets) if q >= 0}
+            self.steps.append((self.__recover, (instruction.syndromeStartBit, targets, gates), False))
+        elif isinstance(instruction, NoisyCNOT):
+            self.steps.append((self.__apply_noisy_cnot, (instruction, self.phi_offsets[instruction.c_qubit], self.phi_offsets[instruction.t_qubit]), False))
+        elif isinstance(instruction, NoisyGateInstruction):
+            self.__compile_noisy_qubit_instruction(instruction)
+        else:
+            self.steps.append(ExecutionPlan.__compile_gate(instruction) + (True,))
+
+    def __compile_noisy_qubit_instruction(self, instruction):
+        # Angles and virtual Rz gates as in Circuit.__noisy_instruction_handler
+        q = instruction.q
+        if isinstance(instruction, NoisyPauliY):
+            self.phi_offsets[q] = self.phi_offsets[q] + np.pi
+        elif isinstance(instruction, NoisyHadamard):
+            self.phi_offsets[q] = self.phi_offsets[q] + np.pi / 2
+        if isinstance(instruction, NoisyPhase):
+            theta = instruction.theta
+        elif isinstance(instruction, NoisyHadamard):
+            theta = np.pi / 2
+        else:
+            theta = np.pi
+        in_hadamard_basis = isinstance(instruction, NoisyPauliZ) or isinstance(instruction, NoisyPhase)
+        read_bit = instruction.readBit if isinstance(instruction, NoisyReset) else None
+        noise_parameters = (theta, self.phi_offsets[q], instruction.p, instruction.T1, instruction.T2)
+        self.steps.append((self.__apply_noisy_qubit_gate, (q, noise_parameters, in_hadamard_basis, read_bit), False))
+        if isinstance(instruction, NoisyHadamard):
+            self.phi_offsets[q] = self.phi_offsets[q] + np.pi / 2
+
+    def __measure(self, state_vector, q, data_bit):
+        self.circuit.classicalBitRegister.write(data_bit, state_vector.measure_qubit(q))
+
+    def __reset(self, state_vector, read_bit, kernel, arguments):
+        if self.circuit.classicalBitRegister.read(read_bit) == 1:
+            kernel(state_vector, *arguments)
+
+    def __recover(self, state_vector, syndrome_start_bit, targets, gates):
+        register = self.circuit.classicalBitRegister
+        syndrome = 8*register.read(syndrome_start_bit) + 4*register.read(syndrome_start_bit + 1) + 2*register.read(syndrome_start_bit + 2) + register.read(syndrome_start_bit + 3)
+        targetQubit = targets[syndrome]
+        if targetQubit == -2:
+            # Encountered logical error, unknown syndrome. No recovery applied
+            self.circuit.logical_error_count = self.circuit.logical_error_count + 1
+        elif targetQubit >= 0:
+            kernel, arguments = gates[targetQubit]
+            kernel(state_vector, *arguments)
+
+    def __apply_noisy_qubit_gate(self, state_vector, q, noise_parameters, in_hadamard_basis, read_bit):
+        if read_bit is not None and self.circuit.classicalBitRegister.read(read_bit) != 1:
+            return
+        theta, phi_offset, p, T1, T2 = noise_parameters
+        operation = NoisyGate.construct(theta, -(self.phi[q] + phi_offset), p, T1, T2)
+        if in_hadamard_basis:
+            state_vector.apply_unitary_operation_on_qubit(QubitUnitaryOperation.get_hadamard(), q)
+        state_vector.apply_noisy_operation_on_qubit(operation, q)
+        if in_hadamard_basis:
+            state_vector.apply_unitary_operation_on_qubit(QubitUnitaryOperation.get_hadamard(), q)
+
+    def __apply_noisy_cnot(self, state_vector, instruction, c_phi_offset, t_phi_offset):
+        instruction.setPhiControl(self.phi[instruction.c_qubit] + c_phi_offset)
+        instruction.setPhiTarget(self.phi[instruction.t_qubit] + t_phi_offset)
+        instruction.setTheta(np.pi)
+        state_vector.apply_noisy_operation_on_qubits(instruction.getNoisyLocalOperation(), instruction.getQubits())
+
+    """
+    Executes the plan, the state vector, classical bit register, logical error count, intermediate states and virtual Rz
+    phases of the circuit are updated as by Circuit.execute.
+    """
+    def execute(self, create_new_state_vector=True) -> StateVector:
+        circuit = self.circuit
+        if self.version != circuit.version or self.save_instructions != circuit.save_instructions:
+            raise Exception("Circuit has changed after it was compiled, compile the circuit again")
+        if create_new_state_vector:
+            circuit.state_vector = StateVector(circuit.N, circuit.validation, circuit.validation_cache, circuit.dtype, circuit.in_place)
+        state_vector = circuit.state_vector
+        circuit.state_recorder.start(circuit.N, circuit.dtype, 1 + len(self.steps))
+        circuit.state_recorder.record(state_vector)
+        self.phi = list(circuit.phi)
+        for kernel, arguments, record in self.steps:
+            kernel(state_vector, *arguments)
+            if record:
+                circuit.state_recorder.record(state_vector)
+        for q in range(circuit.N):
+            circuit.phi[q] = self.phi[q] + self.phi_offsets[q]
+        return state_vector
 
 """
 Class representing a quantum circuit of N qubits.
 """
 class Circuit:
     
-    def __init__(self, qubits: int, bits: int=0,  save_instructions: bool=False, noise_factor: float = 1):
+    def __init__(self, qubits: int, bits: int=0,  save_instructions: bool=False, noise_factor: float = 1, validation: str = ValidationMode.ALWAYS, sparse: bool = False, dtype=np.complex128, in_place: bool = False):
         self.N = qubits
         self.classicalBitRegister = ClassicalBitRegister(bits)
         self.noise_factor = noise_factor
 
-        self.state_vector = StateVector(self.N)
-        self.quantum_states = [self.state_vector.get_quantum_state()]
-        self.descriptions = []
+        # Unitarity checks of the applied operations, the validation cache is shared by all state vectors of this circuit
+        self.validation = validation
+        self.validation_cache = set()
+
+        # Precision of the state vector and the stored operations, numpy.complex64 or numpy.complex128
+        self.dtype = np.dtype(dtype)
+        # Apply operations to the state vector using two preallocated buffers
+        self.in_place = in_place
+
+        # The state vector is created when it is first used, circuits executed on a matrix product state or a
+        # stabilizer tableau can have too many qubits for a state vector
+        self.__state_vector = None
+        # Intermediate quantum states of the last execution, set_state_recorder bounds the memory that is used
+        self.state_recorder = StateRecorder()
+        # Descriptions and gate strings are generated from a columnar store of the gates when they are read
+        # Increased on every change of the instructions or operations, see GateList
+        self.version = 0
+        self.descriptions = GateLabels(self.N)
         self.operations = []
-        self.gates = []
+        self.gates = GateLabels(self.N, gates=True)
 
         # Options / Flags
         self.save_instructions = save_instructions
+        self.sparse = sparse # Store operations as sparse CSR matrices, only used when save_instructions is False
         self.instructions = []
 
         # Keeps track of logical errors, only usable when running surface codes with recovery gates
         self.logical_error_count = 0
 
-        self.state_vector = StateVector(self.N)
         self.noisy_operations_state_prep = []
         self.noisy_operations_incoherent = []
         self.noisy_operations_readout = []
@@ -563,22 +2125,81 @@ class Circuit:
             "p": [float(qiskit_kyiv_parameter_dict["p"][i % len(qiskit_kyiv_parameter_dict["p"])]) for i in range(self.N)], # Loop over the p values of the device parameters to assign to each qubit
         }
 
+    @property
+    def state_vector(self) -> StateVector:
+        if self.__state_vector is None:
+            self.__state_vector = StateVector(self.N, self.validation, self.validation_cache, self.dtype, self.in_place)
+        return self.__state_vector
+
+    @state_vector.setter
+    def state_vector(self, state_vector: StateVector):
+        self.__state_vector = state_vector
+
+    @property
+    def instructions(self) -> GateList:
+        return self.__instructions
+
+    @instructions.setter
+    def instructions(self, instructions):
+        self.__instructions = GateList(self, instructions)
+        self.version = self.version + 1
+
+    @property
+    def operations(self) -> GateList:
+        return self.__operations
+
+    @operations.setter
+    def operations(self, operations):
+        self.__operations = GateList(self, operations)
+        self.version = self.version + 1
+
+    @property
+    def quantum_states(self):
+        if not self.state_recorder.started:
+            self.__start_recording()
+        return self.state_recorder.get_states()
+
+    """
+    Sets how the intermediate quantum states of the next executions are recorded, for example
+    circuit.set_state_recorder(EveryKthStateRecorder(10)) or circuit.set_state_recorder(NoStateRecorder()).
+    """
+    def set_state_recorder(self, state_recorder: StateRecorder):
+        self.state_recorder = state_recorder
+
+    def __start_recording(self):
+        max_steps = 1 + (len(self.instructions) if self.save_instructions else len(self.operations))
+        self.state_recorder.start(self.N, self.dtype, max_steps)
+        self.state_recorder.record(self.state_vector)
+
+    def __append_labels(self, opcode: int, qubits: tuple=(), parameter: float=0.0):
+        if type(self.descriptions) is GateLabels and type(self.gates) is GateLabels:
+            self.descriptions.append_gate(opcode, qubits, parameter)
+            self.gates.append_gate(opcode, qubits, parameter)
+        else:
+            self.descriptions.append(GateLabels.get_description(opcode, qubits, parameter))
+            self.gates.append(GateLabels.get_gate_as_string(opcode, qubits, self.N))
+
+    def __append_gate_instruction(self, instruction):
+        # The gate is applied by the kernel of its instruction during execution in both modes, in operation mode
+        # the 2^N x 2^N matrix is only built when it is asked for or when the circuit is sparse
+        if self.save_instructions:
+            self.instructions.append(instruction)
+        else:
+            self.operations.append(GateDescriptor.for_instruction(instruction, self.dtype, self.sparse))
+
+    """
+    Returns the 2^N x 2^N matrix of operation i, building it if it has not been built before.
+    """
+    def get_operation(self, i):
+        return self.operations[i].get_operation()
+
     def identity(self, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_identity(self.N)
-        self.descriptions.append(f"Identity on qubit {q}")
-        gate_as_string = '.'*self.N
-        self.gates.append(gate_as_string)
-        self.instructions.append(Identity(self.N, q))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.IDENTITY, (q,))
+        self.__append_gate_instruction(Identity(self.N, q))
 
     def pauli_x(self, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_pauli_x(q, self.N)
-        self.descriptions.append(f"Pauli X on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'X'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Pauli_X(self.N, q))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.PAULI_X, (q,))
+        self.__append_gate_instruction(Pauli_X(self.N, q))
 
     def noisy_pauli_x(self, q: int, p: float = None, T1: float = None, T2: float = None):
         """Adds a noisy Pauli X gate to the circuit
@@ -598,22 +2219,11 @@ class Circuit:
             T2 = self.parameters["T2"][q] / self.noise_factor
 
         self.instructions.append(NoisyPauliX(q, self.N, p, T1, T2))
-        self.descriptions.append(f"Noisy Pauli X on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'X'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
+        self.__append_labels(GateLabels.NOISY_PAULI_X, (q,))
 
     def pauli_y(self, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_pauli_y(q, self.N)
-        self.descriptions.append(f"Pauli Y on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'Y'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Pauli_Y(self.N, q))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.PAULI_Y, (q,))
+        self.__append_gate_instruction(Pauli_Y(self.N, q))
 
     def noisy_pauli_y(self, q: int, p: float= None, T1: float= None, T2: float= None):
         """Adds a noisy Pauli Y gate to the circuit
@@ -634,23 +2244,12 @@ class Circuit:
             T2 = self.parameters["T2"][q] / self.noise_factor
 
         self.instructions.append(NoisyPauliY(q, self.N, p, T1, T2))
-        self.descriptions.append(f"Noisy Pauli Y on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'Y'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
+        self.__append_labels(GateLabels.NOISY_PAULI_Y, (q,))
 
 
     def pauli_z(self, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_pauli_z(q, self.N)
-        self.descriptions.append(f"Pauli Z on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'Z'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Pauli_Z(self.N, q))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.PAULI_Z, (q,))
+        self.__append_gate_instruction(Pauli_Z(self.N, q))
 
     # Define the new "virtual" Pauli Z gate
     def noisy_pauli_z(self, q: int, p: float = None, T1: float = None, T2: float = None):
@@ -672,22 +2271,11 @@ class Circuit:
             T2 = self.parameters["T2"][q] / self.noise_factor
 
         self.instructions.append(NoisyPauliZ(q, self.N, p, T1, T2))
-        self.descriptions.append(f"Noisy Pauli Z on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'Z'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
+        self.__append_labels(GateLabels.NOISY_PAULI_Z, (q,))
 
     def hadamard(self, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_hadamard(q, self.N)
-        self.descriptions.append(f"Hadamard on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'H'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Hadamard(self.N, q))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.HADAMARD, (q,))
+        self.__append_gate_instruction(Hadamard(self.N, q))
 
     def noisy_hadamard(self, q: int, p: float= None, T1: float= None, T2: float= None):
         """Adds a noisy hadamard gate to the circuit
@@ -708,22 +2296,11 @@ class Circuit:
             T2 = self.parameters["T2"][q] / self.noise_factor
 
         self.instructions.append(NoisyHadamard(q, self.N, p, T1, T2))
-        self.descriptions.append(f"Noisy Hadamard on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'H'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
+        self.__append_labels(GateLabels.NOISY_HADAMARD, (q,))
 
     def phase(self, theta, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_phase(theta, q, self.N)
-        self.descriptions.append(f"Phase with theta = {theta/np.pi:.3f} {pi_symbol} on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'S'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Phase(self.N, q, theta))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.PHASE, (q,), theta)
+        self.__append_gate_instruction(Phase(self.N, q, theta))
 
 
     def noisy_phase(self, theta: float, q: int, p: float = None, T1: float = None, T2: float = None):
@@ -746,56 +2323,26 @@ class Circuit:
             T2 = self.parameters["T2"][q]
  
         self.instructions.append(NoisyPhase(theta, q, self.N, p, T1, T2))
-        self.descriptions.append(f"Noisy X rotation of {theta} on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'X'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
+        self.__append_labels(GateLabels.NOISY_PHASE, (q,), theta)
 
     def rotate_x(self, theta, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_rotate_x(theta, q, self.N)
-        self.descriptions.append(f"Rotate X with theta = {theta/np.pi:.3f} {pi_symbol} on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Rotate_X(self.N, q, theta))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.ROTATE_X, (q,), theta)
+        self.__append_gate_instruction(Rotate_X(self.N, q, theta))
 
     
     def rotate_y(self, theta, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_rotate_y(theta, q, self.N)
-        self.descriptions.append(f"Rotate Y with theta = {theta/np.pi:.3f} {pi_symbol} on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Rotate_Y(self.N, q, theta)) if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.ROTATE_Y, (q,), theta)
+        self.__append_gate_instruction(Rotate_Y(self.N, q, theta))
 
     
     def rotate_z(self, theta, q):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_rotate_z(theta, q, self.N)
-        self.descriptions.append(f"Rotate Z with theta = {theta/np.pi:.3f} {pi_symbol} on qubit {q}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Rotate_Z(self.N, q, theta)) if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.ROTATE_Z, (q,), theta)
+        self.__append_gate_instruction(Rotate_Z(self.N, q, theta))
 
 
     def cnot(self, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_cnot(control, target, self.N)
-        self.descriptions.append(f"CNOT with control qubit {control} and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'X'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(CNOT(self.N, target, control))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CNOT, (control, target))
+        self.__append_gate_instruction(CNOT(self.N, target, control))
 
     # Define the new cnot gate with integrated noise 
     def noisy_cnot(self, c_qubit: int, t_qubit: int, c_p: float= None, t_p: float= None, gate_error: float=None, c_T1: float= None, t_T1: float= None, c_T2: float= None, t_T2: float= None):
@@ -832,183 +2379,77 @@ class Circuit:
 
         self.instructions.append(NoisyCNOT(c_qubit, t_qubit, self.N, c_p, t_p, c_T1, t_T1, c_T2, t_T2, gate_error))
 
-        self.descriptions.append(f"Noisy CNOT with target qubit {t_qubit} and control qubit {c_qubit}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[c_qubit] = '*'
-        gate_as_list[t_qubit] = 'x'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string) 
+        self.__append_labels(GateLabels.NOISY_CNOT, (c_qubit, t_qubit))
 
     def controlled_pauli_y(self, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_pauli_y(control, target, self.N)
-        self.descriptions.append(f"Controlled Pauli Y with control qubit {control} and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'Y'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Pauli_Y(self.N, target, control))   if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_PAULI_Y, (control, target))
+        self.__append_gate_instruction(Controlled_Pauli_Y(self.N, target, control))
 
     def controlled_pauli_z(self, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_pauli_z(control, target, self.N)
-        self.descriptions.append(f"Controlled Pauli Z with control qubit {control} and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'Z'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Pauli_Z(self.N, target, control))   if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_PAULI_Z, (control, target))
+        self.__append_gate_instruction(Controlled_Pauli_Z(self.N, target, control))
     
     def controlled_hadamard(self, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_hadamard(control, target, self.N)
-        self.descriptions.append(f"Controlled Hadamard with control qubit {control} and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'H'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Hadamard(self.N, target, control))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_HADAMARD, (control, target))
+        self.__append_gate_instruction(Controlled_Hadamard(self.N, target, control))
 
     def controlled_phase(self, theta, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_phase(theta, control, target, self.N)
-        self.descriptions.append(f"Controlled phase with theta = {theta/np.pi:.3f} {pi_symbol}, control qubit {control}, and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'S'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Phase(theta, self.N, target, control))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_PHASE, (control, target), theta)
+        self.__append_gate_instruction(Controlled_Phase(theta, self.N, target, control))
 
     def controlled_rotate_x(self, theta, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_rotate_x(theta, control, target, self.N)
-        self.descriptions.append(f"Controlled rotate X with theta = {theta/np.pi:.3f} {pi_symbol}, control qubit {control}, and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Rotate_X(theta, self.N, target, control))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_ROTATE_X, (control, target), theta)
+        self.__append_gate_instruction(Controlled_Rotate_X(theta, self.N, target, control))
 
 
     def controlled_rotate_y(self, theta, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_rotate_y(theta, control, target, self.N)
-        self.descriptions.append(f"Controlled rotate Y with theta = {theta/np.pi:.3f} {pi_symbol}, control qubit {control}, and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Rotate_Y(theta, self.N, target, control))   if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_ROTATE_Y, (control, target), theta)
+        self.__append_gate_instruction(Controlled_Rotate_Y(theta, self.N, target, control))
 
 
     def controlled_rotate_z(self, theta, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_rotate_z(theta, control, target, self.N)
-        self.descriptions.append(f"Controlled rotate Z with theta = {theta/np.pi:.3f} {pi_symbol}, control qubit {control}, and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Rotate_Z(theta, self.N, target, control))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_ROTATE_Z, (control, target), theta)
+        self.__append_gate_instruction(Controlled_Rotate_Z(theta, self.N, target, control))
 
 
     def controlled_unitary_operation(self, operation, control, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(operation, control, target, self.N)
-        self.descriptions.append(f"Controlled unitary operation with control qubit {control} and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[target] = 'U'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Controlled_Unitary_Operation(self.N, operation, target, control))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.CONTROLLED_UNITARY_OPERATION, (control, target))
+        self.__append_gate_instruction(Controlled_Unitary_Operation(self.N, operation, target, control))
 
     def swap(self, a, b):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_swap(a, b, self.N)
-        self.descriptions.append(f"SWAP on qubit {a} and qubit {b}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[a] = 'x'
-        gate_as_list[b] = 'x'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Swap(self.N, a, b)) if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.SWAP, (a, b))
+        self.__append_gate_instruction(Swap(self.N, a, b))
 
         
     def fredkin(self, control, a, b):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_fredkin(control, a, b, self.N)
-        self.descriptions.append(f"Fredkin with control qubit {control} and SWAP on qubit {a} and qubit {b}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control] = '*'
-        gate_as_list[a] = 'x'
-        gate_as_list[b] = 'x'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Fredkin(self.N, control, a, b))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.FREDKIN, (control, a, b))
+        self.__append_gate_instruction(Fredkin(self.N, control, a, b))
 
     
     def toffoli(self, control_a, control_b, target):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_toffoli(control_a, control_b, target, self.N)
-        self.descriptions.append(f"Toffoli with control qubit {control_a} and CNOT with control qubit {control_b} and target qubit {target}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[control_a] = '*'
-        gate_as_list[control_b] = '*'
-        gate_as_list[target] = 'x'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-        self.instructions.append(Toffoli(self.N, control_a, control_b, target))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.TOFFOLI, (control_a, control_b, target))
+        self.__append_gate_instruction(Toffoli(self.N, control_a, control_b, target))
     
     def multi_controlled_pauli_z(self):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_multi_controlled_pauli_z_operation(self.N)
-        self.descriptions.append(f"Multi-controlled Pauli_Z")
-        gate_as_string = '*'*self.N
-        self.gates.append(gate_as_string)
-        self.instructions.append(Multi_Controlled_Pauli_Z(self.N))  if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.MULTI_CONTROLLED_PAULI_Z, ())
+        self.__append_gate_instruction(Multi_Controlled_Pauli_Z(self.N))
 
 
     def multi_controlled_pauli_x(self):
-        combined_operation = CircuitUnitaryOperation.get_combined_operation_for_multi_controlled_pauli_x_operation(self.N)
-        self.descriptions.append(f"Multi-controlled Pauli_X")
-        gate_as_string = '*'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[self.N-1] = 'X'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string) 
-        self.instructions.append(Multi_Controlled_Pauli_X(self.N))   if self.save_instructions else self.operations.append(combined_operation)
+        self.__append_labels(GateLabels.MULTI_CONTROLLED_PAULI_X, (self.N-1,))
+        self.__append_gate_instruction(Multi_Controlled_Pauli_X(self.N))
 
     """
     Measurement of a single qubit
     """
     def measurement(self, measurementQubit: int, copyClassicBit: int) -> int:
-        self.descriptions.append(f"Measurement on Qubit {measurementQubit} projected on bit: {copyClassicBit}")
+        self.__append_labels(GateLabels.MEASUREMENT, (measurementQubit,), copyClassicBit)
         self.instructions.append(Measurement(measurementQubit, copyClassicBit))
 
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[measurementQubit] = 'M'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-
     def reset(self, targetQubit: int, readBit: int) -> int:
-        self.descriptions.append(f"Reset on Qubit {targetQubit} read from bit: {readBit}")
+        self.__append_labels(GateLabels.RESET, (targetQubit,), readBit)
         self.instructions.append(Reset(targetQubit, readBit))
 
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[targetQubit] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-
     def noisy_reset(self, q: int, readBit: int, p: float = None, T1: float = None, T2: float = None):
         """Adds a noisy reset gate to the circuit
 
@@ -1027,38 +2468,22 @@ class Circuit:
             T2 = self.parameters["T2"][q]
 
         self.instructions.append(NoisyReset(q, readBit, self.N, p, T1, T2))
-        self.descriptions.append(f"Noisy reset on Qubit {q} read from bit: {readBit}")
-        gate_as_string = '.'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[q] = 'R'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
+        self.__append_labels(GateLabels.NOISY_RESET, (q,), readBit)
 
     def recovery_phase_flip(self, startIndexBit: int):
         """
         Special function used for doing recoveries when using surface codes
         """
-        self.descriptions.append(f"Phase flip recovery, syndrome extracted from the first 4 bits starting from {startIndexBit}")
+        self.__append_labels(GateLabels.RECOVERY_PHASE_FLIP, (), startIndexBit)
         self.instructions.append(Recovery_Phase_Flip(startIndexBit, self.N))
 
-        gate_as_string = 'P'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[0] = 'P'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
-
     def recovery_bit_flip(self, startIndexBit: int):
         """
         Special function used for doing recoveries when using surface codes
         """
-        self.descriptions.append(f"Bit flip recovery, syndrome extracted from the first 4 bits starting from {startIndexBit}")
+        self.__append_labels(GateLabels.RECOVERY_BIT_FLIP, (), startIndexBit)
         self.instructions.append(Recovery_Bit_Flip(startIndexBit, self.N))
 
-        gate_as_string = 'B'*self.N
-        gate_as_list = list(gate_as_string)
-        gate_as_list[0] = 'B'
-        gate_as_string = ''.join(gate_as_list)
-        self.gates.append(gate_as_string)
     """
     Swap the registers such that the most significant qubit becomes the least significant qubit and vice versa.
     """
@@ -1073,10 +2498,13 @@ class Circuit:
         # control is control qubit
         # target is qubit in new circuit corresponding to first qubit of current circuit
         # nr_qubits is number of qubits in new circuit
-        controlled_circuit = Circuit(nr_qubits)
+        controlled_circuit = Circuit(nr_qubits, validation=self.validation, sparse=self.sparse, dtype=self.dtype, in_place=self.in_place)
         for operation, description, gate in zip(self.operations, self.descriptions, self.gates):
-            combined_operation = CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(operation, control, target, nr_qubits)
-            controlled_circuit.operations.append(combined_operation)
+            if self.sparse:
+                build = lambda operation=operation: SparseCircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(operation.get_operation(), control, target, nr_qubits)
+            else:
+                build = lambda operation=operation: CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(operation.get_operation(), control, target, nr_qubits)
+            controlled_circuit.operations.append(GateDescriptor(build, self.dtype, self.sparse))
             controlled_circuit.descriptions.append(f"Controlled unitary operation {description}")
             gate_as_string = '.'*controlled_circuit.N
             gate_as_list = list(gate_as_string)
@@ -1087,7 +2515,7 @@ class Circuit:
         return controlled_circuit
 
     def create_inverse_circuit(self):
-        inverse_circuit = Circuit(self.N)
+        inverse_circuit = Circuit(self.N, validation=self.validation, sparse=self.sparse, dtype=self.dtype, in_place=self.in_place)
         for operation, description, gate in zip(reversed(self.operations), reversed(self.descriptions), reversed(self.gates)):
             inverse_circuit.operations.append(operation)
             inverse_circuit.descriptions.append(description)
@@ -1145,8 +2573,11 @@ class Circuit:
         if circuit.N > self.N:
             raise ValueError("Function append_circuit_general: circuit to be appended must have less or same number of qubits")
         for operation, description, gate in zip(circuit.operations, circuit.descriptions, circuit.gates):
-            combined_operation = CircuitUnitaryOperation.get_combined_operation_for_unitary_operation_general(operation, start, self.N)
-            self.operations.append(combined_operation)
+            if self.sparse:
+                build = lambda operation=operation: SparseCircuitUnitaryOperation.get_combined_operation_for_unitary_operation_general(operation.get_operation(), start, self.N)
+            else:
+                build = lambda operation=operation: CircuitUnitaryOperation.get_combined_operation_for_unitary_operation_general(SparseCircuitUnitaryOperation.get_dense_operation(operation.get_operation()), start, self.N)
+            self.operations.append(GateDescriptor(build, self.dtype, self.sparse))
             self.descriptions.append(f"Append operation {description}")
             gate_as_string = '.'*self.N
             gate_as_list = list(gate_as_string)
@@ -1155,12 +2586,190 @@ class Circuit:
             self.gates.append(gate_as_string)
 
     def create_noisy_circuit(self):
-        noisy_circuit = NoisyCircuit(self.N)
+        noisy_circuit = NoisyCircuit(self.N, self.validation, self.dtype, self.in_place)
         for operation, description, gate in zip(self.operations, self.descriptions, self.gates):
             noisy_circuit.operations.append(operation)
             noisy_circuit.descriptions.append(description)
             noisy_circuit.gates.append(gate)
         return noisy_circuit
+
+    """
+    Merge consecutive diagonal gates (Pauli Z, phase, rotate Z, their controlled versions, and multi-controlled Pauli Z)
+    into a single diagonal operation which is applied as one elementwise multiplication.
+    Returns the number of gates that are removed from the circuit by merging.
+    """
+    def merge_diagonal_gates(self) -> int:
+        gate_list = self.instructions if self.save_instructions else self.operations
+        merged_gate_list = []
+        merged_descriptions = GateLabels(self.N)
+        merged_gates = GateLabels(self.N, gates=True)
+        number_of_merged_gates = 0
+        i = 0
+        while i < len(gate_list):
+            j = i
+            while j < len(gate_list) and self.__is_diagonal_gate(gate_list[j]):
+                j = j + 1
+            if j - i > 1:
+                diagonal = np.ones(2**self.N, dtype=complex)
+                gate_as_list = list('.'*self.N)
+                for gate, gate_as_string in zip(gate_list[i:j], self.gates[i:j]):
+                    diagonal = diagonal * self.__get_diagonal_of_gate(gate)
+                    for q in range(self.N):
+                        if gate_as_string[q] != '.':
+                            gate_as_list[q] = 'D'
+                if self.save_instructions:
+                    merged_gate_list.append(Diagonal_Operation(self.N, diagonal))
+                else:
+                    merged_gate_list.append(GateDescriptor.for_instruction(Diagonal_Operation(self.N, diagonal), self.dtype, self.sparse))
+                merged_descriptions.append(f"Diagonal operation merged from {j - i} gates")
+                merged_gates.append(''.join(gate_as_list))
+                number_of_merged_gates = number_of_merged_gates + j - i - 1
+                i = j
+            else:
+                merged_gate_list.append(gate_list[i])
+                merged_descriptions.append(self.descriptions[i])
+                merged_gates.append(self.gates[i])
+                i = i + 1
+
+        if self.save_instructions:
+            self.instructions = merged_gate_list
+        else:
+            self.operations = merged_gate_list
+        self.descriptions = merged_descriptions
+        self.gates = merged_gates
+        return number_of_merged_gates
+
+    def __is_diagonal_gate(self, gate) -> bool:
+        if self.save_instructions:
+            return isinstance(gate, DiagonalGateInstruction)
+        # Gates are recognised by their instruction, other operations by their matrix
+        if gate.instruction is not None:
+            return isinstance(gate.instruction, DiagonalGateInstruction)
+        gate = gate.get_operation()
+        if scipy.sparse.issparse(gate):
+            return (gate - scipy.sparse.diags(gate.diagonal())).count_nonzero() == 0
+        return np.array_equal(gate, np.diag(np.diagonal(gate)))
+
+    def __get_diagonal_of_gate(self, gate):
+        if isinstance(gate, DiagonalGateInstruction):
+            return gate.getDiagonal()
+        if gate.instruction is not None:
+            return gate.instruction.getDiagonal()
+        return gate.get_operation().diagonal()
+
+    """
+    Fuse consecutive single-qubit gates on the same qubit into one 2 x 2 unitary operation.
+    Single-qubit gates on other qubits do not interrupt a run. Gates on more qubits, measurements, resets,
+    recovery instructions and noisy gates end all runs, as the gates can not be moved past them.
+    Only supported for circuits that save instructions. Returns the number of gates that are removed from the circuit by fusing.
+    """
+    def fuse_single_qubit_gates(self) -> int:
+        if not self.save_instructions:
+            raise Exception("Fusing single-qubit gates is only supported for circuits that save instructions")
+        fused_instructions = []
+        fused_descriptions = GateLabels(self.N)
+        fused_gates = GateLabels(self.N, gates=True)
+        # For every qubit the indices of the single-qubit gates in its current run
+        runs = {}
+        number_of_fused_gates = 0
+        for i, instruction in enumerate(self.instructions):
+            if isinstance(instruction, SingleQubitGateInstruction):
+                runs.setdefault(instruction.targetQubit, []).append(i)
+            else:
+                number_of_fused_gates = number_of_fused_gates + self.__fuse_runs(runs, fused_instructions, fused_descriptions, fused_gates)
+                fused_instructions.append(instruction)
+                fused_descriptions.append(self.descriptions[i])
+                fused_gates.append(self.gates[i])
+        number_of_fused_gates = number_of_fused_gates + self.__fuse_runs(runs, fused_instructions, fused_descriptions, fused_gates)
+
+        self.instructions = fused_instructions
+        self.descriptions = fused_descriptions
+        self.gates = fused_gates
+        return number_of_fused_gates
+
+    """
+    Fuse blocks of adjacent gates acting on at most max_qubits qubits into one dense unitary operation on these qubits.
+    Gates are added greedily to the current block until a gate would increase the number of qubits of the block above max_qubits.
+    Measurements, resets, recovery instructions and noisy gates end the current block.
+    Only supported for circuits that save instructions. Returns the number of gates that are removed from the circuit by fusing.
+    """
+    def fuse_gates(self, max_qubits: int = 2) -> int:
+        if not self.save_instructions:
+            raise Exception("Fusing gates is only supported for circuits that save instructions")
+        if max_qubits < 1:
+            raise ValueError("Function fuse_gates: max_qubits must be at least 1")
+        fused_instructions = []
+        fused_descriptions = GateLabels(self.N)
+        fused_gates = GateLabels(self.N, gates=True)
+        block = []
+        block_qubits = set()
+        number_of_fused_gates = 0
+        for i, instruction in enumerate(self.instructions):
+            if isinstance(instruction, GateInstruction) and len(instruction.getQubits()) <= max_qubits:
+                if len(block_qubits | set(instruction.getQubits())) > max_qubits:
+                    number_of_fused_gates = number_of_fused_gates + self.__fuse_block(block, fused_instructions, fused_descriptions, fused_gates)
+                    block_qubits.clear()
+                block.append(i)
+                block_qubits.update(instruction.getQubits())
+            else:
+                number_of_fused_gates = number_of_fused_gates + self.__fuse_block(block, fused_instructions, fused_descriptions, fused_gates)
+                block_qubits.clear()
+                fused_instructions.append(instruction)
+                fused_descriptions.append(self.descriptions[i])
+                fused_gates.append(self.gates[i])
+        number_of_fused_gates = number_of_fused_gates + self.__fuse_block(block, fused_instructions, fused_descriptions, fused_gates)
+
+        self.instructions = fused_instructions
+        self.descriptions = fused_descriptions
+        self.gates = fused_gates
+        return number_of_fused_gates
+
+    def __fuse_block(self, block, fused_instructions, fused_descriptions, fused_gates) -> int:
+        # Append one instruction for the block of gates and clear the block
+        if len(block) == 0:
+            return 0
+        if len(block) == 1:
+            fused_instructions.append(self.instructions[block[0]])
+            fused_descriptions.append(self.descriptions[block[0]])
+            fused_gates.append(self.gates[block[0]])
+            block.clear()
+            return 0
+        qubits = sorted(set(q for i in block for q in self.instructions[i].getQubits()))
+        operation = np.eye(2**len(qubits), dtype=complex)
+        for i in block:
+            instruction = self.instructions[i]
+            positions = [qubits.index(q) for q in instruction.getQubits()]
+            operation = np.dot(CircuitUnitaryOperation.get_combined_operation_for_qubits(instruction.getLocalOperation(), positions, len(qubits)), operation)
+        gate_as_list = list('.'*self.N)
+        for q in qubits:
+            gate_as_list[q] = 'U'
+        fused_instructions.append(Unitary_Operation(self.N, qubits, operation))
+        fused_descriptions.append(f"Unitary operation on qubits {qubits} fused from {len(block)} gates")
+        fused_gates.append(''.join(gate_as_list))
+        number_of_fused_gates = len(block) - 1
+        block.clear()
+        return number_of_fused_gates
+
+    def __fuse_runs(self, runs, fused_instructions, fused_descriptions, fused_gates) -> int:
+        # Append one instruction for every run of single-qubit gates and clear the runs
+        number_of_fused_gates = 0
+        for q, run in runs.items():
+            if len(run) == 1:
+                fused_instructions.append(self.instructions[run[0]])
+                fused_descriptions.append(self.descriptions[run[0]])
+                fused_gates.append(self.gates[run[0]])
+            else:
+                operation = QubitUnitaryOperation.get_identity()
+                for i in run:
+                    operation = np.dot(self.instructions[i].getQubitOperation(), operation)
+                gate_as_list = list('.'*self.N)
+                gate_as_list[q] = 'U'
+                fused_instructions.append(Qubit_Unitary_Operation(self.N, q, operation))
+                fused_descriptions.append(f"Single-qubit operation on qubit {q} fused from {len(run)} gates")
+                fused_gates.append(''.join(gate_as_list))
+                number_of_fused_gates = number_of_fused_gates + len(run) - 1
+        runs.clear()
+        return number_of_fused_gates
     
     # Define a virtual Rz gate to mimic the "quantum-gates" package
     def virtual_rotate_z(self, q: int, theta: float):
@@ -1244,25 +2853,25 @@ class Circuit:
             # Theta and phi to construct Pauli X
             instruction.setTheta(np.pi)
             instruction.setPhi(-self.phi[instruction.q])
-            self.state_vector.apply_noisy_operation(instruction.getNoisyOperation())
+            self.state_vector.apply_noisy_operation_on_qubit(instruction.getNoisyQubitOperation(), instruction.q)
         elif isinstance(instruction, NoisyPauliY):
             # First execute a virtual Rz gate
             self.virtual_rotate_z(instruction.q, np.pi)
             instruction.setTheta(np.pi)
             instruction.setPhi(-self.phi[instruction.q])
-            self.state_vector.apply_noisy_operation(instruction.getNoisyOperation())
+            self.state_vector.apply_noisy_operation_on_qubit(instruction.getNoisyQubitOperation(), instruction.q)
         elif isinstance(instruction, NoisyPauliZ):
             # self.virtual_rotate_z(instruction.q, np.pi)
             instruction.setTheta(np.pi)
             instruction.setPhi(-self.phi[instruction.q])
-            self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_hadamard(instruction.q, instruction.N))
-            self.state_vector.apply_noisy_operation(instruction.getNoisyOperation())
-            self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_hadamard(instruction.q, instruction.N))
+            self.state_vector.apply_unitary_operation_on_qubit(QubitUnitaryOperation.get_hadamard(), instruction.q)
+            self.state_vector.apply_noisy_operation_on_qubit(instruction.getNoisyQubitOperation(), instruction.q)
+            self.state_vector.apply_unitary_operation_on_qubit(QubitUnitaryOperation.get_hadamard(), instruction.q)
         elif isinstance(instruction, NoisyPhase):
             instruction.setPhi(-self.phi[instruction.q])
-            self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_hadamard(instruction.q, instruction.N))
-            self.state_vector.apply_noisy_operation(instruction.getNoisyOperation())
-            self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_hadamard(instruction.q, instruction.N))
+            self.state_vector.apply_unitary_operation_on_qubit(QubitUnitaryOperation.get_hadamard(), instruction.q)
+            self.state_vector.apply_noisy_operation_on_qubit(instruction.getNoisyQubitOperation(), instruction.q)
+            self.state_vector.apply_unitary_operation_on_qubit(QubitUnitaryOperation.get_hadamard(), instruction.q)
         elif isinstance(instruction, NoisyHadamard):
             # First execute a virtual Rz gate
             self.virtual_rotate_z(instruction.q, np.pi / 2)
@@ -1270,7 +2879,7 @@ class Circuit:
             instruction.setTheta(np.pi / 2)
             instruction.setPhi(-self.phi[instruction.q])
 
-            self.state_vector.apply_noisy_operation(instruction.getNoisyOperation())
+            self.state_vector.apply_noisy_operation_on_qubit(instruction.getNoisyQubitOperation(), instruction.q)
 
             # To complete the gate end with a virtual Rz gate
             self.virtual_rotate_z(instruction.q, np.pi / 2)
@@ -1278,43 +2887,46 @@ class Circuit:
             instruction.setPhiControl(self.phi[instruction.c_qubit])
             instruction.setPhiTarget(self.phi[instruction.t_qubit])
             instruction.setTheta(np.pi)
-            instruction
-            self.state_vector.apply_noisy_operation(instruction.getNoisyOperation())
+            self.state_vector.apply_noisy_operation_on_qubits(instruction.getNoisyLocalOperation(), instruction.getQubits())
         elif(isinstance(instruction, NoisyReset)):
-            if(self.classicalBitRegister.read(instruction.readBit == 1)):
+            if(self.classicalBitRegister.read(instruction.readBit) == 1):
                 instruction.setTheta(np.pi)
                 instruction.setPhi(-self.phi[instruction.q])
-                self.state_vector.apply_noisy_operation(instruction.getNoisyOperation())
-    def __direct_execute__(self, operation: CircuitUnitaryOperation):
-        self.state_vector.apply_unitary_operation(operation)
-        self.quantum_states.append(self.state_vector.get_quantum_state())
+                self.state_vector.apply_noisy_operation_on_qubit(instruction.getNoisyQubitOperation(), instruction.q)
+    def __direct_execute__(self, instruction):
+        instruction.applyOperation(self.state_vector)
+        self.state_recorder.record(self.state_vector)
     
     def __measure_execute__(self, measureQubit: int, dataBit: int) -> int:
-        # Collapse the state of the qubit to either |0> or |1>
-        self.state_vector.measure_qubit(measureQubit)
-        
-        copyStateVector = self.state_vector
-        measurement = copyStateVector.measure()
-        # Find the qubit which value should be projected in the bit register
-        # Char: '|' should be ignored, therefore '+1'
-        qubitValue = int(measurement[measureQubit + 1])
+        # Collapse the state of the qubit to either |0> or |1>, the measured value is projected in the bit register
+        qubitValue = self.state_vector.measure_qubit(measureQubit)
         self.classicalBitRegister.write(dataBit, qubitValue)
     
         return qubitValue
     
     def __reset_execute__(self, targetQubit: int, readBit: int):
         if(self.classicalBitRegister.read(readBit) == 1):
-            self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_pauli_x(targetQubit, self.N))
+            Pauli_X(self.N, targetQubit).applyOperation(self.state_vector)
 
     def __noisy_reset_execute__(self, targetQubit: int, readBit: int):
         if(self.classicalBitRegister.read(readBit) == 1):
-            self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_pauli_x(targetQubit, self.N))
+            Pauli_X(self.N, targetQubit).applyOperation(self.state_vector)
+
 
+    """
+    Returns True if every execution of the circuit results in the same final state, i.e. the circuit has no measurements,
+    resets, recovery instructions or noisy gates that are sampled during execution. The classical states of such a circuit
+    can be sampled many times from a single execution.
+    """
+    def is_final_state_deterministic(self) -> bool:
+        if not self.save_instructions:
+            return True
+        return all(isinstance(instruction, GateInstruction) for instruction in self.instructions)
                 
     def execute(self, print_state=False, create_new_state_vector=True):
         if create_new_state_vector:
-            self.state_vector = StateVector(self.N)
-        self.quantum_states = [self.state_vector.get_quantum_state()]
+            self.state_vector = StateVector(self.N, self.validation, self.validation_cache, self.dtype, self.in_place)
+        self.__start_recording()
         if print_state:
             print("Initial quantum state")
             self.state_vector.print()
@@ -1334,31 +2946,364 @@ class Circuit:
                         # Encountered logical error, unknown syndrome. No recovery applied
                         self.logical_error_count = self.logical_error_count + 1
                     else:
-                        self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_pauli_x(targetQubit, self.N))
-                elif(isinstance(instruction, Recovery_Phase_Flip)):
-                    targetQubit = instruction.getTargetQubit(self.classicalBitRegister)
-                    if(targetQubit == -1):
-                        # No phase flips found, no recovery applied
-                        pass
-                    elif(targetQubit == -2):
-                        # Encountered logical error, unknown syndrome. No recovery applied
-                        self.logical_error_count = self.logical_error_count + 1
+                        Pauli_X(self.N, targetQubit).applyOperation(self.state_vector)
+                elif(isinstance(instruction, Recovery_Phase_Flip)):
+                    targetQubit = instruction.getTargetQubit(self.classicalBitRegister)
+                    if(targetQubit == -1):
+                        # No phase flips found, no recovery applied
+                        pass
+                    elif(targetQubit == -2):
+                        # Encountered logical error, unknown syndrome. No recovery applied
+                        self.logical_error_count = self.logical_error_count + 1
+                    else:
+                        Pauli_Z(self.N, targetQubit).applyOperation(self.state_vector)
+                elif(isinstance(instruction, NoisyGateInstruction)):
+                    self.__noisy_instruction_handler(instruction)
+                else:
+                    self.__direct_execute__(instruction)
+        else:
+            for operation, description in zip(self.operations, self.descriptions):
+                operation.apply(self.state_vector)
+                self.state_recorder.record(self.state_vector)
+                if print_state:
+                    print(description)
+                    print(SparseCircuitUnitaryOperation.get_dense_operation(operation.get_operation()))
+                    print("Current quantum state")
+                    self.state_vector.print()
+    
+    """
+    Resolves every instruction once into a kernel call with its arguments bound. The returned plan executes the circuit
+    as execute does and can be executed many times, compile the circuit again after adding gates.
+    """
+    def compile(self) -> ExecutionPlan:
+        return ExecutionPlan(self)
+
+    """
+    Execute the circuit for a batch of independent trajectories at once. Noisy gates are sampled for every trajectory,
+    measurements collapse every trajectory on its own and every trajectory has its own classical bits.
+    After execution, batched_state_vector holds the states, batched_classical_bits the classical bits of every trajectory
+    as an array of shape (B, bits) and batched_logical_error_count the number of logical errors of every trajectory.
+    """
+    def execute_batch(self, batch_size: int) -> BatchedStateVector:
+        self.batched_state_vector = BatchedStateVector(self.N, batch_size, self.dtype)
+        self.batched_classical_bits = np.tile(np.array(self.classicalBitRegister.register[:self.classicalBitRegister.getAmountOfBits()], dtype=np.int64), (batch_size, 1))
+        self.batched_logical_error_count = np.zeros(batch_size, dtype=np.int64)
+        batch = self.batched_state_vector
+        if not self.save_instructions:
+            for operation in self.operations:
+                # Derived operations have no gate instruction and are applied as a 2^N x 2^N matrix
+                if operation.instruction is None:
+                    batch.apply_operation(operation.get_operation())
+                else:
+                    batch.apply_gate_instruction(operation.instruction)
+            return batch
+        for instruction in self.instructions:
+            if(isinstance(instruction, Measurement)):
+                self.batched_classical_bits[:, instruction.dataBit] = batch.measure_qubit(instruction.measureQubit)
+            elif(isinstance(instruction, Reset)):
+                rows = self.batched_classical_bits[:, instruction.readBit] == 1
+                batch.apply_gate_instruction(Pauli_X(self.N, instruction.targetQubit), rows)
+            elif(isinstance(instruction, Recovery_Bit_Flip) or isinstance(instruction, Recovery_Phase_Flip)):
+                syndromes = self.batched_classical_bits[:, instruction.syndromeStartBit:instruction.syndromeStartBit + 4]
+                targets = np.array([instruction.getTargetQubitForSyndrome(''.join(str(bit) for bit in syndrome)) for syndrome in syndromes])
+                # Encountered logical error, unknown syndrome. No recovery applied
+                self.batched_logical_error_count = self.batched_logical_error_count + (targets == -2)
+                for targetQubit in np.unique(targets[targets >= 0]):
+                    recovery = Pauli_X(self.N, targetQubit) if isinstance(instruction, Recovery_Bit_Flip) else Pauli_Z(self.N, targetQubit)
+                    batch.apply_gate_instruction(recovery, targets == targetQubit)
+            elif(isinstance(instruction, NoisyGateInstruction)):
+                self.__noisy_instruction_batch_handler(instruction, batch)
+            else:
+                batch.apply_gate_instruction(instruction)
+        return batch
+
+    def __sample_noisy_operations(self, instruction, number_of_rows):
+        # Every trajectory samples its own realisation of the noisy gate
+        if isinstance(instruction, NoisyCNOT):
+            return np.array([instruction.getNoisyLocalOperation() for _ in range(number_of_rows)])
+        return np.array([instruction.getNoisyQubitOperation() for _ in range(number_of_rows)])
+
+    def __apply_noisy_instruction(self, instruction, apply_noisy_instruction, apply_unitary_operation_on_qubits):
+        # Sets the angles of a noisy instruction following the virtual Rz gates as in __noisy_instruction_handler,
+        # the noisy gate itself is applied by apply_noisy_instruction(instruction)
+        if isinstance(instruction, NoisyPauliX):
+            instruction.setTheta(np.pi)
+            instruction.setPhi(-self.phi[instruction.q])
+            apply_noisy_instruction(instruction)
+        elif isinstance(instruction, NoisyPauliY):
+            self.virtual_rotate_z(instruction.q, np.pi)
+            instruction.setTheta(np.pi)
+            instruction.setPhi(-self.phi[instruction.q])
+            apply_noisy_instruction(instruction)
+        elif isinstance(instruction, NoisyPauliZ) or isinstance(instruction, NoisyPhase):
+            if isinstance(instruction, NoisyPauliZ):
+                instruction.setTheta(np.pi)
+            instruction.setPhi(-self.phi[instruction.q])
+            apply_unitary_operation_on_qubits(QubitUnitaryOperation.get_hadamard(), [instruction.q])
+            apply_noisy_instruction(instruction)
+            apply_unitary_operation_on_qubits(QubitUnitaryOperation.get_hadamard(), [instruction.q])
+        elif isinstance(instruction, NoisyHadamard):
+            self.virtual_rotate_z(instruction.q, np.pi / 2)
+            instruction.setTheta(np.pi / 2)
+            instruction.setPhi(-self.phi[instruction.q])
+            apply_noisy_instruction(instruction)
+            self.virtual_rotate_z(instruction.q, np.pi / 2)
+        elif isinstance(instruction, NoisyCNOT):
+            instruction.setPhiControl(self.phi[instruction.c_qubit])
+            instruction.setPhiTarget(self.phi[instruction.t_qubit])
+            instruction.setTheta(np.pi)
+            apply_noisy_instruction(instruction)
+        elif isinstance(instruction, NoisyReset):
+            instruction.setTheta(np.pi)
+            instruction.setPhi(-self.phi[instruction.q])
+            apply_noisy_instruction(instruction)
+
+    def __apply_noisy_instruction_to_batch(self, instruction, batch):
+        qubits = instruction.getQubits() if isinstance(instruction, NoisyCNOT) else [instruction.q]
+        if isinstance(instruction, NoisyReset):
+            rows = self.batched_classical_bits[:, instruction.readBit] == 1
+            batch.apply_operation_on_qubits(self.__sample_noisy_operations(instruction, np.count_nonzero(rows)), qubits, rows)
+        else:
+            batch.apply_operation_on_qubits(self.__sample_noisy_operations(instruction, batch.batch_size), qubits)
+
+    def __noisy_instruction_batch_handler(self, instruction, batch):
+        # Batched version of __noisy_instruction_handler
+        self.__apply_noisy_instruction(instruction, lambda noisy_instruction: self.__apply_noisy_instruction_to_batch(noisy_instruction, batch), batch.apply_operation_on_qubits)
+
+    """
+    Execute the circuit once on a density matrix. Every noisy gate is applied as its average channel, estimated from the
+    given number of sampled realisations of the gate and cached for gates with the same parameters and angles.
+    The estimate is a Monte Carlo mean, the standard error of its entries decreases as 1/sqrt(samples). For the noise
+    parameters of the virtual device it is about 1e-3 for single-qubit gates and 6e-3 for the CNOT with the default
+    1000 samples, which is of the same order as the effect of the noise itself, use more samples for weak noise.
+    Mid-circuit measurements split the density matrix into branches, one for every value of the classical bits.
+    After execution, density_matrix_branches maps the classical bits (as a tuple) to the unnormalised density matrix of
+    that branch, its trace is the probability of the branch, logical_error_probability holds the probability of
+    encountering an unknown syndrome and noisy_channel_error the largest standard error of the entries of the estimated
+    channels. Returns the density matrix averaged over all branches.
+    """
+    def execute_density_matrix(self, samples: int=1000) -> DensityMatrix:
+        register = tuple(int(bit) for bit in self.classicalBitRegister.register[:self.classicalBitRegister.getAmountOfBits()])
+        self.density_matrix_branches = {register: DensityMatrix(self.N, self.dtype)}
+        self.logical_error_probability = 0
+        self.noisy_channel_error = 0
+        if not hasattr(self, 'noisy_channel_cache'):
+            self.noisy_channel_cache = {}
+        if not self.save_instructions:
+            for operation in self.operations:
+                # Derived operations have no gate instruction and are applied as a 2^N x 2^N matrix
+                if operation.instruction is None:
+                    self.density_matrix_branches[register].apply_unitary_operation(operation.get_operation())
+                else:
+                    self.density_matrix_branches[register].apply_gate_instruction(operation.instruction)
+        else:
+            for instruction in self.instructions:
+                self.__density_matrix_instruction_handler(instruction, samples)
+        density_matrix = DensityMatrix(self.N, self.dtype)
+        density_matrix.density_matrix = sum(branch.density_matrix for branch in self.density_matrix_branches.values())
+        return density_matrix
+
+    def __get_noisy_channel(self, instruction, samples):
+        # The channel only depends on the type of gate, its noise parameters and its angles
+        attributes = [name for cls in type(instruction).__mro__ for name in getattr(cls, '__slots__', ()) if hasattr(instruction, name)]
+        key = (type(instruction).__name__, samples) + tuple(sorted((name, getattr(instruction, name)) for name in attributes))
+        if key not in self.noisy_channel_cache:
+            operations = self.__sample_noisy_operations(instruction, samples)
+            self.noisy_channel_cache[key] = (NoisyGate.get_average_channel(operations), np.max(NoisyGate.get_average_channel_error(operations)))
+        channel, error = self.noisy_channel_cache[key]
+        self.noisy_channel_error = max(self.noisy_channel_error, error)
+        return channel
+
+    def __apply_noisy_instruction_to_density_matrix(self, instruction, samples):
+        qubits = instruction.getQubits() if isinstance(instruction, NoisyCNOT) else [instruction.q]
+        channel = self.__get_noisy_channel(instruction, samples)
+        for register, branch in self.density_matrix_branches.items():
+            if not isinstance(instruction, NoisyReset) or register[instruction.readBit] == 1:
+                branch.apply_channel_on_qubits(channel, qubits)
+
+    def __density_matrix_instruction_handler(self, instruction, samples):
+        if(isinstance(instruction, Measurement)):
+            branches = {}
+            for register, branch in self.density_matrix_branches.items():
+                for bit in [0, 1]:
+                    projected = branch.project_qubit(instruction.measureQubit, bit)
+                    if projected.get_trace() <= 1e-15:
+                        continue
+                    projected_register = register[:instruction.dataBit] + (bit,) + register[instruction.dataBit+1:]
+                    if projected_register in branches:
+                        branches[projected_register].density_matrix = branches[projected_register].density_matrix + projected.density_matrix
+                    else:
+                        branches[projected_register] = projected
+            self.density_matrix_branches = branches
+        elif(isinstance(instruction, Reset)):
+            for register, branch in self.density_matrix_branches.items():
+                if register[instruction.readBit] == 1:
+                    branch.apply_gate_instruction(Pauli_X(self.N, instruction.targetQubit))
+        elif(isinstance(instruction, Recovery_Bit_Flip) or isinstance(instruction, Recovery_Phase_Flip)):
+            for register, branch in self.density_matrix_branches.items():
+                syndrome = ''.join(str(bit) for bit in register[instruction.syndromeStartBit:instruction.syndromeStartBit + 4])
+                targetQubit = instruction.getTargetQubitForSyndrome(syndrome)
+                if targetQubit == -2:
+                    # Encountered logical error, unknown syndrome. No recovery applied
+                    self.logical_error_probability = self.logical_error_probability + branch.get_trace()
+                elif targetQubit >= 0:
+                    branch.apply_gate_instruction(Pauli_X(self.N, targetQubit) if isinstance(instruction, Recovery_Bit_Flip) else Pauli_Z(self.N, targetQubit))
+        elif(isinstance(instruction, NoisyGateInstruction)):
+            def apply_unitary_operation_on_qubits(operation, qubits):
+                for branch in self.density_matrix_branches.values():
+                    branch.apply_unitary_operation_on_qubits(operation, qubits)
+            self.__apply_noisy_instruction(instruction, lambda noisy_instruction: self.__apply_noisy_instruction_to_density_matrix(noisy_instruction, samples), apply_unitary_operation_on_qubits)
+        else:
+            for branch in self.density_matrix_branches.values():
+                branch.apply_gate_instruction(instruction)
+
+    """
+    Returns True if the circuit can be executed on a stabilizer tableau, i.e. it saves instructions and every instruction
+    is a Clifford gate, a measurement, a reset or a recovery instruction.
+    """
+    def is_clifford(self) -> bool:
+        if not self.save_instructions:
+            return False
+        for instruction in self.instructions:
+            if isinstance(instruction, (Measurement, Reset, Recovery_Bit_Flip, Recovery_Phase_Flip)):
+                continue
+            if not StabilizerTableau.is_clifford_instruction(instruction):
+                return False
+        return True
+
+    """
+    Execute a Clifford circuit on a stabilizer tableau instead of a state vector, which scales to many qubits.
+    Measurements are written to the classical bit register as in execute. After execution, stabilizer_tableau holds the final state.
+    """
+    def execute_stabilizer(self) -> StabilizerTableau:
+        if not self.is_clifford():
+            raise Exception("Only circuits that save instructions and consist of Clifford gates can be executed on a stabilizer tableau")
+        self.stabilizer_tableau = StabilizerTableau(self.N)
+        self.__execute_instructions_on(self.stabilizer_tableau)
+        return self.stabilizer_tableau
+
+    def __execute_instructions_on(self, state):
+        # Execute the instructions on a state with the methods measure_qubit and apply_gate_instruction,
+        # measurements, resets and recovery instructions use the classical bit register as in execute
+        for instruction in self.instructions:
+            if(isinstance(instruction, Measurement)):
+                self.classicalBitRegister.write(instruction.dataBit, state.measure_qubit(instruction.measureQubit))
+            elif(isinstance(instruction, Reset)):
+                if(self.classicalBitRegister.read(instruction.readBit) == 1):
+                    state.apply_gate_instruction(Pauli_X(self.N, instruction.targetQubit))
+            elif(isinstance(instruction, Recovery_Bit_Flip) or isinstance(instruction, Recovery_Phase_Flip)):
+                syndrome = self.classicalBitRegister.toString(instruction.syndromeStartBit, instruction.syndromeStartBit + 4)
+                targetQubit = instruction.getTargetQubitForSyndrome(syndrome)
+                if(targetQubit == -2):
+                    # Encountered logical error, unknown syndrome. No recovery applied
+                    self.logical_error_count = self.logical_error_count + 1
+                elif(targetQubit >= 0):
+                    state.apply_gate_instruction(Pauli_X(self.N, targetQubit) if isinstance(instruction, Recovery_Bit_Flip) else Pauli_Z(self.N, targetQubit))
+            elif(isinstance(instruction, NoisyGateInstruction)):
+                self.__apply_noisy_instruction(instruction, lambda noisy_instruction: self.__apply_noisy_instruction_to_state(noisy_instruction, state), state.apply_operation_on_qubits)
+            else:
+                state.apply_gate_instruction(instruction)
+
+    def __apply_noisy_instruction_to_state(self, instruction, state):
+        if isinstance(instruction, NoisyReset) and self.classicalBitRegister.read(instruction.readBit) != 1:
+            return
+        qubits = instruction.getQubits() if isinstance(instruction, NoisyCNOT) else [instruction.q]
+        state.apply_operation_on_qubits(self.__sample_noisy_operations(instruction, 1)[0], qubits)
+
+    """
+    Execute the circuit on a matrix product state, which scales to many qubits for circuits with little entanglement.
+    The bond dimension is limited by max_bond_dimension and singular values with a total weight up to cutoff are discarded,
+    the truncation_error of the returned state reports the total discarded weight. Measurements are written to the classical
+    bit register as in execute and noisy gates are sampled once. After execution, matrix_product_state holds the final state.
+    """
+    def execute_mps(self, max_bond_dimension: int=None, cutoff: float=1e-12) -> MatrixProductState:
+        if not self.save_instructions:
+            raise Exception("Only circuits that save instructions can be executed on a matrix product state")
+        self.matrix_product_state = MatrixProductState(self.N, max_bond_dimension, cutoff, self.dtype)
+        self.__execute_instructions_on(self.matrix_product_state)
+        return self.matrix_product_state
+
+    @staticmethod
+    def __get_ideal_instruction(instruction, N):
+        # The Clifford gate of which a noisy instruction is a noisy realisation
+        if isinstance(instruction, NoisyPauliX):
+            return Pauli_X(N, instruction.q)
+        if isinstance(instruction, NoisyPauliY):
+            return Pauli_Y(N, instruction.q)
+        if isinstance(instruction, NoisyPauliZ):
+            return Pauli_Z(N, instruction.q)
+        if isinstance(instruction, NoisyHadamard):
+            return Hadamard(N, instruction.q)
+        if isinstance(instruction, NoisyPhase):
+            return Phase(N, instruction.q, instruction.theta)
+        if isinstance(instruction, NoisyCNOT):
+            return CNOT(N, instruction.t_qubit, instruction.c_qubit)
+        if isinstance(instruction, NoisyReset):
+            return Reset(instruction.q, instruction.readBit)
+        return instruction
+
+    """
+    Sample many shots of a circuit with Pauli noise using Pauli frames. The circuit is executed once without noise on a
+    stabilizer tableau, randomly sampled Pauli errors are propagated for all shots at once as bit-packed frames.
+    Noisy gate instructions are treated as their ideal Clifford gate, the noise is given by the noise model instead.
+    Returns an array of shape (shots, bits) with the classical bits of every shot, in the layout of the classical bit register.
+    After sampling, pauli_frame_logical_error_count holds the number of unknown syndromes of every shot.
+    """
+    def sample_pauli_frames(self, shots: int, noise_model: PauliNoiseModel=None) -> np.ndarray:
+        if noise_model is None:
+            noise_model = PauliNoiseModel()
+        if not self.save_instructions:
+            raise Exception("Pauli frame sampling is only supported for circuits that save instructions")
+        instructions = [Circuit.__get_ideal_instruction(instruction, self.N) for instruction in self.instructions]
+        for instruction in instructions:
+            if not isinstance(instruction, (Measurement, Reset, Recovery_Bit_Flip, Recovery_Phase_Flip)) and not StabilizerTableau.is_clifford_instruction(instruction):
+                raise Exception("Only circuits of Clifford gates can be sampled using Pauli frames")
+
+        tableau = StabilizerTableau(self.N)
+        frames = PauliFrames(self.N, shots)
+        reference = [int(bit) for bit in self.classicalBitRegister.register[:self.classicalBitRegister.getAmountOfBits()]]
+        flips = np.zeros((len(reference), frames.words), dtype=np.uint64)
+        self.pauli_frame_logical_error_count = np.zeros(shots, dtype=np.int64)
+        for instruction in instructions:
+            if(isinstance(instruction, Measurement)):
+                reference[instruction.dataBit] = tableau.measure_qubit(instruction.measureQubit)
+                flips[instruction.dataBit] = frames.measure_qubit(instruction.measureQubit)
+                if noise_model.measurement_error > 0:
+                    flips[instruction.dataBit] ^= frames.random_bits(noise_model.measurement_error)
+            elif(isinstance(instruction, Reset)):
+                # Shots for which the read bit differs from the reference apply an extra X compared to the reference
+                if reference[instruction.readBit] == 1:
+                    tableau.pauli_x(instruction.targetQubit)
+                frames.x[instruction.targetQubit] ^= flips[instruction.readBit]
+            elif(isinstance(instruction, Recovery_Bit_Flip) or isinstance(instruction, Recovery_Phase_Flip)):
+                start = instruction.syndromeStartBit
+                targets_for_syndromes = np.array([instruction.getTargetQubitForSyndrome(format(syndrome, '04b')) for syndrome in range(16)])
+                reference_target = targets_for_syndromes[int(''.join(str(bit) for bit in reference[start:start + 4]), 2)]
+                bits = frames.unpack_bits(flips[start:start + 4]) ^ np.array(reference[start:start + 4], dtype=np.uint8)[:, np.newaxis]
+                targets = targets_for_syndromes[8*bits[0] + 4*bits[1] + 2*bits[2] + bits[3]]
+                # Encountered logical error, unknown syndrome. No recovery applied
+                self.pauli_frame_logical_error_count = self.pauli_frame_logical_error_count + (targets == -2)
+                if reference_target >= 0:
+                    if isinstance(instruction, Recovery_Bit_Flip):
+                        tableau.pauli_x(reference_target)
+                    else:
+                        tableau.pauli_z(reference_target)
+                for targetQubit in np.unique(np.append(targets[targets >= 0], reference_target if reference_target >= 0 else [])).astype(int):
+                    difference = frames.pack_bits((targets == targetQubit) ^ (reference_target == targetQubit))
+                    if isinstance(instruction, Recovery_Bit_Flip):
+                        frames.x[targetQubit] ^= difference
                     else:
-                        self.state_vector.apply_unitary_operation(CircuitUnitaryOperation.get_combined_operation_for_pauli_z(targetQubit, self.N))
-                elif(isinstance(instruction, NoisyGateInstruction)):
-                    self.__noisy_instruction_handler(instruction)
-                else:
-                    self.__direct_execute__(instruction.getOperation()) 
-        else:
-            for operation, description in zip(self.operations, self.descriptions):
-                self.state_vector.apply_unitary_operation(operation)
-                self.quantum_states.append(self.state_vector.get_quantum_state())
-                if print_state:
-                    print(description)
-                    print(operation)
-                    print("Current quantum state")
-                    self.state_vector.print()
-    
+                        frames.z[targetQubit] ^= difference
+            else:
+                tableau.apply_gate_instruction(instruction)
+                frames.apply_gate_instruction(instruction)
+                qubits = instruction.getQubits()
+                if len(qubits) == 1:
+                    frames.depolarize(qubits, noise_model.single_qubit_error)
+                elif len(qubits) == 2:
+                    frames.depolarize(qubits, noise_model.two_qubit_error)
+        return (frames.unpack_bits(flips) ^ np.array(reference, dtype=np.uint8)[:, np.newaxis]).T
+
     def measure(self, print_state: bool=False) -> str:
         self.state_vector.measure()
         if print_state:
@@ -1366,6 +3311,21 @@ class Circuit:
             print(self.state_vector.get_classical_state_as_string())
         return self.get_classical_state_as_string()
 
+    """
+    Measure the current quantum state many times. Returns an array with the integer indices of the classical states.
+    """
+    def sample(self, shots: int):
+        return self.state_vector.sample(shots)
+
+    """
+    Measure the current quantum state many times. Returns a dictionary with the number of occurrences of every measured classical state.
+    """
+    def get_counts(self, shots: int, little_endian_formatted: bool=False) -> dict:
+        counts = np.bincount(self.sample(shots), minlength=2**self.N)
+        indices = np.flatnonzero(counts)
+        strings = Dirac.states_as_strings(indices, self.N, little_endian_formatted)
+        return {string: int(counts[i]) for string, i in zip(strings, indices)}
+
     def get_classical_state_as_string(self, little_endian_formatted: bool=False):
         string = self.state_vector.get_classical_state_as_string()
         return string if not little_endian_formatted else string[0] + string[1:-1][::-1] + string[-1]
@@ -1379,9 +3339,9 @@ Class representing a noisy quantum circuit of N qubits.
 Inherits from Circuit.
 '''
 class NoisyCircuit(Circuit):
-    def __init__(self, N):
-        super().__init__(N)
-        self.state_vector = StateVector(self.N)
+    def __init__(self, N, validation: str = ValidationMode.ALWAYS, dtype=np.complex128, in_place: bool = False):
+        super().__init__(N, validation=validation, dtype=dtype, in_place=in_place)
+        self.state_vector = StateVector(self.N, self.validation, self.validation_cache, self.dtype, self.in_place)
         self.noisy_operations_state_prep = []
         self.noisy_operations_incoherent = []
         self.noisy_operations_readout = []
@@ -1416,7 +3376,7 @@ class NoisyCircuit(Circuit):
         noisy_operation_coherent = QubitUnitaryOperation.get_rotate_x(theta_radians)
         combined_noisy_operation_coherent = CircuitUnitaryOperation.get_combined_operation_for_qubit(noisy_operation_coherent, q, self.N)
         self.descriptions.append(f"Coherent noise rot_X {theta} deg")
-        self.operations.append(combined_noisy_operation_coherent)
+        self.operations.append(GateDescriptor.for_operation(combined_noisy_operation_coherent))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'N'
@@ -1428,7 +3388,7 @@ class NoisyCircuit(Circuit):
         noisy_operation_coherent = QubitUnitaryOperation.get_rotate_y(theta_radians)
         combined_noisy_operation_coherent = CircuitUnitaryOperation.get_combined_operation_for_qubit(noisy_operation_coherent, q, self.N)
         self.descriptions.append(f"Coherent noise rot_Y {theta} deg")
-        self.operations.append(combined_noisy_operation_coherent)
+        self.operations.append(GateDescriptor.for_operation(combined_noisy_operation_coherent))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'N'
@@ -1440,7 +3400,7 @@ class NoisyCircuit(Circuit):
         noisy_operation_coherent = QubitUnitaryOperation.get_rotate_z(theta_radians)
         combined_noisy_operation_coherent = CircuitUnitaryOperation.get_combined_operation_for_qubit(noisy_operation_coherent, q, self.N)
         self.descriptions.append(f"Coherent noise rot_Z {theta} deg")
-        self.operations.append(combined_noisy_operation_coherent)
+        self.operations.append(GateDescriptor.for_operation(combined_noisy_operation_coherent))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'N'
@@ -1461,8 +3421,24 @@ class NoisyCircuit(Circuit):
         combined_noisy_operation_readout = CircuitUnitaryOperation.get_combined_operation_for_qubit(noisy_operation_readout, q, self.N)
         self.noisy_operations_readout.append(combined_noisy_operation_readout)
 
+    # Override method merge_diagonal_gates() from class Circuit
+    def merge_diagonal_gates(self) -> int:
+        # Incoherent noise is applied after every gate and coherent noise is recognised by its description,
+        # merging gates would change the noise model of the circuit
+        raise Exception("Merging diagonal gates is not supported for noisy circuits")
+
+    # Override method execute_batch() from class Circuit
+    def execute_batch(self, batch_size: int):
+        # The noise of the gates is sampled once when the circuit is built, every trajectory would replay the same realisation
+        raise Exception("Noisy circuits sample their noise when they are built and cannot be executed as a batch")
+
+    # Override method execute_density_matrix() from class Circuit
+    def execute_density_matrix(self, samples: int=1000):
+        # The stored operations are one sampled realisation of the noise, not the average channel of the noisy gates
+        raise Exception("Noisy circuits sample their noise when they are built and cannot be executed on a density matrix")
+
     def create_ideal_circuit(self):
-        ideal_circuit = NoisyCircuit(self.N)
+        ideal_circuit = NoisyCircuit(self.N, self.validation, self.dtype, self.in_place)
         for operation, description, gate in zip(self.operations, self.descriptions, self.gates):
             if "Coherent noise" not in description:
                 ideal_circuit.operations.append(operation)
@@ -1470,35 +3446,54 @@ class NoisyCircuit(Circuit):
                 ideal_circuit.gates.append(gate)
         return ideal_circuit
 
+    # Override method compile() from class Circuit
+    def compile(self):
+        raise Exception("Noisy circuits apply incoherent noise during execution and cannot be compiled")
+
     # Override method execute() from class Circuit
     def execute(self, print_state=False):
-        self.state_vector = StateVector(self.N)
+        self.state_vector = StateVector(self.N, self.validation, self.validation_cache, self.dtype, self.in_place)
         for noisy_operation in self.noisy_operations_state_prep:
             self.state_vector.apply_noisy_operation(noisy_operation)
-        self.quantum_states = [self.state_vector.get_quantum_state()]
+        self.state_recorder.start(self.N, self.dtype, 1 + len(self.operations))
+        self.state_recorder.record(self.state_vector)
+        bloch_vectors = self.state_vector.bloch_vectors()
         for q in range(self.N):
-            self.x_measures[q] = [self.state_vector.measure_x(q)]
-            self.y_measures[q] = [self.state_vector.measure_y(q)]
-            self.z_measures[q] = [self.state_vector.measure_z(q)]
+            self.x_measures[q] = [bloch_vectors[q,0]]
+            self.y_measures[q] = [bloch_vectors[q,1]]
+            self.z_measures[q] = [bloch_vectors[q,2]]
         if print_state:
             print("Initial quantum state")
             self.state_vector.print()
         for operation, description in zip(self.operations, self.descriptions):
-            self.state_vector.apply_unitary_operation(operation)
-            self.quantum_states.append(self.state_vector.get_quantum_state())
+            operation.apply(self.state_vector)
+            self.state_recorder.record(self.state_vector)
             if "Coherent noise" not in description:
                 for noisy_operation in self.noisy_operations_incoherent:
                     self.state_vector.apply_noisy_operation(noisy_operation)
+                bloch_vectors = self.state_vector.bloch_vectors()
                 for q in range(self.N):
-                    self.x_measures[q].append(self.state_vector.measure_x(q))
-                    self.y_measures[q].append(self.state_vector.measure_y(q))
-                    self.z_measures[q].append(self.state_vector.measure_z(q))
+                    self.x_measures[q].append(bloch_vectors[q,0])
+                    self.y_measures[q].append(bloch_vectors[q,1])
+                    self.z_measures[q].append(bloch_vectors[q,2])
                 if print_state:
                     print(description)
-                    print(operation)
+                    print(operation.get_operation())
                     print("Current quantum state")
                     self.state_vector.print()
 
+    # Override method is_final_state_deterministic() from class Circuit
+    def is_final_state_deterministic(self) -> bool:
+        # Readout noise is applied to the state vector every time the circuit is measured
+        return len(self.noisy_operations_readout) == 0
+
+    # Override method sample() from class Circuit
+    def sample(self, shots: int):
+        # Readout noise is applied once to the final state before all outcomes are drawn
+        for noisy_operation in self.noisy_operations_readout:
+            self.state_vector.apply_noisy_operation(noisy_operation)
+        return self.state_vector.sample(shots)
+
     # Override method measure() from class Circuit
     def measure(self, print_state=False):
         for noisy_operation in self.noisy_operations_readout:
@@ -1555,7 +3550,7 @@ class NoisyCircuit(Circuit):
 
         combined_operation = CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(theta, phi, p, T1, T2), q, self.N)
         self.descriptions.append(f"Noisy Pauli X on qubit {q}")
-        self.operations.append(combined_operation)
+        self.operations.append(GateDescriptor.for_operation(combined_operation))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'X'
@@ -1590,7 +3585,7 @@ class NoisyCircuit(Circuit):
 
         combined_operation = CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(theta, phi, p, T1, T2), q, self.N)
         self.descriptions.append(f"Noisy Pauli Y on qubit {q}")
-        self.operations.append(combined_operation)
+        self.operations.append(GateDescriptor.for_operation(combined_operation))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'Y'
@@ -1637,7 +3632,7 @@ class NoisyCircuit(Circuit):
 
         combined_operation = CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(theta, phi, p, T1, T2), q, self.N)
         self.descriptions.append(f"Noisy Hadamard on qubit {q}")
-        self.operations.append(combined_operation)
+        self.operations.append(GateDescriptor.for_operation(combined_operation))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'H'
@@ -1688,7 +3683,7 @@ class NoisyCircuit(Circuit):
         # X gate is now 
         combined_operation = CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(theta, phi, p, T1, T2), q, self.N)
         self.descriptions.append(f"Noisy X rotation of {theta} on qubit {q}")
-        self.operations.append(combined_operation)
+        self.operations.append(GateDescriptor.for_operation(combined_operation))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'X'
@@ -1721,7 +3716,7 @@ class NoisyCircuit(Circuit):
 
         combined_operation = CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(theta, phi, p, T1, T2), q, self.N)
         self.descriptions.append(f"Noisy Sqrt(X) on qubit {q}")
-        self.operations.append(combined_operation)
+        self.operations.append(GateDescriptor.for_operation(combined_operation))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[q] = 'x'
@@ -1764,10 +3759,7 @@ class NoisyCircuit(Circuit):
 
         gate_length = 5.61777778e-07
 
-        # Create an identity matrix for the remaining qubits
-        identity_matrix = np.eye(2**(self.N - 2))
-
-        # Create cnot matrix
+        # Create cnot matrix, it acts on the control and target qubit in increasing order
         if c_qubit < t_qubit:
             cnot_operation = NoisyGate.construct_cnot(self.phi[c_qubit], self.phi[t_qubit], gate_length, gate_error, c_p, t_p, c_T1, c_T2, t_T1, t_T2)
             self.phi[c_qubit] = self.phi[c_qubit] - np.pi/2
@@ -1776,24 +3768,8 @@ class NoisyCircuit(Circuit):
             self.phi[c_qubit] = self.phi[c_qubit] + np.pi/2 + np.pi
             self.phi[t_qubit] = self.phi[t_qubit] + np.pi/2
         
-        # Perform the Kronecker product to expand the CNOT operation
-        cnot_operation = np.kron(cnot_operation, identity_matrix)
-
-        # Create swap matrices
-        if c_qubit < t_qubit:
-            # control qubit should swap with qubit 0
-            swap_control = CircuitUnitaryOperation.get_combined_operation_for_swap(0, c_qubit, self.N) if c_qubit != 0 else np.eye(2**self.N)
-            swap_target = CircuitUnitaryOperation.get_combined_operation_for_swap(1, t_qubit, self.N) if t_qubit != 1 else np.eye(2**self.N)
-        else:
-            # target qubit should swap with qubit 0
-            swap_target = CircuitUnitaryOperation.get_combined_operation_for_swap(0, t_qubit, self.N) if t_qubit != 0 else np.eye(2**self.N)
-            swap_control = CircuitUnitaryOperation.get_combined_operation_for_swap(1, c_qubit, self.N) if c_qubit != 1 else np.eye(2**self.N)
-
-        # Construct the full CNOT operation with swaps
-        operation = swap_control @ swap_target @ cnot_operation @ swap_target.T.conj() @ swap_control.T.conj() 
-
         self.descriptions.append(f"Noisy CNOT with target qubit {t_qubit} and control qubit {c_qubit}")
-        self.operations.append(operation)
+        self.operations.append(GateDescriptor.for_local_operation(cnot_operation, [min(c_qubit, t_qubit), max(c_qubit, t_qubit)], self.N))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[c_qubit] = '*'
@@ -1836,33 +3812,14 @@ class NoisyCircuit(Circuit):
 
         gate_length = 5.61777778e-07
 
-        # Create an identity matrix for the remaining qubits
-        identity_matrix = np.eye(2**(self.N - 2))
-
-        # Create ecr matrix
+        # Create ecr matrix, it acts on the control and target qubit in increasing order
         if c_qubit < t_qubit:
             ecr_operation = NoisyGate.construct_ecr(self.phi[c_qubit], self.phi[t_qubit], gate_length, gate_error, c_p, t_p, c_T1, c_T2, t_T1, t_T2)
         else:
             ecr_operation = NoisyGate.construct_ecr_inverse(self.phi[c_qubit], self.phi[t_qubit], gate_length, gate_error, c_p, t_p, c_T1, c_T2, t_T1, t_T2)
         
-        # Perform the Kronecker product to expand the ecr operation
-        ecr_operation = np.kron(ecr_operation, identity_matrix)
-
-        # Create swap matrices
-        if c_qubit < t_qubit:
-            # control qubit should swap with qubit 0
-            swap_control = CircuitUnitaryOperation.get_combined_operation_for_swap(0, c_qubit, self.N) if c_qubit != 0 else np.eye(2**self.N)
-            swap_target = CircuitUnitaryOperation.get_combined_operation_for_swap(1, t_qubit, self.N) if t_qubit != 1 else np.eye(2**self.N)
-        else:
-            # target qubit should swap with qubit 0
-            swap_target = CircuitUnitaryOperation.get_combined_operation_for_swap(0, t_qubit, self.N) if t_qubit != 0 else np.eye(2**self.N)
-            swap_control = CircuitUnitaryOperation.get_combined_operation_for_swap(1, c_qubit, self.N) if c_qubit != 1 else np.eye(2**self.N)
-
-        # Construct the full ecr operation with swaps
-        ecr_operation = swap_control @ swap_target @ ecr_operation @ swap_target.T.conj() @ swap_control.T.conj()
-
         self.descriptions.append(f"Noisy ecr with target qubit {t_qubit} and control qubit {c_qubit}")
-        self.operations.append(ecr_operation)
+        self.operations.append(GateDescriptor.for_local_operation(ecr_operation, [min(c_qubit, t_qubit), max(c_qubit, t_qubit)], self.N))
         gate_as_string = '.'*self.N
         gate_as_list = list(gate_as_string)
         gate_as_list[c_qubit] = '*'
@@ -1925,6 +3882,10 @@ class QuantumUtil:
     def run_circuit(circuit:Circuit, nr_runs=1000):
         # if(circuit.save_instructions):
         #     raise Exception("Direct Operation Execution is enabled, QuantumUtil not supported with this flag")
+        if circuit.is_final_state_deterministic():
+            # The final state is the same for every run, execute once and draw all runs from its probabilities
+            circuit.execute()
+            return Dirac.states_as_strings(circuit.sample(nr_runs), circuit.N)
         result = []
         for i in range(nr_runs):
             circuit.execute()
@@ -1938,11 +3899,7 @@ class QuantumUtil:
     @staticmethod
     def measure_circuit(circuit:Circuit, nr_measurements=1000, little_endian_formatted: bool=False):
         circuit.execute()
-        result = []
-        for i in range(nr_measurements):
-            circuit.measure()
-            result.append(circuit.get_classical_state_as_string(little_endian_formatted))
-        return result
+        return Dirac.states_as_strings(circuit.sample(nr_measurements), circuit.N, little_endian_formatted)
 
     """"
     Function to run a quantum circuit many times and measure its classical register state many times
@@ -1957,6 +3914,7 @@ class QuantumUtil:
 
     """
     Function to plot a histogram of all classical states after executing the circuit multiple times.
+    The classical states are given as a list of strings, or as a dictionary of counts as returned by Circuit.get_counts().
     """
     @staticmethod
     def histogram_of_classical_states(ideal_string_array, noisy_string_array=None):
@@ -2000,19 +3958,37 @@ class QuantumUtil:
             plt.show()
 
 
+    """
+    Returns a label for every intermediate quantum state recorded by the state recorder of the circuit.
+    Step 0 is the initial state and step i the state after operation i.
+    """
+    @staticmethod
+    def __get_recorded_steps_as_strings(circuit:Circuit, show_description=True):
+        labels = []
+        for step in circuit.state_recorder.get_steps():
+            if step == 0:
+                description, gate = 'Initial state', '.'*circuit.N
+            elif step <= len(circuit.gates):
+                description, gate = circuit.descriptions[step - 1], circuit.gates[step - 1]
+            else:
+                description, gate = f"Step {step}", '.'*circuit.N
+            labels.append(f"{description}  {gate}" if show_description else f"{gate}")
+        return labels
+
     """
     Function to plot a all intermediate (quantum) states of the last execution of a circuit.
     """
     @staticmethod
     def show_all_intermediate_states(circuit:Circuit, show_description=True, show_colorbar=True):
-        matrix_of_all_states = np.zeros((2**circuit.N, len(circuit.quantum_states)), dtype=complex)
+        quantum_states = circuit.quantum_states
+        matrix_of_all_states = np.zeros((2**circuit.N, len(quantum_states)), dtype=complex)
         i = 0
-        for state_vector in circuit.quantum_states:
+        for state_vector in quantum_states:
             matrix_of_all_states[:,i] = state_vector.flatten()
             i = i + 1
 
         fig_width  = 4 + circuit.N
-        fig_height = 4 + 0.5*len(circuit.operations)
+        fig_height = 4 + 0.5*len(quantum_states)
         fig, ax = plt.subplots()
         fig.set_size_inches(fig_width, fig_height)
         ax.patch.set_facecolor('gray')
@@ -2046,20 +4022,8 @@ class QuantumUtil:
             all_states_as_string.append(Dirac.state_as_string(i,circuit.N))
         plt.xticks(positions_x, all_states_as_string, rotation='vertical')
 
-        j = 0.5
-        positions_y = [j]
-        if show_description:
-            all_operations_as_string = ['Initial state  ' + '.'*circuit.N]
-        else:
-            all_operations_as_string = ['.'*circuit.N]
-        j = j + 1
-        for description, gate in zip(circuit.descriptions, circuit.gates):
-            positions_y.append(j)
-            if show_description:
-                all_operations_as_string.append(f"{description}  {gate}")
-            else:
-                all_operations_as_string.append(f"{gate}")
-            j = j + 1
+        all_operations_as_string = QuantumUtil.__get_recorded_steps_as_strings(circuit, show_description)
+        positions_y = [j + 0.5 for j in range(len(all_operations_as_string))]
         plt.yticks(positions_y, all_operations_as_string)
 
         if show_colorbar:
@@ -2079,15 +4043,16 @@ class QuantumUtil:
     """
     @staticmethod
     def show_all_probabilities(circuit:Circuit, show_description=True, show_colorbar=True):
-        matrix_of_probabilities = np.zeros((2**circuit.N,len(circuit.quantum_states)))
+        quantum_states = circuit.quantum_states
+        matrix_of_probabilities = np.zeros((2**circuit.N,len(quantum_states)))
         i = 0
-        for state_vector in circuit.quantum_states:
+        for state_vector in quantum_states:
             probalities = np.square(np.abs(state_vector)).flatten()
             matrix_of_probabilities[:,i] = probalities
             i = i + 1
 
         fig_width  = 4 + circuit.N
-        fig_height = 4 + 0.5*len(circuit.operations)
+        fig_height = 4 + 0.5*len(quantum_states)
         fig, ax = plt.subplots()
         fig.set_size_inches(fig_width, fig_height)
         ax.patch.set_facecolor('gray')
@@ -2115,19 +4080,8 @@ class QuantumUtil:
             all_states_as_string.append(Dirac.state_as_string(i, circuit.N))
         plt.xticks(positions_x, all_states_as_string, rotation='vertical')
 
-        positions_y = [0]
-        if show_description:
-            all_operations_as_string = ['Initial state  ' + '.'*circuit.N]
-        else:
-            all_operations_as_string = ['.'*circuit.N]
-        j = 1
-        for description, gate in zip(circuit.descriptions, circuit.gates):
-            positions_y.append(j)
-            if show_description:
-                all_operations_as_string.append(f"{description}  {gate}")
-            else:
-                all_operations_as_string.append(f"{gate}")
-            j = j + 1
+        all_operations_as_string = QuantumUtil.__get_recorded_steps_as_strings(circuit, show_description)
+        positions_y = list(range(len(all_operations_as_string)))
         plt.yticks(positions_y, all_operations_as_string)
 
         if show_colorbar:
@@ -2249,165 +4203,389 @@ These instructions are being used by the execute() function of the Circuit class
 """
 
 class GateInstruction(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def getOperation(self):
         pass
 
-class Identity(GateInstruction):
+    def getSparseOperation(self):
+        # By default the combined 2^N x 2^N operation is converted, subclasses override this to build it sparse directly
+        return scipy.sparse.csr_matrix(self.getOperation())
+
+    def getQubits(self):
+        # Qubits on which the gate acts, by default all qubits of the circuit
+        return list(range(self.totalQubits))
+
+    def getLocalOperation(self):
+        # Operation on the qubits returned by getQubits(), the first qubit corresponds to the most significant bit
+        return self.getOperation()
+
+    def applyOperation(self, state_vector):
+        # By default the combined 2^N x 2^N operation is applied, subclasses override this with a faster kernel
+        state_vector.apply_unitary_operation(self.getOperation())
+
+"""
+Gate instruction acting on a single qubit, applied to the state vector by a 2 x 2 kernel on the target axis.
+"""
+class SingleQubitGateInstruction(GateInstruction):
+    __slots__ = ()
+
+    @abstractmethod
+    def getQubitOperation(self):
+        pass
+
+    def getOperation(self) -> CircuitUnitaryOperation:
+        return CircuitUnitaryOperation.get_combined_operation_for_qubit(self.getQubitOperation(), self.targetQubit, self.totalQubits)
+
+    def getSparseOperation(self):
+        return SparseCircuitUnitaryOperation.get_combined_operation_for_qubit(self.getQubitOperation(), self.targetQubit, self.totalQubits)
+
+    def getQubits(self):
+        return [self.targetQubit]
+
+    def getLocalOperation(self):
+        return self.getQubitOperation()
+
+    def applyOperation(self, state_vector):
+        state_vector.apply_unitary_operation_on_qubit(self.getQubitOperation(), self.targetQubit)
+
+"""
+Gate instruction with a diagonal matrix, applied to the state vector as an elementwise multiplication with its diagonal.
+"""
+class DiagonalGateInstruction(GateInstruction):
+    __slots__ = ()
+
+    @abstractmethod
+    def getDiagonal(self):
+        pass
+
+    def getOperation(self) -> CircuitUnitaryOperation:
+        return np.diag(self.getDiagonal())
+
+    def getSparseOperation(self):
+        return SparseCircuitUnitaryOperation.get_combined_operation_for_diagonal(self.getDiagonal())
+
+    def applyOperation(self, state_vector):
+        state_vector.apply_diagonal_operation(self.getDiagonal())
+
+"""
+Diagonal gate instruction acting on a single qubit, applied in factored form using only its two diagonal entries.
+"""
+class DiagonalQubitGateInstruction(DiagonalGateInstruction, SingleQubitGateInstruction):
+    __slots__ = ()
+
+    def getDiagonal(self):
+        return CircuitUnitaryOperation.get_combined_diagonal_for_qubit(np.diagonal(self.getQubitOperation()), self.targetQubit, self.totalQubits)
+
+    def applyOperation(self, state_vector):
+        state_vector.apply_diagonal_operation_on_qubit(np.diagonal(self.getQubitOperation()), self.targetQubit)
+
+"""
+Gate instruction that permutes the computational basis states, applied to the state vector as an index gather.
+"""
+class PermutationGateInstruction(GateInstruction):
+    __slots__ = ()
+
+    @abstractmethod
+    def getPermutation(self):
+        pass
+
+    def getOperation(self) -> CircuitUnitaryOperation:
+        return CircuitUnitaryOperation.get_combined_operation_for_permutation(self.getPermutation())
+
+    def getSparseOperation(self):
+        return SparseCircuitUnitaryOperation.get_combined_operation_for_permutation(self.getPermutation())
+
+    def applyOperation(self, state_vector):
+        state_vector.apply_permutation(self.getPermutation())
+
+"""
+Instruction for a diagonal operation on all qubits, for example the result of merging consecutive diagonal gates.
+"""
+class Diagonal_Operation(DiagonalGateInstruction):
+    __slots__ = ('totalQubits', 'diagonal')
+
+    def __init__(self, totalQubits: int, diagonal):
+        self.totalQubits = totalQubits
+        self.diagonal = diagonal
+
+    def getDiagonal(self):
+        return self.diagonal
+
+class Identity(SingleQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit')
+
     def __init__(self, totalQubits: int, targetQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
 
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_identity()
+
+    def applyOperation(self, state_vector):
+        pass
+
+
+"""
+Instruction for an arbitrary unitary operation on a few qubits, for example the result of fusing a block of gates.
+The operation is applied to the state vector by a tensor contraction with the axes of the qubits.
+"""
+class Unitary_Operation(GateInstruction):
+    __slots__ = ('totalQubits', 'qubits', 'operation')
+
+    def __init__(self, totalQubits: int, qubits: list, operation):
+        self.totalQubits = totalQubits
+        self.qubits = qubits
+        self.operation = operation
+
     def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_identity(self.targetQubit, self.totalQubits)
+        return CircuitUnitaryOperation.get_combined_operation_for_qubits(self.operation, self.qubits, self.totalQubits)
+
+    def applyOperation(self, state_vector):
+        state_vector.apply_unitary_operation_on_qubits(self.operation, self.qubits)
+
+    def getQubits(self):
+        return self.qubits
+
+    def getLocalOperation(self):
+        return self.operation
+
+"""
+Instruction for an arbitrary unitary operation on a single qubit, for example the result of fusing consecutive single-qubit gates.
+"""
+class Qubit_Unitary_Operation(SingleQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'operation')
+
+    def __init__(self, totalQubits: int, targetQubit: int, operation):
+        self.totalQubits = totalQubits
+        self.targetQubit = targetQubit
+        self.operation = operation
 
+    def getQubitOperation(self):
+        return self.operation
+
+class Pauli_X(PermutationGateInstruction, SingleQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit')
 
-class Pauli_X(GateInstruction):
     def __init__(self, totalQubits: int, targetQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_pauli_x(self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_pauli_x()
+
+    def getPermutation(self):
+        return CircuitUnitaryOperation.get_permutation_for_pauli_x(self.targetQubit, self.totalQubits)
     
-class Pauli_Y(GateInstruction):
+class Pauli_Y(SingleQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit')
+
     def __init__(self, totalQubits: int, targetQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_pauli_y(self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_pauli_y()
     
-class Pauli_Z(GateInstruction):
+class Pauli_Z(DiagonalQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit')
+
     def __init__(self, totalQubits: int, targetQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_pauli_z(self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_pauli_z()
     
-class Hadamard(GateInstruction):
+class Hadamard(SingleQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit')
+
     def __init__(self, totalQubits: int, targetQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_hadamard(self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_hadamard()
     
-class Phase(GateInstruction):
+class Phase(DiagonalQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'theta')
+
     def __init__(self, totalQubits: int, targetQubit: int, theta: float):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.theta = theta
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_phase(self.theta, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_phase(self.theta)
+
+class Rotate_X(SingleQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'theta')
 
-class Rotate_X(GateInstruction):
     def __init__(self, totalQubits: int, targetQubit: int, theta: float):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.theta = theta
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_rotate_x(self.theta, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_rotate_x(self.theta)
+
+class Rotate_Y(SingleQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'theta')
 
-class Rotate_Y(GateInstruction):
     def __init__(self, totalQubits: int, targetQubit: int, theta: float):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.theta = theta
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_rotate_y(self.theta, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_rotate_y(self.theta)
+
 
+class Rotate_Z(DiagonalQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'theta')
 
-class Rotate_Z(GateInstruction):
     def __init__(self, totalQubits: int, targetQubit: int, theta: float):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.theta = theta
 
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_rotate_z(self.theta)
+
+"""
+Gate instruction acting on a target qubit if the control qubit is 1, applied to the state vector by a 2 x 2 kernel
+on the half of the amplitudes for which the control qubit is 1.
+"""
+class ControlledQubitGateInstruction(GateInstruction):
+    __slots__ = ()
+
+    @abstractmethod
+    def getQubitOperation(self):
+        pass
+
     def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_rotate_z(self.theta, self.targetQubit, self.totalQubits)
+        return CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(self.getQubitOperation(), self.controlQubit, self.targetQubit, self.totalQubits)
+
+    def getSparseOperation(self):
+        return SparseCircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(self.getQubitOperation(), self.controlQubit, self.targetQubit, self.totalQubits)
+
+    def getQubits(self):
+        return [self.controlQubit, self.targetQubit]
+
+    def getLocalOperation(self):
+        return CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation(self.getQubitOperation())
+
+    def applyOperation(self, state_vector):
+        state_vector.apply_controlled_unitary_operation_on_qubit(self.getQubitOperation(), self.controlQubit, self.targetQubit)
+
+"""
+Controlled gate instruction for which the operation on the target qubit is diagonal.
+"""
+class DiagonalControlledQubitGateInstruction(DiagonalGateInstruction, ControlledQubitGateInstruction):
+    __slots__ = ()
+
+    def getDiagonal(self):
+        return CircuitUnitaryOperation.get_combined_diagonal_for_controlled_qubit_operation(np.diagonal(self.getQubitOperation()), self.controlQubit, self.targetQubit, self.totalQubits)
+
+class CNOT(PermutationGateInstruction, ControlledQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'controlQubit')
 
-class CNOT(GateInstruction):
     def __init__(self, totalQubits: int, targetQubit: int, controlQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_cnot(self.controlQubit, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_pauli_x()
+
+    def getPermutation(self):
+        return CircuitUnitaryOperation.get_permutation_for_cnot(self.controlQubit, self.targetQubit, self.totalQubits)
     
-class Controlled_Pauli_Y(GateInstruction):
+class Controlled_Pauli_Y(ControlledQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'controlQubit')
+
     def __init__(self, totalQubits: int, targetQubit: int, controlQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_pauli_y(self.controlQubit, self.targetQubit, self.totalQubits)
-       
-class Controlled_Pauli_Z(GateInstruction):
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_pauli_y()
+    
+class Controlled_Pauli_Z(DiagonalControlledQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'controlQubit')
+
     def __init__(self, totalQubits: int, targetQubit: int, controlQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_pauli_z(self.controlQubit, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_pauli_z()
     
-class Controlled_Hadamard(GateInstruction):
+class Controlled_Hadamard(ControlledQubitGateInstruction):
+    __slots__ = ('totalQubits', 'targetQubit', 'controlQubit')
+
     def __init__(self, totalQubits: int, targetQubit: int, controlQubit: int):
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_hadamard(self.controlQubit, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_hadamard()
     
-class Controlled_Phase(GateInstruction):
+class Controlled_Phase(DiagonalControlledQubitGateInstruction):
+    __slots__ = ('theta', 'totalQubits', 'targetQubit', 'controlQubit')
+
     def __init__(self, theta: float, totalQubits: int, targetQubit: int, controlQubit: int):
         self.theta = theta
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_phase(self.theta, self.controlQubit, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_phase(self.theta)
     
-class Controlled_Rotate_X(GateInstruction):
+class Controlled_Rotate_X(ControlledQubitGateInstruction):
+    __slots__ = ('theta', 'totalQubits', 'targetQubit', 'controlQubit')
+
     def __init__(self, theta: float, totalQubits: int, targetQubit: int, controlQubit: int):
         self.theta = theta
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_rotate_x(self.theta, self.controlQubit, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_rotate_x(self.theta)
     
-class Controlled_Rotate_Y(GateInstruction):
+class Controlled_Rotate_Y(ControlledQubitGateInstruction):
+    __slots__ = ('theta', 'totalQubits', 'targetQubit', 'controlQubit')
+
     def __init__(self, theta: float, totalQubits: int, targetQubit: int, controlQubit: int):
         self.theta = theta
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_rotate_y(self.theta, self.controlQubit, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_rotate_y(self.theta)
     
-class Controlled_Rotate_Z(GateInstruction):
+class Controlled_Rotate_Z(DiagonalControlledQubitGateInstruction):
+    __slots__ = ('theta', 'totalQubits', 'targetQubit', 'controlQubit')
+
     def __init__(self, theta: float, totalQubits: int, targetQubit: int, controlQubit: int):
         self.theta = theta
         self.totalQubits = totalQubits
         self.targetQubit = targetQubit
         self.controlQubit = controlQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_controlled_rotate_z(self.theta, self.controlQubit, self.targetQubit, self.totalQubits)
+    def getQubitOperation(self):
+        return QubitUnitaryOperation.get_rotate_z(self.theta)
     
 class Controlled_Unitary_Operation(GateInstruction):
+    __slots__ = ('totalQubits', 'operation', 'targetQubit', 'controlQubit')
+
     def __init__(self, totalQubits: int, operation, targetQubit: int, controlQubit: int):
         self.totalQubits = totalQubits
         self.operation = operation
@@ -2416,53 +4594,101 @@ class Controlled_Unitary_Operation(GateInstruction):
 
     def getOperation(self) -> CircuitUnitaryOperation:
         return CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(self.operation, self.controlQubit, self.targetQubit, self.totalQubits)
+
+    def getSparseOperation(self):
+        return SparseCircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(self.operation, self.controlQubit, self.targetQubit, self.totalQubits)
+
+    def applyOperation(self, state_vector):
+        # The operation acts on consecutive qubits starting at the target qubit
+        state_vector.apply_controlled_unitary_operation_on_qubits(self.operation, [self.controlQubit], self.getQubits()[1:])
+
+    def getQubits(self):
+        return [self.controlQubit] + list(range(self.targetQubit, self.targetQubit + int(round(math.log(self.operation.shape[0], 2)))))
+
+    def getLocalOperation(self):
+        return CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation(self.operation)
     
  
-class Swap(GateInstruction):
+class Swap(PermutationGateInstruction):
+    __slots__ = ('totalQubits', 'a', 'b')
+
     def __init__(self, totalQubits: int, a: int, b: int):
         self.totalQubits = totalQubits
         self.a = a
         self.b = b
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_swap(self.a, self.b, self.totalQubits)
+    def getPermutation(self):
+        return CircuitUnitaryOperation.get_permutation_for_swap(self.a, self.b, self.totalQubits)
+
+    def getQubits(self):
+        return [self.a, self.b]
+
+    def getLocalOperation(self):
+        return CircuitUnitaryOperation.get_combined_operation_for_swap(0, 1, 2)
    
-class Fredkin(GateInstruction):
+class Fredkin(PermutationGateInstruction):
+    __slots__ = ('totalQubits', 'controlQubit', 'a', 'b')
+
     def __init__(self, totalQubits: int, controlQubit: int, a: int, b: int):
         self.totalQubits = totalQubits
         self.controlQubit = controlQubit
         self.a = a
         self.b = b
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_fredkin(self.controlQubit, self.a, self.b, self.totalQubits)
+    def getPermutation(self):
+        return CircuitUnitaryOperation.get_permutation_for_fredkin(self.controlQubit, self.a, self.b, self.totalQubits)
+
+    def getQubits(self):
+        return [self.controlQubit, self.a, self.b]
+
+    def getLocalOperation(self):
+        return CircuitUnitaryOperation.get_combined_operation_for_fredkin(0, 1, 2, 3)
     
-class Toffoli(GateInstruction):
+class Toffoli(PermutationGateInstruction):
+    __slots__ = ('totalQubits', 'control_a', 'control_b', 'targetQubit')
+
     def __init__(self, totalQubits: int, control_a: int, control_b: int, targetQubit: int):
+        if control_a == control_b or control_a == targetQubit or control_b == targetQubit:
+            raise ValueError(f'Toffoli gate not supported for control_a = {control_a}, control_b = {control_b}, and target = {targetQubit}')
         self.totalQubits = totalQubits
         self.control_a = control_a
         self.control_b = control_b
         self.targetQubit = targetQubit
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_toffoli(self.control_a, self.control_b, self.targetQubit, self.totalQubits)
+    def getPermutation(self):
+        return CircuitUnitaryOperation.get_permutation_for_toffoli(self.control_a, self.control_b, self.targetQubit, self.totalQubits)
+
+    def getQubits(self):
+        return [self.control_a, self.control_b, self.targetQubit]
+
+    def getLocalOperation(self):
+        return CircuitUnitaryOperation.get_combined_operation_for_toffoli(0, 1, 2, 3)
     
-class Multi_Controlled_Pauli_Z(GateInstruction):
+class Multi_Controlled_Pauli_Z(DiagonalGateInstruction):
+    __slots__ = ('totalQubits',)
+
     def __init__(self, totalQubits: int):
         self.totalQubits = totalQubits
 
     def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_multi_controlled_pauli_z_operation(self.control_a, self.control_b, self.targetQubit, self.totalQubits)
+        return CircuitUnitaryOperation.get_combined_operation_for_multi_controlled_pauli_z_operation(self.totalQubits)
+
+    def getDiagonal(self):
+        return CircuitUnitaryOperation.get_combined_diagonal_for_multi_controlled_pauli_z_operation(self.totalQubits)
     
 
-class Multi_Controlled_Pauli_X(GateInstruction):
+class Multi_Controlled_Pauli_X(PermutationGateInstruction):
+    __slots__ = ('totalQubits',)
+
     def __init__(self, totalQubits: int):
         self.totalQubits = totalQubits
 
-    def getOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_multi_controlled_pauli_x_operation(self.totalQubits)
+    def getPermutation(self):
+        return CircuitUnitaryOperation.get_permutation_for_multi_controlled_pauli_x_operation(self.totalQubits)
     
 class Measurement():
+    __slots__ = ('measureQubit', 'dataBit')
+
     def __init__(self, measureQubit: int, dataBit: int):
         self.measureQubit = measureQubit
         self.dataBit = dataBit
@@ -2471,6 +4697,8 @@ Applies a Pauli x gate to the targetQubit IF the readBit is equal to 1
 Results in the qubit always being |0>
 """
 class Reset():
+    __slots__ = ('readBit', 'targetQubit')
+
     def __init__(self, targetQubit: int, readBit: int):
         self.readBit = readBit
         self.targetQubit = targetQubit
@@ -2479,6 +4707,8 @@ class Reset():
 Special operation, used for executing a recovery from a phase flip when using surface codes
 """
 class Recovery_Phase_Flip():
+    __slots__ = ('syndromeStartBit', 'totalQubits')
+
     """
     Creates a Recovery instruction for phase flips
 
@@ -2504,10 +4734,14 @@ class Recovery_Phase_Flip():
         }
         return recovery_actions.get(syndrome, recovery_actions['Logical Error'])
 
+    def getTargetQubitForSyndrome(self, syndrome: str) -> int:
+        # Target qubit of the recovery for a syndrome of 4 bits, -1 if no phase flips are detected and -2 for a logical error
+        return int(self.__get_recovery(syndrome))
+
     def getTargetQubit(self, register: ClassicalBitRegister) -> int:
         # Deciding the best suitable recovery option based on a classical 4 bits register...
         syndrome = str(register.read(self.syndromeStartBit)) + str(register.read(self.syndromeStartBit + 1)) + str(register.read(self.syndromeStartBit + 2)) + str(register.read(self.syndromeStartBit + 3))
-        targetQubit = int(self.__get_recovery(syndrome))
+        targetQubit = self.getTargetQubitForSyndrome(syndrome)
         if(targetQubit == -2):
             print("Logical error when deciding phase flip recovery option")
             return targetQubit
@@ -2522,6 +4756,8 @@ class Recovery_Phase_Flip():
 Special operation, used for executing a recovery from a bit flip when using surface codes
 """
 class Recovery_Bit_Flip():
+    __slots__ = ('syndromeStartBit', 'totalQubits')
+
     """
     Creates a Recovery instruction for bit flips
 
@@ -2547,10 +4783,14 @@ class Recovery_Bit_Flip():
         }
         return recovery_actions.get(syndrome, recovery_actions['Logical Error'])
 
+    def getTargetQubitForSyndrome(self, syndrome: str) -> int:
+        # Target qubit of the recovery for a syndrome of 4 bits, -1 if no bit flips are detected and -2 for a logical error
+        return int(self.__get_recovery(syndrome))
+
     def getTargetQubit(self, register: ClassicalBitRegister) -> int:
         # Deciding the best suitable recovery option based on a classical 4 bits register...
         syndrome = str(register.read(self.syndromeStartBit)) + str(register.read(self.syndromeStartBit + 1)) + str(register.read(self.syndromeStartBit + 2)) + str(register.read(self.syndromeStartBit + 3))
-        targetQubit = int(self.__get_recovery(syndrome))
+        targetQubit = self.getTargetQubitForSyndrome(syndrome)
         if(targetQubit == -2):
             print("Logical error when deciding bit flip recovery option")
             return targetQubit
@@ -2563,11 +4803,15 @@ class Recovery_Bit_Flip():
         return targetQubit                                                                                  
 
 class NoisyGateInstruction(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def getNoisyOperation(self):
         pass
 
 class NoisyPauliX(NoisyGateInstruction):
+    __slots__ = ('q', 'N', 'p', 'T1', 'T2', 'theta', 'phi')
+
     def __init__(self, q: int, totalQubits: int, p: float = None, T1: float = None, T2: float = None, ):
         self.q = q
         self.N = totalQubits
@@ -2581,10 +4825,15 @@ class NoisyPauliX(NoisyGateInstruction):
     def setPhi(self, phi: float):
         self.phi = phi
 
+    def getNoisyQubitOperation(self):
+        return NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2)
+
     def getNoisyOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2),self.q, self.N)
+        return CircuitUnitaryOperation.get_combined_operation_for_qubit(self.getNoisyQubitOperation(), self.q, self.N)
     
 class NoisyPauliY(NoisyGateInstruction):
+    __slots__ = ('q', 'N', 'p', 'T1', 'T2', 'theta', 'phi')
+
     def __init__(self, q: int, totalQubits: int, p: float = None, T1: float = None, T2: float = None, ):
         self.q = q
         self.N = totalQubits
@@ -2598,10 +4847,15 @@ class NoisyPauliY(NoisyGateInstruction):
     def setPhi(self, phi: float):
         self.phi = phi
         
+    def getNoisyQubitOperation(self):
+        return NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2)
+
     def getNoisyOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2),self.q, self.N)
+        return CircuitUnitaryOperation.get_combined_operation_for_qubit(self.getNoisyQubitOperation(), self.q, self.N)
 
 class NoisyPauliZ(NoisyGateInstruction):
+    __slots__ = ('q', 'N', 'p', 'T1', 'T2', 'theta', 'phi')
+
     def __init__(self, q: int, totalQubits: int, p: float = None, T1: float = None, T2: float = None, ):
         self.q = q
         self.N = totalQubits
@@ -2615,10 +4869,15 @@ class NoisyPauliZ(NoisyGateInstruction):
     def setPhi(self, phi: float):
         self.phi = phi
 
+    def getNoisyQubitOperation(self):
+        return NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2)
+
     def getNoisyOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2),self.q, self.N)
+        return CircuitUnitaryOperation.get_combined_operation_for_qubit(self.getNoisyQubitOperation(), self.q, self.N)
 
 class NoisyPhase(NoisyGateInstruction):
+    __slots__ = ('q', 'theta', 'N', 'p', 'T1', 'T2', 'phi')
+
     def __init__(self, theta: float, q: int, totalQubits: int, p: float = None, T1: float = None, T2: float = None, ):
         self.q = q
         self.theta = theta
@@ -2630,12 +4889,17 @@ class NoisyPhase(NoisyGateInstruction):
     def setPhi(self, phi: float):
         self.phi = phi
 
+    def getNoisyQubitOperation(self):
+        return NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2)
+
     def getNoisyOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2),self.q, self.N)
+        return CircuitUnitaryOperation.get_combined_operation_for_qubit(self.getNoisyQubitOperation(), self.q, self.N)
 
 
 
 class NoisyHadamard(NoisyGateInstruction):
+    __slots__ = ('q', 'N', 'p', 'T1', 'T2', 'theta', 'phi')
+
     def __init__(self, q: int, totalQubits: int, p: float = None, T1: float = None, T2: float = None, ):
         self.q = q
         self.N = totalQubits
@@ -2649,10 +4913,15 @@ class NoisyHadamard(NoisyGateInstruction):
     def setPhi(self, phi: float):
         self.phi = phi
         
+    def getNoisyQubitOperation(self):
+        return NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2)
+
     def getNoisyOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2),self.q, self.N)
+        return CircuitUnitaryOperation.get_combined_operation_for_qubit(self.getNoisyQubitOperation(), self.q, self.N)
     
 class NoisyCNOT(NoisyGateInstruction):
+    __slots__ = ('c_qubit', 't_qubit', 'N', 'c_p', 't_p', 'c_T1', 't_T1', 'c_T2', 't_T2', 'gate_error', 'theta', 'c_phi', 't_phi')
+
     def __init__(self, c_qubit: int, t_qubit: int, N: int, c_p: float= None, t_p: float= None, c_T1: float= None, t_T1: float= None, c_T2: float= None, t_T2: float= None, gate_error: float=None):
         self.c_qubit = c_qubit
         self.t_qubit = t_qubit
@@ -2674,42 +4943,22 @@ class NoisyCNOT(NoisyGateInstruction):
     def setPhiTarget(self, phi: float):
         self.t_phi = phi
 
-    def getNoisyOperation(self) -> CircuitUnitaryOperation:
-        # This is a solution for mimicking noise of two qubits by adding single qubit gates, returns a pauli x gate
-        # return CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(self.theta, self.c_phi, self.p, self.T1, self.T2),self.q, self.N)
+    def getQubits(self):
+        # The 4 x 4 noisy operation acts on the control and target qubit in increasing order
+        return [min(self.c_qubit, self.t_qubit), max(self.c_qubit, self.t_qubit)]
 
+    def getNoisyLocalOperation(self):
         gate_length = 5.61777778e-07
-
-        # Create an identity matrix for the remaining qubits
-        identity_matrix = np.eye(2**(self.N - 2))
-
-        # Create cnot matrix
-        if self.c_qubit < self.t_qubit:
-            cnot_operation = NoisyGate.construct_cnot(self.c_phi, self.t_phi, gate_length, self.gate_error, self.c_p, self.t_p, self.c_T1, self.c_T2, self.t_T1, self.t_T2)
-            self.c_phi = self.c_phi - np.pi/2
-        else:
-            cnot_operation = NoisyGate.construct_cnot_inverse(self.c_phi, self.t_phi, gate_length, self.gate_error, self.c_p, self.t_p, self.c_T1, self.c_T2, self.t_T1, self.t_T2)
-            self.c_phi = self.c_phi + np.pi/2 + np.pi
-            self.t_phi = self.t_phi + np.pi/2
-        
-        # Perform the Kronecker product to expand the CNOT operation
-        cnot_operation = np.kron(cnot_operation, identity_matrix)
-
-        # Create swap matrices
         if self.c_qubit < self.t_qubit:
-            # control qubit should swap with qubit 0
-            swap_control = CircuitUnitaryOperation.get_combined_operation_for_swap(0, self.c_qubit, self.N) if self.c_qubit != 0 else np.eye(2**self.N)
-            swap_target = CircuitUnitaryOperation.get_combined_operation_for_swap(1, self.t_qubit, self.N) if self.t_qubit != 1 else np.eye(2**self.N)
-        else:
-            # target qubit should swap with qubit 0
-            swap_target = CircuitUnitaryOperation.get_combined_operation_for_swap(0, self.t_qubit, self.N) if self.t_qubit != 0 else np.eye(2**self.N)
-            swap_control = CircuitUnitaryOperation.get_combined_operation_for_swap(1, self.c_qubit, self.N) if self.c_qubit != 1 else np.eye(2**self.N)
+            return NoisyGate.construct_cnot(self.c_phi, self.t_phi, gate_length, self.gate_error, self.c_p, self.t_p, self.c_T1, self.c_T2, self.t_T1, self.t_T2)
+        return NoisyGate.construct_cnot_inverse(self.c_phi, self.t_phi, gate_length, self.gate_error, self.c_p, self.t_p, self.c_T1, self.c_T2, self.t_T1, self.t_T2)
 
-        # Construct the full CNOT operation with swaps
-        operation = swap_control @ swap_target @ cnot_operation @ swap_target.T.conj() @ swap_control.T.conj() 
-        return operation
+    def getNoisyOperation(self) -> CircuitUnitaryOperation:
+        return CircuitUnitaryOperation.get_combined_operation_for_qubits(self.getNoisyLocalOperation(), self.getQubits(), self.N)
     
 class NoisyReset(NoisyGateInstruction):
+    __slots__ = ('q', 'readBit', 'N', 'p', 'T1', 'T2', 'theta', 'phi')
+
     def __init__(self, q: int, readBit: int, totalQubits: int, p: float = None, T1: float = None, T2: float = None):
         self.q = q
         self.readBit = readBit
@@ -2724,8 +4973,11 @@ class NoisyReset(NoisyGateInstruction):
     def setPhi(self, phi: float):
         self.phi = phi
 
+    def getNoisyQubitOperation(self):
+        return NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2)
+
     def getNoisyOperation(self) -> CircuitUnitaryOperation:
-        return CircuitUnitaryOperation.get_combined_operation_for_qubit(NoisyGate.construct(self.theta, self.phi, self.p, self.T1, self.T2),self.q, self.N)
+        return CircuitUnitaryOperation.get_combined_operation_for_qubit(self.getNoisyQubitOperation(), self.q, self.N)
 
 # The following classes are adapted from `quantum-gates`:
 # Source: https://pypi.org/project/quantum-gates/
@@ -3295,6 +5547,35 @@ integrator = Integrator(constant_pulse)
 # License: MIT License
 # Original Authors: M. Grossi, G. D. Bartolomeo, M. Vischi, P. Da Rold, R. Wixinger
 class NoisyGate:
+    @staticmethod
+    def get_average_channel(operations):
+        """Average channel of sampled realisations of a noisy gate.
+
+        Args:
+            operations: Array of shape (S, d, d) with S sampled realisations U of the noisy gate.
+
+        Returns:
+            Array of shape (d*d, d*d) with the superoperator, the mean of U kron conj(U), acting on the row-major vectorised density matrix.
+        """
+        operations = np.asarray(operations)
+        S, d, _ = operations.shape
+        return np.einsum('sij,skl->ikjl', operations, np.conj(operations)).reshape(d*d, d*d) / S
+
+    @staticmethod
+    def get_average_channel_error(operations):
+        """Standard error of the entries of the average channel of sampled realisations of a noisy gate.
+
+        Args:
+            operations: Array of shape (S, d, d) with S sampled realisations U of the noisy gate.
+
+        Returns:
+            Array of shape (d*d, d*d) with the standard error of every entry of the superoperator, it decreases as 1/sqrt(S).
+        """
+        operations = np.asarray(operations)
+        S, d, _ = operations.shape
+        superoperators = np.einsum('sij,skl->sikjl', operations, np.conj(operations)).reshape(S, d*d, d*d)
+        return np.std(superoperators, axis=0) / np.sqrt(S)
+
     @staticmethod
     def __get_unitary_contribution(theta, phi):
         """Unitary contribution due to drive Hamiltonian.
@@ -0,0 +1,32 @@
+import numpy as np
+import quantumsim as sim
+
+# Helpers shared by the unit tests
+
+def random_state(N):
+    psi = np.random.randn(2**N, 1) + 1j*np.random.randn(2**N, 1)
+    return psi / np.linalg.norm(psi)
+
+def random_state_vector(N):
+    state_vector = sim.StateVector(N)
+    state_vector.state_vector = random_state(N)
+    return state_vector
+
+def build_circuit(circuit):
+    # Circuit of at least 3 qubits with single-qubit, diagonal, permutation, controlled and multi-qubit gates
+    circuit.hadamard(0)
+    circuit.rotate_x(0.3, 0)
+    circuit.phase(np.pi/4, 0)
+    circuit.cnot(0, 1)
+    circuit.rotate_y(0.3, 2)
+    circuit.pauli_y(1)
+    circuit.rotate_z(0.7, 1)
+    circuit.controlled_phase(np.pi/3, 1, 2)
+    circuit.controlled_rotate_x(0.8, 2, 0)
+    circuit.toffoli(0, 1, circuit.N-1)
+    circuit.swap(0, 2)
+    circuit.fredkin(circuit.N-1, 0, 1)
+    circuit.controlled_unitary_operation(sim.CircuitUnitaryOperation.get_combined_operation_for_swap(0, 1, 2), 0, 1)
+    circuit.controlled_rotate_y(0.5, 1, circuit.N-1)
+    circuit.multi_controlled_pauli_z()
+    return circuit
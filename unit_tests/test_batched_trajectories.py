@@ -0,0 +1,119 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for executing a batch of trajectories of a circuit at once
+
+def test_deterministic_batch_equals_sequential_execution():
+    N = 3
+    circuit = sim.Circuit(N, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.cnot(0, 2)
+    circuit.rotate_y(0.4, 1)
+    circuit.toffoli(0, 1, 2)
+    circuit.phase(np.pi/3, 2)
+    circuit.swap(0, 1)
+    batch = circuit.execute_batch(5)
+    circuit.execute()
+    expected = circuit.state_vector.get_quantum_state().reshape(2**N)
+    assert batch.get_quantum_states().shape == (5, 2**N)
+    for row in batch.get_quantum_states():
+        assert np.allclose(row, expected)
+
+def test_operations_mode_batch():
+    N = 2
+    circuit = sim.Circuit(N)
+    circuit.hadamard(0)
+    circuit.cnot(0, 1)
+    batch = circuit.execute_batch(3)
+    circuit.execute()
+    for row in batch.get_quantum_states():
+        assert np.allclose(row, circuit.state_vector.get_quantum_state().reshape(2**N))
+
+def test_operations_mode_batch_of_many_qubits():
+    # A 2^20 x 2^20 operation can not be built, the gates must be applied by their kernels
+    N = 20
+    circuit = sim.Circuit(N)
+    circuit.hadamard(0)
+    circuit.cnot(0, N-1)
+    batch = circuit.execute_batch(2)
+    probabilities = batch.get_probabilities()
+    assert np.allclose(probabilities[:, 0], 0.5) and np.allclose(probabilities[:, 2**(N-1) + 1], 0.5)
+
+def test_noisy_circuit_batch_rejected():
+    circuit = sim.NoisyCircuit(2)
+    circuit.hadamard(0)
+    try:
+        circuit.execute_batch(3)
+        assert False
+    except Exception as e:
+        assert "cannot be executed as a batch" in str(e)
+
+def test_measurement_per_row():
+    N = 2
+    circuit = sim.Circuit(N, 2, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.cnot(0, 1)
+    circuit.measurement(0, 0)
+    circuit.measurement(1, 1)
+    batch = circuit.execute_batch(2000)
+    bits = circuit.batched_classical_bits
+    assert bits.shape == (2000, 2)
+    assert np.all(bits[:, 0] == bits[:, 1])
+    assert 800 < np.sum(bits[:, 0]) < 1200
+    # Every row collapsed to the classical state of its own measured bits
+    probabilities = batch.get_probabilities()
+    indices = 2*bits[:, 0] + bits[:, 1]
+    assert np.allclose(probabilities[np.arange(2000), indices], 1)
+
+def test_reset_acts_on_rows_with_bit_set():
+    N = 1
+    circuit = sim.Circuit(N, 1, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.measurement(0, 0)
+    circuit.reset(0, 0)
+    batch = circuit.execute_batch(200)
+    assert np.allclose(batch.get_probabilities()[:, 0], 1)
+
+def test_per_row_operations():
+    N = 3
+    batch = sim.BatchedStateVector(N, 4)
+    operations = np.array([sim.QubitUnitaryOperation.get_rotate_x(theta) for theta in np.linspace(0, np.pi, 4)])
+    batch.apply_operation_on_qubits(operations, [1])
+    for row, operation in zip(batch.get_quantum_states(), operations):
+        psi = np.zeros(2**N, dtype=complex)
+        psi[0] = 1
+        expected = sim.CircuitUnitaryOperation.get_combined_operation_for_qubit(operation, 1, N) @ psi
+        assert np.allclose(row, expected)
+
+def test_noisy_cnot_acts_on_control_and_target(monkeypatch):
+    N = 4
+    operation = np.linalg.qr(np.random.randn(4, 4) + 1j*np.random.randn(4, 4))[0]
+    monkeypatch.setattr(sim.NoisyGate, "construct_cnot", staticmethod(lambda *args: operation))
+    monkeypatch.setattr(sim.NoisyGate, "construct_cnot_inverse", staticmethod(lambda *args: operation))
+    for c_qubit in range(N):
+        for t_qubit in range(N):
+            if c_qubit == t_qubit:
+                continue
+            circuit = sim.Circuit(N, save_instructions=True)
+            for q in range(N):
+                circuit.rotate_y(0.3 + 0.4*q, q)
+            circuit.execute()
+            psi = circuit.state_vector.get_quantum_state().reshape(2**N)
+            circuit.noisy_cnot(c_qubit, t_qubit)
+            batch = circuit.execute_batch(2)
+            # The noisy operation acts on the control and target qubit in increasing order
+            expected = sim.CircuitUnitaryOperation.get_combined_operation_for_qubits(operation, sorted([c_qubit, t_qubit]), N) @ psi
+            for row in batch.get_quantum_states():
+                assert np.allclose(row, expected)
+
+def test_noisy_circuit_batch():
+    N = 3
+    circuit = sim.Circuit(N, 1, save_instructions=True)
+    circuit.noisy_hadamard(0)
+    circuit.noisy_cnot(0, 2)
+    circuit.noisy_pauli_x(1)
+    circuit.measurement(0, 0)
+    circuit.noisy_reset(0, 0)
+    batch = circuit.execute_batch(50)
+    assert batch.get_quantum_states().shape == (50, 2**N)
+    assert np.allclose(np.sum(batch.get_probabilities(), axis=1), 1)
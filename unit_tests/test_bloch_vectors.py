@@ -0,0 +1,38 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests comparing the Bloch vectors from reduced density matrices with expectation values of the Pauli operations
+
+def test_bloch_vectors_equal_pauli_expectation_values():
+    N = 4
+    state_vector = sim.StateVector(N)
+    psi = np.random.randn(2**N, 1) + 1j*np.random.randn(2**N, 1)
+    state_vector.state_vector = psi / np.linalg.norm(psi)
+    psi = state_vector.get_quantum_state()
+    bloch_vectors = state_vector.bloch_vectors()
+    assert bloch_vectors.shape == (N, 3)
+    for q in range(N):
+        X = sim.CircuitUnitaryOperation.get_combined_operation_for_pauli_x(q, N)
+        Y = sim.CircuitUnitaryOperation.get_combined_operation_for_pauli_y(q, N)
+        Z = sim.CircuitUnitaryOperation.get_combined_operation_for_pauli_z(q, N)
+        expected = [np.vdot(psi, operation.dot(psi)).real for operation in [X, Y, Z]]
+        assert np.allclose(bloch_vectors[q], expected)
+        assert np.allclose([state_vector.measure_x(q), state_vector.measure_y(q), state_vector.measure_z(q)], expected)
+
+def test_bloch_vectors_of_basis_states():
+    state_vector = sim.StateVector(3)
+    sim.Pauli_X(3, 0).applyOperation(state_vector)
+    sim.Hadamard(3, 1).applyOperation(state_vector)
+    sim.Hadamard(3, 2).applyOperation(state_vector)
+    sim.Phase(3, 2, np.pi/2).applyOperation(state_vector)
+    assert np.allclose(state_vector.bloch_vectors(), [[0, 0, -1], [1, 0, 0], [0, 1, 0]])
+
+def test_bloch_vectors_in_single_precision():
+    N = 4
+    psi = np.random.randn(2**N, 1) + 1j*np.random.randn(2**N, 1)
+    psi = psi / np.linalg.norm(psi)
+    state_vector = sim.StateVector(N)
+    state_vector.state_vector = psi
+    single_precision_state_vector = sim.StateVector(N, dtype=np.complex64)
+    single_precision_state_vector.state_vector = psi.astype(np.complex64)
+    assert np.allclose(single_precision_state_vector.bloch_vectors(), state_vector.bloch_vectors(), atol=1e-6)
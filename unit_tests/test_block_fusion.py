@@ -0,0 +1,35 @@
+import numpy as np
+import quantumsim as sim
+from conftest import build_circuit
+
+# Unit tests for fusing blocks of gates into unitary operations on a few qubits
+
+def test_combined_operation_for_qubits():
+    cnot = sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(0, 1, 2)
+    assert np.allclose(sim.CircuitUnitaryOperation.get_combined_operation_for_qubits(cnot, [2, 0], 3), sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(2, 0, 3))
+
+def test_local_operations():
+    N = 4
+    circuit = build_circuit(sim.Circuit(N, save_instructions=True))
+    for instruction in circuit.instructions:
+        combined_operation = sim.CircuitUnitaryOperation.get_combined_operation_for_qubits(instruction.getLocalOperation(), instruction.getQubits(), N)
+        assert np.allclose(combined_operation, instruction.getOperation())
+
+def test_block_fusion_preserves_state():
+    for max_qubits in [1, 2, 3, 4]:
+        circuit = build_circuit(sim.Circuit(4, save_instructions=True))
+        circuit.execute()
+        expected = circuit.state_vector.get_quantum_state()
+        number_of_gates = len(circuit.instructions)
+        number_of_fused_gates = circuit.fuse_gates(max_qubits)
+        assert len(circuit.instructions) == number_of_gates - number_of_fused_gates
+        circuit.execute()
+        assert np.allclose(circuit.state_vector.get_quantum_state(), expected)
+    assert len(circuit.instructions) == 1
+
+def test_block_fusion_stops_at_measurement():
+    circuit = sim.Circuit(2, 1, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.measurement(0, 0)
+    circuit.cnot(0, 1)
+    assert circuit.fuse_gates(2) == 0
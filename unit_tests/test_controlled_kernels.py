@@ -0,0 +1,43 @@
+import numpy as np
+import quantumsim as sim
+from conftest import random_state_vector
+
+# Unit tests comparing the controlled-gate kernels of StateVector with the combined 2^N x 2^N operations
+
+def test_controlled_kernel_equals_combined_operation():
+    N = 4
+    operation = sim.QubitUnitaryOperation.get_rotate_x(0.7)
+    for control in range(N):
+        for target in range(N):
+            if control == target:
+                continue
+            state_vector = random_state_vector(N)
+            combined_operation = sim.CircuitUnitaryOperation.get_combined_operation_for_controlled_qubit_operation(operation, control, target, N)
+            expected = np.dot(combined_operation, state_vector.get_quantum_state())
+            state_vector.apply_controlled_unitary_operation_on_qubit(operation, control, target)
+            assert np.allclose(state_vector.get_quantum_state(), expected)
+
+def test_toffoli_kernel_equals_combined_operation():
+    N = 4
+    for control_a, control_b, target in [(0, 1, 2), (3, 0, 1), (1, 3, 0), (2, 1, 3)]:
+        state_vector = random_state_vector(N)
+        expected = np.dot(sim.CircuitUnitaryOperation.get_combined_operation_for_toffoli(control_a, control_b, target, N), state_vector.get_quantum_state())
+        sim.Toffoli(N, control_a, control_b, target).applyOperation(state_vector)
+        assert np.allclose(state_vector.get_quantum_state(), expected)
+
+def test_controlled_circuit_instruction_mode_equals_operation_mode():
+    N = 4
+    circuit_operations = sim.Circuit(N)
+    circuit_instructions = sim.Circuit(N, save_instructions=True)
+    swap = sim.CircuitUnitaryOperation.get_combined_operation_for_swap(0, 1, 2)
+    for circuit in [circuit_operations, circuit_instructions]:
+        circuit.hadamard(0)
+        circuit.hadamard(3)
+        circuit.cnot(0, 1)
+        circuit.controlled_phase(np.pi/4, 3, 0)
+        circuit.controlled_rotate_y(np.pi/3, 1, 2)
+        circuit.controlled_hadamard(2, 3)
+        circuit.controlled_unitary_operation(swap, 0, 2)
+        circuit.toffoli(0, 3, 1)
+        circuit.execute()
+    assert np.allclose(circuit_operations.state_vector.get_quantum_state(), circuit_instructions.state_vector.get_quantum_state())
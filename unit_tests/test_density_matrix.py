@@ -0,0 +1,102 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for executing a circuit on a density matrix
+
+def test_deterministic_circuit_equals_state_vector():
+    N = 3
+    circuit = sim.Circuit(N, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.cnot(0, 2)
+    circuit.rotate_y(0.4, 1)
+    circuit.toffoli(0, 1, 2)
+    circuit.phase(np.pi/3, 2)
+    density_matrix = circuit.execute_density_matrix()
+    circuit.execute()
+    psi = circuit.state_vector.get_quantum_state()
+    assert np.allclose(density_matrix.get_density_matrix(), psi @ psi.conj().T)
+    assert np.allclose(density_matrix.bloch_vectors(), circuit.state_vector.bloch_vectors())
+
+def test_operations_mode_equals_state_vector():
+    N = 3
+    circuit = sim.Circuit(N)
+    circuit.hadamard(0)
+    circuit.cnot(0, 2)
+    circuit.controlled_rotate_y(0.7, 2, 1)
+    circuit.phase(np.pi/3, 2)
+    density_matrix = circuit.execute_density_matrix()
+    circuit.execute()
+    psi = circuit.state_vector.get_quantum_state()
+    assert np.allclose(density_matrix.get_density_matrix(), psi @ psi.conj().T)
+
+def test_noisy_circuit_rejected():
+    circuit = sim.NoisyCircuit(2)
+    circuit.hadamard(0)
+    try:
+        circuit.execute_density_matrix()
+        assert False
+    except Exception as e:
+        assert "cannot be executed on a density matrix" in str(e)
+
+def test_average_channel_of_unitary():
+    operation = sim.QubitUnitaryOperation.get_rotate_x(0.7)
+    channel = sim.NoisyGate.get_average_channel(np.array([operation]*3))
+    assert np.allclose(channel, np.kron(operation, operation.conj()))
+
+def test_measurement_branches():
+    N = 2
+    circuit = sim.Circuit(N, 2, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.cnot(0, 1)
+    circuit.measurement(0, 0)
+    density_matrix = circuit.execute_density_matrix()
+    branches = circuit.density_matrix_branches
+    assert sorted(branches.keys()) == [(0, 0), (1, 0)]
+    assert np.isclose(branches[(0, 0)].get_trace(), 0.5)
+    assert np.isclose(branches[(1, 0)].get_density_matrix()[3, 3], 0.5)
+    # Averaged over the branches the coherence between |00> and |11> is gone
+    assert np.allclose(density_matrix.get_density_matrix(), np.diag([0.5, 0, 0, 0.5]))
+
+def test_reset_in_branch():
+    N = 1
+    circuit = sim.Circuit(N, 1, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.measurement(0, 0)
+    circuit.reset(0, 0)
+    density_matrix = circuit.execute_density_matrix()
+    assert np.allclose(density_matrix.get_density_matrix(), np.diag([1, 0]))
+
+def test_noisy_channel_equals_trajectory_average():
+    N = 2
+    circuit = sim.Circuit(N, save_instructions=True, noise_factor=10)
+    circuit.noisy_hadamard(0)
+    circuit.noisy_cnot(0, 1)
+    circuit.noisy_pauli_x(1)
+    density_matrix = circuit.execute_density_matrix(samples=300)
+    # The virtual Rz gates of an execution carry over to the next execution, start the trajectories from the same phases
+    circuit.phi = [0 for _ in range(N)]
+    batch = circuit.execute_batch(300)
+    psi = batch.get_quantum_states()
+    average = np.einsum('bi,bj->ij', psi, psi.conj()) / len(psi)
+    assert np.allclose(density_matrix.get_density_matrix(), average, atol=0.05)
+
+def test_noisy_channel_within_standard_error():
+    # The channel of a noisy gate is a Monte Carlo estimate, independent estimates agree within their standard errors
+    circuit = sim.Circuit(1, save_instructions=True)
+    p, T1, T2 = circuit.parameters["p"][0], circuit.parameters["T1"][0], circuit.parameters["T2"][0]
+    samples = 200
+    operations = np.array([sim.NoisyGate.construct(np.pi/2, 0, p, T1, T2) for _ in range(6*samples)])
+    estimates = [(sim.NoisyGate.get_average_channel(part), sim.NoisyGate.get_average_channel_error(part)) for part in [operations[:samples], operations[samples:2*samples], operations[2*samples:]]]
+    (channel_a, error_a), (channel_b, error_b), (_, error_c) = estimates
+    assert np.all(np.abs(channel_a - channel_b) <= 5*np.sqrt(error_a**2 + error_b**2) + 1e-12)
+    # Four times as many samples halve the standard error
+    assert 0.35 < np.max(error_c) / np.max(error_a) < 0.7
+
+def test_noisy_channel_error_recorded():
+    circuit = sim.Circuit(2, save_instructions=True)
+    circuit.noisy_hadamard(0)
+    circuit.noisy_cnot(0, 1)
+    samples = 200
+    circuit.execute_density_matrix(samples)
+    # The largest standard error is the one of the noisy CNOT, whose realisations spread by about 0.2
+    assert 0 < circuit.noisy_channel_error < 0.3/np.sqrt(samples)
@@ -0,0 +1,46 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for the diagonal fast path of Pauli Z, phase, rotate Z, controlled phase and multi-controlled Pauli Z
+
+def build_diagonal_circuit(circuit):
+    circuit.hadamard(0)
+    circuit.hadamard(1)
+    circuit.hadamard(2)
+    circuit.pauli_z(0)
+    circuit.phase(np.pi/3, 1)
+    circuit.rotate_z(np.pi/5, 2)
+    circuit.controlled_phase(np.pi/4, 0, 2)
+    circuit.controlled_pauli_z(2, 1)
+    circuit.controlled_rotate_z(np.pi/7, 1, 0)
+    circuit.multi_controlled_pauli_z()
+    circuit.hadamard(1)
+    circuit.pauli_z(2)
+    return circuit
+
+def test_diagonal_instructions_equal_combined_operations():
+    N = 3
+    for instruction in [sim.Pauli_Z(N, 1), sim.Phase(N, 2, 0.4), sim.Rotate_Z(N, 0, 0.9),
+                        sim.Controlled_Phase(0.3, N, 0, 2), sim.Controlled_Pauli_Z(N, 2, 1), sim.Controlled_Rotate_Z(1.1, N, 1, 2),
+                        sim.Multi_Controlled_Pauli_Z(N)]:
+        combined_operation = instruction.getOperation()
+        assert np.allclose(np.diag(instruction.getDiagonal()), combined_operation)
+
+def test_instruction_mode_equals_operation_mode():
+    circuit_operations = build_diagonal_circuit(sim.Circuit(3))
+    circuit_instructions = build_diagonal_circuit(sim.Circuit(3, save_instructions=True))
+    circuit_operations.execute()
+    circuit_instructions.execute()
+    assert np.allclose(circuit_operations.state_vector.get_quantum_state(), circuit_instructions.state_vector.get_quantum_state())
+
+def test_merge_diagonal_gates():
+    for save_instructions in [False, True]:
+        circuit = build_diagonal_circuit(sim.Circuit(3, save_instructions=save_instructions))
+        circuit.execute()
+        expected = circuit.state_vector.get_quantum_state()
+        number_of_gates = len(circuit.gates)
+        assert circuit.merge_diagonal_gates() == 6
+        assert len(circuit.gates) == number_of_gates - 6
+        assert len(circuit.descriptions) == len(circuit.gates)
+        circuit.execute()
+        assert np.allclose(circuit.state_vector.get_quantum_state(), expected)
@@ -0,0 +1,115 @@
+import numpy as np
+import quantumsim as sim
+from conftest import build_circuit
+from SurfaceCodeQuantumSim import SurfaceCode
+
+# Unit tests for executing compiled circuits
+
+def test_plan_equals_execute():
+    for save_instructions in [True, False]:
+        circuit = build_circuit(sim.Circuit(4, save_instructions=save_instructions))
+        circuit.execute()
+        expected = circuit.state_vector.get_quantum_state()
+        expected_states = circuit.quantum_states
+        plan = circuit.compile()
+        for _ in range(2):
+            state_vector = plan.execute()
+            assert state_vector is circuit.state_vector
+            assert np.allclose(state_vector.get_quantum_state(), expected)
+            assert len(circuit.quantum_states) == len(expected_states)
+
+def test_operation_mode_plan_does_not_build_operations():
+    circuit = build_circuit(sim.Circuit(4))
+    plan = circuit.compile()
+    plan.execute()
+    assert not any(operation.is_built() for operation in circuit.operations)
+    expected = sim.StateVector(4)
+    for i in range(len(circuit.operations)):
+        expected.apply_unitary_operation(circuit.get_operation(i))
+    assert np.allclose(circuit.state_vector.get_quantum_state(), expected.get_quantum_state())
+
+def test_fused_gates():
+    circuit = build_circuit(sim.Circuit(4, save_instructions=True))
+    circuit.execute()
+    expected = circuit.state_vector.get_quantum_state()
+    circuit.fuse_gates(2)
+    circuit.compile().execute()
+    assert np.allclose(circuit.state_vector.get_quantum_state(), expected)
+
+def test_noisy_plan_equals_execute():
+    circuit = sim.Circuit(3, 1, save_instructions=True)
+    circuit.noisy_hadamard(0)
+    circuit.noisy_pauli_y(1)
+    circuit.noisy_cnot(0, 2)
+    circuit.noisy_pauli_z(2)
+    circuit.noisy_phase(0.4, 1)
+    circuit.measurement(0, 0)
+    circuit.noisy_reset(0, 0)
+    circuit.noisy_pauli_x(2)
+    plan = circuit.compile()
+    for seed in range(3):
+        phi = list(circuit.phi)
+        np.random.seed(seed)
+        circuit.execute()
+        expected = circuit.state_vector.get_quantum_state()
+        expected_phi = list(circuit.phi)
+        circuit.phi = phi
+        np.random.seed(seed)
+        plan.execute()
+        assert np.allclose(circuit.state_vector.get_quantum_state(), expected)
+        assert np.allclose(circuit.phi, expected_phi)
+
+def test_surface_code_recovery():
+    for q in range(9):
+        surface_code = SurfaceCode()
+        surface_code.add_encoder_circuit()
+        surface_code.add_bit_flip(q)
+        surface_code.add_z_stabilizer_syndrome_extraction()
+        surface_code.add_recovery_from_syndrome_z_stabilizer()
+        surface_code.add_z_stabilizer_syndrome_extraction()
+        surface_code.circuit.compile().execute()
+        register = surface_code.circuit.classicalBitRegister.register
+        assert surface_code.circuit.logical_error_count == 0
+        assert np.all(np.array(register[4:8]) == 0)
+
+def test_changed_circuit_is_rejected():
+    circuit = build_circuit(sim.Circuit(4, save_instructions=True))
+    plan = circuit.compile()
+    circuit.hadamard(1)
+    try:
+        plan.execute()
+        assert False
+    except Exception as exception:
+        assert "has changed" in str(exception)
+
+def test_replaced_gates_are_rejected():
+    for save_instructions in [True, False]:
+        circuit = build_circuit(sim.Circuit(4, save_instructions=save_instructions))
+        plan = circuit.compile()
+        # The number of gates stays the same, the circuit is still different
+        circuit.remove_circuit_gate(0)
+        circuit.pauli_x(0)
+        try:
+            plan.execute()
+            assert False
+        except Exception as exception:
+            assert "has changed" in str(exception)
+    circuit = build_circuit(sim.Circuit(4, save_instructions=True))
+    plan = circuit.compile()
+    circuit.instructions[0] = sim.Pauli_X(4, 0)
+    try:
+        plan.execute()
+        assert False
+    except Exception as exception:
+        assert "has changed" in str(exception)
+
+def test_reordered_and_repeated_gates_are_rejected():
+    for change in [lambda gates: gates.sort(key=lambda gate: type(gate).__name__), lambda gates: gates.__imul__(2)]:
+        circuit = build_circuit(sim.Circuit(4, save_instructions=True))
+        plan = circuit.compile()
+        change(circuit.instructions)
+        try:
+            plan.execute()
+            assert False
+        except Exception as exception:
+            assert "has changed" in str(exception)
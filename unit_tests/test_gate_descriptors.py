@@ -0,0 +1,62 @@
+import time
+import numpy as np
+import quantumsim as sim
+from conftest import build_circuit
+
+# Unit tests for building the operations of a circuit only when they are needed
+
+def test_execution_does_not_build_operations():
+    circuit = build_circuit(sim.Circuit(4))
+    circuit.execute()
+    assert not any(operation.is_built() for operation in circuit.operations)
+    expected = sim.StateVector(4)
+    for i in range(len(circuit.operations)):
+        expected.apply_unitary_operation(circuit.get_operation(i))
+    assert np.allclose(circuit.state_vector.get_quantum_state(), expected.get_quantum_state())
+
+def test_operations_are_built_on_request():
+    circuit = build_circuit(sim.Circuit(4))
+    assert not circuit.operations[0].is_built()
+    assert circuit.get_operation(0) is circuit.operations[0].get_operation()
+    assert circuit.operations[0].is_built()
+    expected = sim.CircuitUnitaryOperation.get_combined_operation_for_hadamard(0, 4)
+    assert np.allclose(circuit.get_operation(0), expected)
+
+def test_building_large_circuit_is_fast():
+    N = 12
+    circuit = sim.Circuit(N)
+    start = time.perf_counter()
+    for q in range(N):
+        circuit.hadamard(q)
+        for k in range(q + 1, N):
+            circuit.controlled_phase(np.pi / 2**(k - q), k, q)
+    assert time.perf_counter() - start < 1
+    assert not any(operation.is_built() for operation in circuit.operations)
+
+def test_derived_circuits_are_lazy():
+    circuit = build_circuit(sim.Circuit(4))
+    inverse_circuit = circuit.create_inverse_circuit()
+    controlled_circuit = circuit.create_controlled_circuit(1, 2, 6)
+    assert not any(operation.is_built() for operation in inverse_circuit.operations + controlled_circuit.operations)
+    n = len(circuit.operations)
+    for i in range(n):
+        assert np.allclose(inverse_circuit.get_operation(i), circuit.get_operation(n - 1 - i))
+    operation = circuit.get_operation(1)
+    expected = sim.CircuitUnitaryOperation.get_combined_operation_for_controlled_unitary_operation_general(operation, 1, 2, 6)
+    assert np.allclose(controlled_circuit.get_operation(1), expected)
+
+def test_merge_diagonal_gates_without_building():
+    circuit = sim.Circuit(3)
+    circuit.hadamard(0)
+    circuit.pauli_z(0)
+    circuit.controlled_phase(np.pi/4, 0, 2)
+    circuit.execute()
+    expected = circuit.state_vector.get_quantum_state()
+    circuit = sim.Circuit(3)
+    circuit.hadamard(0)
+    circuit.pauli_z(0)
+    circuit.controlled_phase(np.pi/4, 0, 2)
+    assert circuit.merge_diagonal_gates() == 1
+    assert not any(operation.is_built() for operation in circuit.operations)
+    circuit.execute()
+    assert np.allclose(circuit.state_vector.get_quantum_state(), expected)
@@ -0,0 +1,51 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for the columnar store of gate descriptions and gate strings
+
+def test_labels_are_generated_when_read():
+    circuit = sim.Circuit(4, 2, save_instructions=True)
+    circuit.hadamard(1)
+    circuit.controlled_phase(np.pi/2, 0, 3)
+    circuit.toffoli(3, 0, 2)
+    circuit.measurement(2, 1)
+    circuit.multi_controlled_pauli_x()
+    assert isinstance(circuit.descriptions, sim.GateLabels)
+    assert list(circuit.gates) == ['.H..', '*..S', '*.x*', '..M.', '***X']
+    assert circuit.descriptions[1] == f"Controlled phase with theta = 0.500 {sim.pi_symbol}, control qubit 0, and target qubit 3"
+    assert circuit.descriptions[-2] == "Measurement on Qubit 2 projected on bit: 1"
+    assert circuit.gates[1:3] == ['*..S', '*.x*']
+
+def test_columns():
+    circuit = sim.Circuit(3, save_instructions=True)
+    circuit.rotate_x(0.25, 2)
+    circuit.cnot(0, 1)
+    opcodes, qubits, parameters = circuit.descriptions.get_columns()
+    assert list(opcodes) == [sim.GateLabels.ROTATE_X, sim.GateLabels.CNOT]
+    assert qubits.tolist() == [[2, -1, -1], [0, 1, -1]]
+    assert parameters[0] == 0.25
+
+def test_pop_and_text_labels():
+    circuit = sim.Circuit(3, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.bitflip_error(1)
+    circuit.pauli_z(2)
+    assert list(circuit.descriptions) == ["Hadamard on qubit 0", "Bit-flip error (Pauli X) on qubit 1", "Pauli Z on qubit 2"]
+    circuit.remove_circuit_gate(1)
+    assert list(circuit.descriptions) == ["Hadamard on qubit 0", "Pauli Z on qubit 2"]
+    assert list(circuit.gates) == ['H..', '..Z']
+    assert len(circuit.instructions) == 2
+
+def test_merged_circuit_keeps_labels():
+    circuit = sim.Circuit(2, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.pauli_z(0)
+    circuit.phase(np.pi/4, 1)
+    circuit.merge_diagonal_gates()
+    assert len(circuit.descriptions) == len(circuit.gates) == len(circuit.instructions) == 2
+    circuit.cnot(0, 1)
+    assert circuit.gates[-1] == '*X'
+
+def test_instructions_have_slots():
+    for instruction in [sim.Hadamard(2, 0), sim.CNOT(2, 1, 0), sim.Measurement(0, 0), sim.NoisyPauliX(0, 2, 0.001, 1e5, 1e5)]:
+        assert not hasattr(instruction, '__dict__')
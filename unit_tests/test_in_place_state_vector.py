@@ -0,0 +1,28 @@
+import numpy as np
+import quantumsim as sim
+from conftest import build_circuit
+
+# Unit tests for applying operations in place using two preallocated buffers
+
+def test_in_place_equals_allocating_execution():
+    for save_instructions in [False, True]:
+        in_place = build_circuit(sim.Circuit(3, save_instructions=save_instructions, in_place=True))
+        allocating = build_circuit(sim.Circuit(3, save_instructions=save_instructions))
+        in_place.execute()
+        allocating.execute()
+        assert len(in_place.quantum_states) == len(allocating.quantum_states)
+        for in_place_state, allocating_state in zip(in_place.quantum_states, allocating.quantum_states):
+            assert np.allclose(in_place_state, allocating_state)
+
+def test_in_place_reuses_buffers():
+    state_vector = sim.StateVector(3, in_place=True)
+    buffers = []
+    for q in range(3):
+        sim.Hadamard(3, q).applyOperation(state_vector)
+        buffers.append(state_vector.get_quantum_state())
+    sim.Controlled_Phase(np.pi/2, 3, 2, 0).applyOperation(state_vector)
+    sim.Swap(3, 0, 2).applyOperation(state_vector)
+    sim.CNOT(3, 1, 0).applyOperation(state_vector)
+    assert np.may_share_memory(buffers[0], buffers[2])
+    assert not np.may_share_memory(buffers[0], buffers[1])
+    assert np.may_share_memory(state_vector.get_quantum_state(), buffers[0]) or np.may_share_memory(state_vector.get_quantum_state(), buffers[1])
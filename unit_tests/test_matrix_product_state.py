@@ -0,0 +1,66 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for executing circuits on a matrix product state
+
+def random_circuit(N, gates):
+    circuit = sim.Circuit(N, save_instructions=True)
+    for _ in range(gates):
+        gate = np.random.randint(5)
+        a, b, c = np.random.choice(N, 3, replace=False)
+        if gate == 0:
+            circuit.hadamard(a)
+        elif gate == 1:
+            circuit.rotate_y(np.random.random(), a)
+        elif gate == 2:
+            circuit.cnot(a, b)
+        elif gate == 3:
+            circuit.controlled_phase(np.random.random(), a, b)
+        else:
+            circuit.toffoli(a, b, c)
+    return circuit
+
+def test_mps_equals_state_vector():
+    N = 6
+    for _ in range(5):
+        circuit = random_circuit(N, 40)
+        mps = circuit.execute_mps(cutoff=0)
+        circuit.execute()
+        assert np.allclose(mps.get_quantum_state(), circuit.state_vector.get_quantum_state())
+        assert mps.truncation_error < 1e-12
+
+def test_ghz_state_of_many_qubits():
+    N = 40
+    circuit = sim.Circuit(N, save_instructions=True)
+    circuit.hadamard(0)
+    for q in range(1, N):
+        circuit.cnot(0, q)
+    mps = circuit.execute_mps(max_bond_dimension=2)
+    assert max(mps.get_bond_dimensions()) == 2
+    assert mps.truncation_error < 1e-10
+    indices = mps.sample(1000)
+    assert set(np.unique(indices)) <= {0, 2**N - 1}
+    assert 400 < np.sum(indices == 0) < 600
+
+def test_truncation_error_is_reported():
+    N = 8
+    circuit = random_circuit(N, 80)
+    exact = circuit.execute_mps()
+    truncated = circuit.execute_mps(max_bond_dimension=2)
+    assert max(truncated.get_bond_dimensions()) <= 2
+    if max(exact.get_bond_dimensions()) > 2:
+        assert truncated.truncation_error > 0
+
+def test_measurement_and_reset():
+    N = 5
+    circuit = sim.Circuit(N, 2, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.cnot(0, 4)
+    circuit.measurement(0, 0)
+    circuit.measurement(4, 1)
+    circuit.reset(4, 1)
+    for _ in range(10):
+        mps = circuit.execute_mps()
+        register = circuit.classicalBitRegister.register
+        assert register[0] == register[1]
+        assert np.isclose(np.abs(mps.get_quantum_state()[register[0] * 2**4, 0]), 1)
@@ -0,0 +1,52 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for the measurement of a single qubit
+
+def test_measure_qubit_collapses_state():
+    for q in range(3):
+        state_vector = sim.StateVector(3)
+        psi = np.random.randn(8, 1) + 1j*np.random.randn(8, 1)
+        state_vector.state_vector = psi / np.linalg.norm(psi)
+        bit = state_vector.measure_qubit(q)
+        psi = state_vector.get_quantum_state().reshape(2**q, 2, 2**(2-q))
+        assert np.allclose(psi[:, 1-bit, :], 0)
+        assert np.isclose(np.linalg.norm(psi), 1)
+
+def test_measure_qubit_returns_bit():
+    circuit = sim.Circuit(2, 2, True)
+    circuit.pauli_x(1)
+    circuit.measurement(0, 0)
+    circuit.measurement(1, 1)
+    circuit.execute()
+    assert circuit.classicalBitRegister.read(0) == 0
+    assert circuit.classicalBitRegister.read(1) == 1
+    assert circuit.state_vector.measure_qubit(1) == 1
+
+def test_measure_qubit_statistics():
+    np.random.seed(42)
+    ones = 0
+    for _ in range(2000):
+        state_vector = sim.StateVector(2)
+        state_vector.apply_unitary_operation_on_qubit(sim.QubitUnitaryOperation.get_rotate_y(2*np.pi/3), 1)
+        ones = ones + state_vector.measure_qubit(1)
+    # Probability of measuring 1 is sin^2(pi/3) = 0.75
+    assert abs(ones/2000 - 0.75) < 0.04
+
+def test_measure_qubit_in_place():
+    state_vector = sim.StateVector(3, in_place=True)
+    state_vector.apply_unitary_operation_on_qubit(sim.QubitUnitaryOperation.get_hadamard(), 1)
+    buffer = state_vector.get_quantum_state()
+    bit = state_vector.measure_qubit(1)
+    # The state is collapsed in the buffer that holds it, no new state is allocated
+    assert np.shares_memory(state_vector.get_quantum_state(), buffer)
+    expected = np.zeros((8, 1))
+    expected[2*bit] = 1
+    assert np.allclose(state_vector.get_quantum_state(), expected)
+
+def test_measure_qubit_keeps_recorded_states():
+    circuit = sim.Circuit(1, 1, True)
+    circuit.hadamard(0)
+    circuit.measurement(0, 0)
+    circuit.execute()
+    assert np.allclose(circuit.quantum_states[1], np.array([[1], [1]]) / np.sqrt(2))
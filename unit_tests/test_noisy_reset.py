@@ -0,0 +1,23 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for the noisy reset, which flips its qubit when the classical bit it reads is 1
+
+def test_noisy_reset_reads_its_bit():
+    circuit = sim.Circuit(2, 3, save_instructions=True)
+    circuit.pauli_x(1)
+    circuit.measurement(1, 2)
+    circuit.noisy_reset(1, 2)
+    circuit.execute()
+    assert circuit.classicalBitRegister.read(2) == 1
+    assert circuit.state_vector.measure_z(1) > 0.9
+
+def test_noisy_reset_ignores_other_bits():
+    circuit = sim.Circuit(2, 3, save_instructions=True)
+    circuit.pauli_x(0)
+    circuit.pauli_x(1)
+    circuit.measurement(0, 0)
+    circuit.noisy_reset(1, 2)
+    circuit.execute()
+    assert circuit.classicalBitRegister.read(0) == 1 and circuit.classicalBitRegister.read(2) == 0
+    assert np.isclose(circuit.state_vector.measure_z(1), -1)
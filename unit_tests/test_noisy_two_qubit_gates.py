@@ -0,0 +1,54 @@
+import numpy as np
+import quantumsim as sim
+from conftest import random_state
+
+# Unit tests for applying the 4 x 4 operation of noisy two-qubit gates directly on the control and target qubit
+
+def test_noisy_operation_for_all_qubit_pairs(monkeypatch):
+    N = 4
+    # Without noise the sampled operations are the ideal CNOT gates on the qubits in increasing order
+    cnot = sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(0, 1, 2)
+    cnot_inverse = sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(1, 0, 2)
+    monkeypatch.setattr(sim.NoisyGate, "construct_cnot", staticmethod(lambda *args: cnot))
+    monkeypatch.setattr(sim.NoisyGate, "construct_cnot_inverse", staticmethod(lambda *args: cnot_inverse))
+    for c_qubit in range(N):
+        for t_qubit in range(N):
+            if c_qubit == t_qubit:
+                continue
+            instruction = sim.NoisyCNOT(c_qubit, t_qubit, N)
+            instruction.setPhiControl(0)
+            instruction.setPhiTarget(0)
+            expected = sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(c_qubit, t_qubit, N)
+            assert np.allclose(instruction.getNoisyOperation(), expected)
+
+def test_noisy_cnot_instruction_equals_dense_operation():
+    N = 4
+    circuit = sim.Circuit(N, save_instructions=True)
+    circuit.noisy_cnot(3, 1)
+    circuit.noisy_cnot(0, 2)
+    psi = random_state(N)
+    for instruction in circuit.instructions:
+        instruction.setPhiControl(0.3)
+        instruction.setPhiTarget(-0.2)
+        np.random.seed(7)
+        state_vector = sim.StateVector(N)
+        state_vector.state_vector = psi.copy()
+        state_vector.apply_noisy_operation_on_qubits(instruction.getNoisyLocalOperation(), instruction.getQubits())
+        np.random.seed(7)
+        expected = instruction.getNoisyOperation() @ psi
+        assert np.allclose(state_vector.get_quantum_state(), expected)
+
+def test_noisy_circuit_applies_local_operations():
+    N = 5
+    circuit = sim.NoisyCircuit(N)
+    circuit.hadamard(0)
+    circuit.noisy_cnot(0, 3)
+    circuit.noisy_cnot(4, 1)
+    circuit.noisy_ecr(2, 0)
+    circuit.execute()
+    # The 2^N x 2^N operations of the noisy gates are not needed for the execution
+    assert all(not operation.is_built() for operation in circuit.operations[1:])
+    state_vector = sim.StateVector(N)
+    for i in range(len(circuit.operations)):
+        state_vector.apply_noisy_operation(circuit.get_operation(i))
+    assert np.allclose(state_vector.get_quantum_state(), circuit.state_vector.get_quantum_state())
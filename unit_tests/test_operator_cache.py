@@ -0,0 +1,52 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for the cache of combined operators
+
+def test_cache_hits_and_read_only_operators():
+    cache = sim.CircuitUnitaryOperation.operator_cache
+    operation = sim.CircuitUnitaryOperation.get_combined_operation_for_hadamard(1, 3)
+    hits = cache.hits
+    misses = cache.misses
+    assert sim.CircuitUnitaryOperation.get_combined_operation_for_hadamard(1, 3) is operation
+    assert cache.hits == hits + 1 and cache.misses == misses
+    assert not operation.flags.writeable
+    expected = sim.CircuitUnitaryOperation.get_combined_operation_for_qubit(sim.QubitUnitaryOperation.get_hadamard(), 1, 3)
+    assert np.array_equal(operation, expected)
+
+def test_parameters_are_part_of_the_key():
+    a = sim.CircuitUnitaryOperation.get_combined_operation_for_phase(0.1, 0, 2)
+    b = sim.CircuitUnitaryOperation.get_combined_operation_for_phase(0.2, 0, 2)
+    assert not np.allclose(a, b)
+
+def test_least_recently_used_eviction():
+    cache = sim.OperatorCache(3 * 16 * 4**3)
+    operators = {}
+    for q in range(3):
+        operators[q] = cache.get(('hadamard', q, 3), lambda: sim.CircuitUnitaryOperation.get_combined_operation_for_qubit(sim.QubitUnitaryOperation.get_hadamard(), q, 3))
+    assert len(cache) == 3 and cache.evictions == 0
+    # Use qubit 0 again, qubit 1 is now the least recently used operator
+    assert cache.get(('hadamard', 0, 3), None) is operators[0]
+    cache.get(('pauli_x', 0, 3), lambda: sim.CircuitUnitaryOperation.get_combined_operation_for_qubit(sim.QubitUnitaryOperation.get_pauli_x(), 0, 3))
+    assert cache.evictions == 1
+    assert cache.current_bytes <= cache.max_bytes
+    misses = cache.misses
+    cache.get(('hadamard', 1, 3), lambda: operators[1].copy())
+    assert cache.misses == misses + 1
+    statistics = cache.get_statistics()
+    assert statistics["entries"] == len(cache) and statistics["hits"] == 1
+
+def test_operator_larger_than_budget_is_not_cached():
+    cache = sim.OperatorCache(100)
+    operator = cache.get('identity', lambda: np.eye(8, dtype=complex))
+    assert len(cache) == 0 and cache.current_bytes == 0
+    assert not operator.flags.writeable
+
+def test_clear_resets_statistics():
+    cache = sim.OperatorCache(16 * 4**2)
+    for q in range(2):
+        cache.get(('hadamard', q, 2), lambda: sim.CircuitUnitaryOperation.get_combined_operation_for_qubit(sim.QubitUnitaryOperation.get_hadamard(), q, 2))
+    cache.get(('hadamard', 1, 2), None)
+    assert cache.hits == 1 and cache.misses == 2 and cache.evictions == 1
+    cache.clear()
+    assert cache.get_statistics() == {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0}
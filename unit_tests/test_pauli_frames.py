@@ -0,0 +1,68 @@
+import numpy as np
+import quantumsim as sim
+from SurfaceCodeQuantumSim import SurfaceCode
+from SurfaceCodeNoisyQuantumSim import NoisySurfaceCode
+
+# Unit tests for sampling shots of Clifford circuits with Pauli frames
+
+def test_pack_and_unpack_bits():
+    frames = sim.PauliFrames(3, 100)
+    bits = np.random.randint(2, size=(2, 100))
+    packed = frames.pack_bits(bits)
+    assert packed.dtype == np.uint64 and packed.shape == (2, 2)
+    assert np.array_equal(frames.unpack_bits(packed), bits)
+
+def test_bell_state_shots():
+    circuit = sim.Circuit(2, 2, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.cnot(0, 1)
+    circuit.measurement(0, 0)
+    circuit.measurement(1, 1)
+    shots = circuit.sample_pauli_frames(10000)
+    assert shots.shape == (10000, 2)
+    assert np.all(shots[:, 0] == shots[:, 1])
+    assert 4500 < np.sum(shots[:, 0]) < 5500
+
+def test_reset_after_measurement():
+    circuit = sim.Circuit(1, 2, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.measurement(0, 0)
+    circuit.reset(0, 0)
+    circuit.measurement(0, 1)
+    shots = circuit.sample_pauli_frames(1000)
+    assert np.any(shots[:, 0] == 1)
+    assert np.all(shots[:, 1] == 0)
+
+def test_error_rates():
+    circuit = sim.Circuit(1, 1, save_instructions=True)
+    circuit.pauli_x(0)
+    circuit.measurement(0, 0)
+    # Two of the three Paulis of a depolarizing error flip the measurement result
+    shots = circuit.sample_pauli_frames(100000, sim.PauliNoiseModel(single_qubit_error=0.3))
+    assert abs(np.mean(shots[:, 0] == 0) - 0.2) < 0.01
+    shots = circuit.sample_pauli_frames(100000, sim.PauliNoiseModel(measurement_error=0.1))
+    assert abs(np.mean(shots[:, 0] == 0) - 0.1) < 0.01
+
+def test_surface_code_syndromes_equal_stabilizer_tableau():
+    for q in range(9):
+        surface_code = SurfaceCode()
+        surface_code.add_encoder_circuit()
+        surface_code.add_bit_flip(q)
+        surface_code.add_z_stabilizer_syndrome_extraction()
+        surface_code.add_recovery_from_syndrome_z_stabilizer()
+        surface_code.add_z_stabilizer_syndrome_extraction()
+        shots = surface_code.circuit.sample_pauli_frames(200)
+        surface_code.circuit.execute_stabilizer()
+        register = surface_code.circuit.classicalBitRegister.register
+        assert np.all(shots[:, 4:8] == 0)
+        assert np.all(np.array(register[4:8]) == 0)
+        assert np.all(surface_code.circuit.pauli_frame_logical_error_count == 0)
+
+def test_noisy_surface_code_shots():
+    surface_code = NoisySurfaceCode()
+    surface_code.add_encoder_circuit()
+    surface_code.add_z_stabilizer_syndrome_extraction()
+    shots = surface_code.circuit.sample_pauli_frames(5000, sim.PauliNoiseModel(0.001, 0.01, 0.001))
+    assert shots.shape == (5000, 17)
+    syndrome_rate = np.mean(np.any(shots[:, 4:8] == 1, axis=1))
+    assert 0 < syndrome_rate < 0.5
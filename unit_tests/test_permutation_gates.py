@@ -0,0 +1,50 @@
+import numpy as np
+import quantumsim as sim
+from conftest import random_state_vector
+
+# Unit tests comparing the permutation gates (Pauli X, CNOT, SWAP, Toffoli, Fredkin) with their dense operations
+
+def controlled_operation(operation, controls, targets, N):
+    # Reference operation: identity plus (operation - identity) on the subspace where all controls are 1
+    projector = np.eye(1, 1)
+    for q in range(N):
+        projector = np.kron(projector, np.array([[0, 0], [0, 1]]) if q in controls else np.eye(2))
+    return np.eye(2**N) + np.dot(projector, operation - np.eye(2**N))
+
+def test_swap_and_fredkin_permutations():
+    N = 4
+    for a in range(N):
+        for b in range(N):
+            if a == b:
+                continue
+            cnot_a_b = sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(a, b, N)
+            cnot_b_a = sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(b, a, N)
+            swap = np.dot(np.dot(cnot_a_b, cnot_b_a), cnot_a_b)
+            assert np.allclose(sim.CircuitUnitaryOperation.get_combined_operation_for_swap(a, b, N), swap)
+            for control in range(N):
+                if control == a or control == b:
+                    continue
+                fredkin = controlled_operation(swap, [control], [a, b], N)
+                assert np.allclose(sim.CircuitUnitaryOperation.get_combined_operation_for_fredkin(control, a, b, N), fredkin)
+
+def test_permutation_kernel_equals_combined_operation():
+    N = 4
+    instructions = [sim.Pauli_X(N, 2), sim.CNOT(N, 0, 3), sim.Swap(N, 1, 3), sim.Fredkin(N, 2, 0, 3),
+                    sim.Toffoli(N, 3, 1, 0), sim.Multi_Controlled_Pauli_X(N)]
+    for instruction in instructions:
+        state_vector = random_state_vector(N)
+        expected = np.dot(instruction.getOperation(), state_vector.get_quantum_state())
+        instruction.applyOperation(state_vector)
+        assert np.allclose(state_vector.get_quantum_state(), expected)
+
+def test_pauli_x_and_cnot_permutations():
+    N = 3
+    for q in range(N):
+        assert np.allclose(sim.Pauli_X(N, q).getOperation(), sim.CircuitUnitaryOperation.get_combined_operation_for_pauli_x(q, N))
+    assert np.allclose(sim.CNOT(N, 0, 2).getOperation(), sim.CircuitUnitaryOperation.get_combined_operation_for_cnot(2, 0, N))
+    assert np.allclose(sim.Multi_Controlled_Pauli_X(N).getOperation(), sim.CircuitUnitaryOperation.get_combined_operation_for_multi_controlled_pauli_x_operation(N))
+
+def test_permutations_are_cached():
+    first = sim.CircuitUnitaryOperation.get_permutation_for_toffoli(0, 1, 2, 5)
+    second = sim.CircuitUnitaryOperation.get_permutation_for_toffoli(0, 1, 2, 5)
+    assert first is second
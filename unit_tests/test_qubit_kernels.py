@@ -0,0 +1,52 @@
+import numpy as np
+import quantumsim as sim
+from conftest import random_state_vector
+
+# Unit tests comparing the single-qubit kernels of StateVector with the combined 2^N x 2^N operations
+
+def test_kernel_equals_combined_operation():
+    N = 4
+    operation = sim.QubitUnitaryOperation.get_rotate_y(0.3) @ sim.QubitUnitaryOperation.get_hadamard()
+    for q in range(N):
+        state_vector = random_state_vector(N)
+        expected = np.dot(sim.CircuitUnitaryOperation.get_combined_operation_for_qubit(operation, q, N), state_vector.get_quantum_state())
+        state_vector.apply_unitary_operation_on_qubit(operation, q)
+        assert state_vector.get_quantum_state().shape == (2**N, 1)
+        assert np.allclose(state_vector.get_quantum_state(), expected)
+
+def test_instruction_mode_equals_operation_mode():
+    N = 3
+    circuit_operations = sim.Circuit(N)
+    circuit_instructions = sim.Circuit(N, save_instructions=True)
+    for circuit in [circuit_operations, circuit_instructions]:
+        circuit.hadamard(0)
+        circuit.rotate_x(np.pi/3, 1)
+        circuit.phase(np.pi/4, 0)
+        circuit.pauli_y(2)
+        circuit.rotate_z(np.pi/5, 1)
+        circuit.execute()
+    assert len(circuit_instructions.operations) == 0
+    assert np.allclose(circuit_operations.state_vector.get_quantum_state(), circuit_instructions.state_vector.get_quantum_state())
+
+def test_kernel_rejects_non_unitary_operation():
+    state_vector = sim.StateVector(2)
+    try:
+        state_vector.apply_unitary_operation_on_qubit(np.array([[1, 1], [0, 1]], dtype=complex), 0)
+        assert False
+    except ValueError:
+        pass
+
+def test_many_qubits_in_operation_mode():
+    # A 2^20 x 2^20 operation can not be built, the gates must be applied by their kernels
+    N = 20
+    circuit = sim.Circuit(N)
+    circuit.hadamard(0)
+    circuit.hadamard(N-1)
+    circuit.pauli_x(5)
+    circuit.execute()
+    psi = circuit.state_vector.get_quantum_state()
+    index = 1 << (N-1-5)
+    for q in [0, N-1]:
+        assert np.isclose(abs(psi[index | (1 << (N-1-q)), 0])**2, 0.25)
+    assert np.isclose(abs(psi[index, 0])**2, 0.25)
+    assert np.isclose(np.sum(np.abs(psi)**2), 1)
@@ -0,0 +1,38 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for running a circuit many times
+
+def create_bell_circuit(save_instructions=False):
+    circuit = sim.Circuit(2, 2, save_instructions)
+    circuit.hadamard(0)
+    circuit.cnot(0, 1)
+    return circuit
+
+def test_final_state_deterministic():
+    assert create_bell_circuit().is_final_state_deterministic()
+    assert create_bell_circuit(True).is_final_state_deterministic()
+    circuit = create_bell_circuit(True)
+    circuit.measurement(0, 0)
+    assert not circuit.is_final_state_deterministic()
+    circuit = create_bell_circuit(True)
+    circuit.noisy_pauli_x(1)
+    assert not circuit.is_final_state_deterministic()
+
+def test_run_circuit_executes_once():
+    circuit = create_bell_circuit()
+    executions = []
+    execute = circuit.execute
+    circuit.execute = lambda *args, **kwargs: executions.append(1) or execute(*args, **kwargs)
+    result = sim.QuantumUtil.run_circuit(circuit, 1000)
+    assert len(executions) == 1
+    assert len(result) == 1000
+    assert set(result) == {"|00>", "|11>"}
+    assert abs(result.count("|00>")/1000 - 0.5) < 0.1
+
+def test_run_circuit_with_measurement():
+    circuit = create_bell_circuit(True)
+    circuit.measurement(0, 0)
+    result = sim.QuantumUtil.run_circuit(circuit, 50)
+    assert len(result) == 50
+    assert set(result) <= {"|00>", "|11>"}
@@ -0,0 +1,36 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for drawing many measurement outcomes at once
+
+def create_circuit():
+    circuit = sim.Circuit(3)
+    circuit.hadamard(0)
+    circuit.cnot(0, 2)
+    circuit.rotate_y(2*np.pi/3, 1)
+    return circuit
+
+def test_sample_returns_integer_outcomes():
+    np.random.seed(7)
+    circuit = create_circuit()
+    circuit.execute()
+    outcomes = circuit.sample(20000)
+    assert outcomes.dtype == np.int64
+    assert outcomes.shape == (20000,)
+    frequencies = np.bincount(outcomes, minlength=8) / 20000
+    assert np.allclose(frequencies, circuit.state_vector.get_probabilities(), atol=0.02)
+
+def test_sample_counts_and_strings():
+    circuit = create_circuit()
+    circuit.execute()
+    counts = circuit.state_vector.sample_counts(1000)
+    assert counts.shape == (8,) and np.sum(counts) == 1000
+    assert np.all(counts[[0b001, 0b011, 0b100, 0b110]] == 0)
+    counts = circuit.get_counts(1000)
+    assert sum(counts.values()) == 1000
+    assert set(counts.keys()) <= {"|000>", "|010>", "|101>", "|111>"}
+    assert set(circuit.get_counts(100, little_endian_formatted=True).keys()) <= {"|000>", "|010>", "|101>", "|111>"}
+
+def test_states_as_strings():
+    assert sim.Dirac.states_as_strings(np.array([1, 6, 1]), 3) == ["|001>", "|110>", "|001>"]
+    assert sim.Dirac.states_as_strings(np.array([1, 6]), 3, True) == ["|100>", "|011>"]
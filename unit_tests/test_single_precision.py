@@ -0,0 +1,40 @@
+import numpy as np
+import quantumsim as sim
+from conftest import build_circuit
+
+# Unit tests for simulation in single precision (complex64)
+
+def test_single_precision_matches_double_precision():
+    for save_instructions in [False, True]:
+        single = build_circuit(sim.Circuit(4, save_instructions=save_instructions, dtype=np.complex64))
+        double = build_circuit(sim.Circuit(4, save_instructions=save_instructions))
+        single.execute()
+        double.execute()
+        assert single.state_vector.get_quantum_state().dtype == np.complex64
+        assert double.state_vector.get_quantum_state().dtype == np.complex128
+        assert np.allclose(single.state_vector.get_quantum_state(), double.state_vector.get_quantum_state(), atol=1e-6)
+    assert all(operation.get_operation().dtype == np.complex64 for operation in build_circuit(sim.Circuit(4, dtype=np.complex64)).operations)
+
+def test_single_precision_probabilities_in_double_precision():
+    circuit = build_circuit(sim.Circuit(4, dtype=np.complex64))
+    circuit.execute()
+    probabilities = circuit.state_vector.get_probabilities()
+    assert probabilities.dtype == np.float64
+    assert np.isclose(np.sum(probabilities), 1)
+    circuit.measure()
+    circuit.state_vector.measure_qubit(0)
+    assert circuit.state_vector.get_quantum_state().dtype == np.complex64
+
+def test_single_precision_noisy_circuit():
+    circuit = sim.Circuit(2, 2, True, dtype=np.complex64)
+    circuit.noisy_hadamard(0)
+    circuit.noisy_cnot(0, 1)
+    circuit.execute()
+    assert circuit.state_vector.get_quantum_state().dtype == np.complex64
+
+def test_unsupported_precision():
+    try:
+        sim.StateVector(2, dtype=np.float64)
+        assert False
+    except ValueError:
+        pass
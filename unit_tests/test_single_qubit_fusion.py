@@ -0,0 +1,29 @@
+import numpy as np
+import quantumsim as sim
+from conftest import build_circuit
+
+# Unit tests for fusing consecutive single-qubit gates
+
+def test_fusion_preserves_state():
+    circuit = build_circuit(sim.Circuit(3, save_instructions=True))
+    circuit.execute()
+    expected = circuit.state_vector.get_quantum_state()
+    assert circuit.fuse_single_qubit_gates() == 3
+    assert len(circuit.instructions) == len(circuit.descriptions) == len(circuit.gates) == 12
+    circuit.execute()
+    assert np.allclose(circuit.state_vector.get_quantum_state(), expected)
+
+def test_fusion_stops_at_measurement():
+    circuit = sim.Circuit(2, 1, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.measurement(0, 0)
+    circuit.hadamard(0)
+    assert circuit.fuse_single_qubit_gates() == 0
+    assert isinstance(circuit.instructions[1], sim.Measurement)
+
+def test_fusion_requires_instructions():
+    try:
+        build_circuit(sim.Circuit(3)).fuse_single_qubit_gates()
+        assert False
+    except Exception:
+        pass
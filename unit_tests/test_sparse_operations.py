@@ -0,0 +1,56 @@
+import numpy as np
+import scipy.sparse
+import quantumsim as sim
+from conftest import build_circuit
+
+# Unit tests comparing circuits with sparse operations to circuits with dense operations
+
+def test_sparse_operations_equal_dense_operations():
+    dense_circuit = build_circuit(sim.Circuit(4))
+    sparse_circuit = build_circuit(sim.Circuit(4, sparse=True))
+    for i in range(len(dense_circuit.operations)):
+        dense_operation, sparse_operation = dense_circuit.get_operation(i), sparse_circuit.get_operation(i)
+        assert scipy.sparse.issparse(sparse_operation)
+        assert sparse_operation.nnz <= 2*2**4
+        assert np.allclose(sparse_operation.toarray(), dense_operation)
+    dense_circuit.execute()
+    sparse_circuit.execute()
+    assert np.allclose(sparse_circuit.state_vector.get_quantum_state(), dense_circuit.state_vector.get_quantum_state())
+
+def test_sparse_inverse_and_controlled_circuit():
+    dense_circuit = build_circuit(sim.Circuit(4))
+    sparse_circuit = build_circuit(sim.Circuit(4, sparse=True))
+    for dense_derived, sparse_derived in [(dense_circuit.create_inverse_circuit(), sparse_circuit.create_inverse_circuit()),
+                                          (dense_circuit.create_controlled_circuit(1, 2, 6), sparse_circuit.create_controlled_circuit(1, 2, 6))]:
+        assert sparse_derived.sparse
+        for i in range(len(dense_derived.operations)):
+            assert np.allclose(sparse_derived.get_operation(i).toarray(), dense_derived.get_operation(i))
+
+def test_sparse_append_circuit_general():
+    dense_circuit = sim.Circuit(5)
+    sparse_circuit = sim.Circuit(5, sparse=True)
+    dense_circuit.append_circuit_general(build_circuit(sim.Circuit(4)), 1)
+    sparse_circuit.append_circuit_general(build_circuit(sim.Circuit(4, sparse=True)), 1)
+    dense_circuit.execute()
+    sparse_circuit.execute()
+    assert np.allclose(sparse_circuit.state_vector.get_quantum_state(), dense_circuit.state_vector.get_quantum_state())
+
+def test_sparse_merge_diagonal_gates():
+    circuit = sim.Circuit(3, sparse=True)
+    circuit.hadamard(0)
+    circuit.pauli_z(0)
+    circuit.controlled_phase(np.pi/4, 0, 2)
+    circuit.execute()
+    expected = circuit.state_vector.get_quantum_state()
+    assert circuit.merge_diagonal_gates() == 1
+    assert scipy.sparse.issparse(circuit.get_operation(1))
+    circuit.execute()
+    assert np.allclose(circuit.state_vector.get_quantum_state(), expected)
+
+def test_sparse_non_unitary_rejected():
+    state_vector = sim.StateVector(1)
+    try:
+        state_vector.apply_unitary_operation(scipy.sparse.csr_matrix(np.array([[1, 1], [0, 1]], dtype=complex)))
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,82 @@
+import numpy as np
+import quantumsim as sim
+from SurfaceCodeQuantumSim import SurfaceCode
+
+# Unit tests for executing Clifford circuits on a stabilizer tableau
+
+def pauli_operation(paulis):
+    operations = {'I': np.eye(2), 'X': sim.QubitUnitaryOperation.get_pauli_x(), 'Y': sim.QubitUnitaryOperation.get_pauli_y(), 'Z': sim.QubitUnitaryOperation.get_pauli_z()}
+    operation = np.eye(1)
+    for pauli in paulis:
+        operation = np.kron(operation, operations[pauli])
+    return operation
+
+def test_stabilizers_of_random_clifford_circuits():
+    N = 4
+    for _ in range(20):
+        circuit = sim.Circuit(N, save_instructions=True)
+        for _ in range(30):
+            gate = np.random.randint(7)
+            a, b = np.random.choice(N, 2, replace=False)
+            if gate == 0:
+                circuit.hadamard(a)
+            elif gate == 1:
+                circuit.phase(np.pi/2, a)
+            elif gate == 2:
+                circuit.cnot(a, b)
+            elif gate == 3:
+                circuit.pauli_y(a)
+            elif gate == 4:
+                circuit.controlled_pauli_z(a, b)
+            elif gate == 5:
+                circuit.swap(a, b)
+            else:
+                circuit.controlled_pauli_y(a, b)
+        assert circuit.is_clifford()
+        tableau = circuit.execute_stabilizer()
+        circuit.execute()
+        psi = circuit.state_vector.get_quantum_state()
+        for stabilizer in tableau.get_stabilizers():
+            sign = -1 if stabilizer[0] == '-' else 1
+            expectation = (psi.conj().T @ pauli_operation(stabilizer[1:]) @ psi)[0, 0]
+            assert np.isclose(expectation, sign)
+
+def test_measurement_of_ghz_state():
+    N = 17
+    circuit = sim.Circuit(N, N, save_instructions=True)
+    circuit.hadamard(0)
+    for q in range(1, N):
+        circuit.cnot(0, q)
+    for q in range(N):
+        circuit.measurement(q, q)
+    outcomes = set()
+    for _ in range(20):
+        circuit.execute_stabilizer()
+        register = circuit.classicalBitRegister.toString(0, N)
+        assert register in ['0'*N, '1'*N]
+        outcomes.add(register)
+    assert len(outcomes) == 2
+
+def test_non_clifford_circuit_is_rejected():
+    circuit = sim.Circuit(2, save_instructions=True)
+    circuit.hadamard(0)
+    circuit.phase(np.pi/4, 0)
+    assert not circuit.is_clifford()
+    try:
+        circuit.execute_stabilizer()
+        assert False
+    except Exception:
+        pass
+
+def test_surface_code_syndromes_equal_state_vector():
+    for q in range(9):
+        surface_code = SurfaceCode()
+        surface_code.add_encoder_circuit()
+        surface_code.add_bit_flip(q)
+        surface_code.add_z_stabilizer_syndrome_extraction()
+        surface_code.circuit.execute_stabilizer()
+        syndrome = surface_code.circuit.classicalBitRegister.toString(4, 8)
+        surface_code.circuit.classicalBitRegister.clear()
+        surface_code.circuit.execute()
+        assert syndrome == surface_code.circuit.classicalBitRegister.toString(4, 8)
+        assert syndrome != '0000'
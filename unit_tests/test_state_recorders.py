@@ -0,0 +1,75 @@
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import quantumsim as sim
+from conftest import build_circuit
+
+# Unit tests for recording the intermediate quantum states of an execution
+
+def all_states(save_instructions):
+    circuit = build_circuit(sim.Circuit(3, save_instructions=save_instructions))
+    circuit.execute()
+    return circuit.quantum_states
+
+def test_default_recorder_keeps_every_state():
+    for save_instructions in [False, True]:
+        states = all_states(save_instructions)
+        assert len(states) == 16
+        circuit = build_circuit(sim.Circuit(3, save_instructions=save_instructions))
+        circuit.execute()
+        assert circuit.state_recorder.get_steps() == list(range(16))
+        assert np.allclose(states[-1], circuit.state_vector.get_quantum_state())
+
+def test_no_and_every_kth_recorder():
+    expected = all_states(False)
+    circuit = build_circuit(sim.Circuit(3))
+    circuit.set_state_recorder(sim.NoStateRecorder())
+    circuit.execute()
+    assert circuit.quantum_states == []
+    circuit.set_state_recorder(sim.EveryKthStateRecorder(3))
+    circuit.execute()
+    assert circuit.state_recorder.get_steps() == [0, 3, 6, 9, 12, 15]
+    for step, state in zip([0, 3, 6, 9, 12, 15], circuit.quantum_states):
+        assert np.allclose(state, expected[step])
+
+def test_ring_buffer_recorder():
+    expected = all_states(True)
+    circuit = build_circuit(sim.Circuit(3, save_instructions=True, in_place=True))
+    circuit.set_state_recorder(sim.RingBufferStateRecorder(2))
+    circuit.execute()
+    assert circuit.state_recorder.get_steps() == [14, 15]
+    for step, state in zip([14, 15], circuit.quantum_states):
+        assert np.allclose(state, expected[step])
+
+def test_top_k_amplitudes_recorder():
+    expected = all_states(False)
+    circuit = build_circuit(sim.Circuit(3))
+    circuit.set_state_recorder(sim.TopKAmplitudesStateRecorder(2))
+    circuit.execute()
+    for (indices, amplitudes), state, expected_state in zip(circuit.state_recorder.get_amplitudes(), circuit.quantum_states, expected):
+        assert len(indices) == 2
+        assert np.allclose(amplitudes, expected_state[indices, 0])
+        assert np.isclose(np.abs(amplitudes[0]), np.max(np.abs(expected_state)))
+        assert np.count_nonzero(state) <= 2
+
+def test_memmap_recorder(tmp_path):
+    expected = all_states(False)
+    path = str(tmp_path / "states.npy")
+    circuit = build_circuit(sim.Circuit(3))
+    circuit.set_state_recorder(sim.MemmapStateRecorder(path))
+    circuit.execute()
+    circuit.state_recorder.flush()
+    assert np.allclose(np.load(path), np.hstack(expected).T)
+    for state, expected_state in zip(circuit.quantum_states, expected):
+        assert np.allclose(state, expected_state)
+
+def test_plots_read_from_recorder(monkeypatch):
+    monkeypatch.setattr(plt, 'show', lambda: None)
+    circuit = build_circuit(sim.Circuit(3))
+    circuit.set_state_recorder(sim.EveryKthStateRecorder(2))
+    circuit.execute()
+    sim.QuantumUtil.show_all_intermediate_states(circuit)
+    assert len(plt.gca().get_yticklabels()) == 8
+    sim.QuantumUtil.show_all_probabilities(circuit, show_description=False)
+    plt.close('all')
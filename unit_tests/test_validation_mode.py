@@ -0,0 +1,58 @@
+import numpy as np
+import quantumsim as sim
+
+# Unit tests for the validation modes of the unitarity check
+
+non_unitary = np.array([[1, 1], [0, 1]], dtype=complex)
+
+def test_always_rejects_non_unitary_operation():
+    state_vector = sim.StateVector(2, sim.ValidationMode.ALWAYS)
+    try:
+        state_vector.apply_unitary_operation_on_qubit(non_unitary, 0)
+        assert False
+    except ValueError:
+        pass
+
+def test_off_skips_check():
+    state_vector = sim.StateVector(2, sim.ValidationMode.OFF)
+    state_vector.apply_unitary_operation_on_qubit(non_unitary, 0)
+    state_vector.apply_diagonal_operation(np.array([2, 1, 1, 1], dtype=complex))
+    assert len(state_vector.validation_cache) == 0
+
+def test_once_caches_distinct_operations():
+    circuit = sim.Circuit(3, validation=sim.ValidationMode.ONCE)
+    circuit.hadamard(0)
+    circuit.hadamard(0)
+    circuit.rotate_y(0.4, 1)
+    circuit.rotate_y(0.4, 1)
+    # A CNOT is applied as a permutation of the amplitudes and is not validated
+    circuit.cnot(0, 1)
+    circuit.execute()
+    assert len(circuit.validation_cache) == 2
+    # The cache is shared by the state vectors of later executions
+    circuit.execute()
+    assert len(circuit.validation_cache) == 2
+    state_vector = sim.StateVector(1, sim.ValidationMode.ONCE)
+    try:
+        state_vector.apply_unitary_operation(non_unitary)
+        assert False
+    except ValueError:
+        assert len(state_vector.validation_cache) == 0
+
+def test_validation_modes_give_same_state():
+    states = []
+    for validation in [sim.ValidationMode.OFF, sim.ValidationMode.ONCE, sim.ValidationMode.ALWAYS]:
+        circuit = sim.Circuit(3, validation=validation)
+        circuit.hadamard(0)
+        circuit.cnot(0, 2)
+        circuit.rotate_y(0.4, 1)
+        circuit.execute()
+        states.append(circuit.state_vector.get_quantum_state())
+    assert np.allclose(states[0], states[1]) and np.allclose(states[1], states[2])
+
+def test_unknown_validation_mode():
+    try:
+        sim.StateVector(2, "sometimes")
+        assert False
+    except ValueError:
+        pass